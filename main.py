@@ -5,29 +5,90 @@
 
 import sys
 import os
-from src.interface.cli import MyStokCLI
+import argparse
+from src.instrumentation.profiler import PROFILER
 
-# Try to import pygame GUI, but make it optional
-try:
-    from src.interface.pygame_interface import MyStokGUI
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
+# Interfaces are imported where they are used, so each mode pays only for
+# its own dependencies: the CLI never loads pygame, and pandas is loaded
+# only when the CSV is parsed.
 
 
-def main():
+def load_gui():
+    # Try to import pygame GUI, but make it optional. Imported on demand so
+    # batch output on stdout is not preceded by pygame's banner.
     try:
-        csv_path = "resources/World-Stock-Prices-Dataset.csv"
+        from src.interface.pygame_interface import MyStokGUI
+        return MyStokGUI
+    except ImportError:
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MyStok - Stock Recommendation System")
+    parser.add_argument("--profile", action="store_true", help="print a pipeline stage breakdown on exit")
+    parser.add_argument("--profile-json", metavar="PATH", help="write a stage trace (Chrome trace format) to PATH")
+    parser.add_argument("--cprofile", metavar="PATH", help="write cProfile stats to PATH")
+    parser.add_argument("--data", default="resources/World-Stock-Prices-Dataset.csv", help="stock price CSV")
+    parser.add_argument("--cli", action="store_true", help="use the command line interface instead of the GUI")
+    
+    parser.add_argument("--serve", action="store_true", help="run the HTTP/JSON recommendation server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    
+    batch = parser.add_argument_group("batch mode", "answer queries without prompts")
+    batch.add_argument("--risk", choices=["low", "medium", "high"])
+    batch.add_argument("--time", choices=["short", "medium", "long"])
+    batch.add_argument("--sector", help="a sector, several separated by commas, or all")
+    batch.add_argument("--structure", default="max_heap",
+                       help="ranking backend, or auto to pick the one predicted fastest (default: max_heap). auto reads the "
+                            "cost model that python -m src.scoring.backend_selection saves to ~/.cache/mystok/backend_costs.json "
+                            "(or MYSTOK_COST_MODEL), and shipped defaults until then")
+    batch.add_argument("--top-k", type=int, default=10)
+    batch.add_argument("--max-correlation", type=float, help="diversify: skip stocks correlated above this with a pick")
+    batch.add_argument("--as-of", metavar="YYYY-MM-DD", help="score the stocks as they stood on this date")
+    batch.add_argument("--monte-carlo", action="store_true", help="score risk by simulated losses over the time horizon")
+    batch.add_argument("--queries", metavar="FILE", help="CSV or JSON-lines file of queries")
+    batch.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    batch.add_argument("--output", metavar="PATH", help="write results to PATH instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile or args.profile_json or args.cprofile:
+        PROFILER.enable(json_path=args.profile_json, cprofile_path=args.cprofile)
+    else:
+        PROFILER.configure_from_env()
+    
+    try:
+        csv_path = args.data
         if not os.path.exists(csv_path):
             print("Error: CSV file not found!")
             return 1
+        
+        if args.serve:
+            from src.interface.server import RecommendationServer
+            return RecommendationServer(csv_path, args.host, args.port).run()
+        
+        # Batch mode: a single query from flags or a file of queries
+        if args.queries or args.risk or args.time or args.sector:
+            if not args.queries and not (args.risk and args.time and args.sector):
+                print("Error: batch mode needs --risk, --time and --sector, or --queries FILE.")
+                return 2
+            from src.interface.batch import run_batch
+            query = {"id": "1", "risk": args.risk, "time": args.time, "sector": args.sector, "max_correlation": args.max_correlation,
+                     "as_of": args.as_of, "monte_carlo": args.monte_carlo}
+            return run_batch(csv_path, [query], args.queries, args.output, args.format, args.structure, args.top_k)
 
         # Try GUI first, go to CLI if not available
-        if GUI_AVAILABLE:
+        MyStokGUI = None if args.cli else load_gui()
+        if MyStokGUI is not None:
             gui = MyStokGUI(csv_path)
             gui.run()
         else:
-            print("GUI not available. Going back to CLI...")
+            if not args.cli:
+                print("GUI not available. Going back to CLI...")
+            from src.interface.cli import MyStokCLI
             cli = MyStokCLI(csv_path)
             cli.run()
         
@@ -1,9 +1,20 @@
 # Data loader for MyStok application
+#
+# pandas takes longer to import than the rest of the application combined,
+# so it is imported inside the methods that parse data rather than here.
 
-import pandas as pd
-import numpy as np
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Optional
 from ..data_structures.stock import Stock
+from ..instrumentation.profiler import PROFILER
+
+# Progress callbacks are called as progress(stage, done, total); total is 0
+# when it is not known yet (rows while the CSV is still being read)
+ProgressCallback = Callable[[str, int, int], None]
+READ_CHUNK_ROWS = 50000
+PROGRESS_EVERY_GROUPS = 25
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class DataLoader:
@@ -12,20 +23,67 @@ class DataLoader:
         self.csv_path = csv_path
         self.data = None
     
-    def load_stocks(self) -> List[Stock]:
+    def load_stocks(self, progress: Optional[ProgressCallback] = None) -> List[Stock]:
         # Load stock data from CSV
         try:
-            self.data = pd.read_csv(self.csv_path)
+            with PROFILER.span("read_csv") as span:
+                self.data = self.read_csv(progress)
+                span.add("rows", len(self.data))
+            return self.build_stocks(progress)
             
-            # Clean data
-            self.clean_data()
+        except FileNotFoundError:
+            print(f"Error: CSV file not found at {self.csv_path}")
+            return []
+        except Exception as x:
+            print(f"Error loading data: {x}")
+            return []
+    
+    def load_stocks_from_dataframe(self, data: "pd.DataFrame") -> List[Stock]:
+        # Load stock data already in memory, using the same columns as the CSV
+        try:
+            self.data = data.copy()
+            return self.build_stocks()
             
-            # Group data by stock
-            stocks = []
+        except Exception as x:
+            print(f"Error loading data: {x}")
+            return []
+    
+    def read_csv(self, progress: Optional[ProgressCallback] = None) -> "pd.DataFrame":
+        # Read in chunks when someone is watching, so rows parsed can be reported
+        import pandas as pd
+        
+        if progress is None:
+            return pd.read_csv(self.csv_path)
+        
+        chunks = []
+        rows = 0
+        progress("rows", 0, 0)
+        for chunk in pd.read_csv(self.csv_path, chunksize=READ_CHUNK_ROWS):
+            chunks.append(chunk)
+            rows += len(chunk)
+            progress("rows", rows, 0)
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.read_csv(self.csv_path)
+    
+    def build_stocks(self, progress: Optional[ProgressCallback] = None) -> List[Stock]:
+        # Clean self.data and group it into Stock objects
+        if progress:
+            progress("clean", 0, len(self.data))
+        with PROFILER.span("clean_data") as span:
+            span.add("rows_in", len(self.data))
+            self.clean_data()
+            span.add("rows_out", len(self.data))
+        
+        # Group data by stock
+        stocks = []
+        with PROFILER.span("group_stocks") as span:
             grouped_data = self.data.groupby(['Ticker', 'Brand_Name', 'Industry_Tag'])
+            total_groups = grouped_data.ngroups
             
-            for group_key, group in grouped_data:
+            for group_number, (group_key, group) in enumerate(grouped_data):
                 ticker, brand_name, industry_tag = group_key
+                span.add("groups")
+                if progress and group_number % PROGRESS_EVERY_GROUPS == 0:
+                    progress("tickers", group_number, total_groups)
                 # Sort by date
                 group_sorted = group.sort_values('Date')
                 
@@ -37,28 +95,28 @@ class DataLoader:
                     historical_data = prices
                     
                     # Create Stock object
-                    stock = Stock(
-                        ticker=ticker,
-                        brand_name=brand_name,
-                        industry_tag=industry_tag,
-                        current_price=current_price,
-                        historical_data=historical_data
-                    )
+                    with PROFILER.span("stock_construction") as stock_span:
+                        stock = Stock(
+                            ticker=ticker,
+                            brand_name=brand_name,
+                            industry_tag=industry_tag,
+                            current_price=current_price,
+                            historical_data=historical_data,
+                            dates=group_sorted['Date'].to_numpy(dtype='datetime64[D]')
+                        )
+                        stock_span.add("prices", len(prices))
                     stocks.append(stock)
-            
-            return stocks
-            
-        except FileNotFoundError:
-            print(f"Error: CSV file not found at {self.csv_path}")
-            return []
-        except Exception as x:
-            print(f"Error loading data: {x}")
-            return []
+            span.add("stocks", len(stocks))
+        
+        if progress:
+            progress("tickers", total_groups, total_groups)
+        return stocks
     
     def clean_data(self) -> None:
         # Clean the loaded data
         if self.data is None:
             return
+        import pandas as pd
         
         # Get rid of rows with missing data
         essential_columns = ['Date', 'Ticker', 'Brand_Name', 'Industry_Tag', 'Close']
@@ -99,6 +157,8 @@ class DataLoader:
     
     def filter_by_date_range(self, start_date: str, end_date: str) -> List[Stock]:
         try:
+            import pandas as pd
+            
             # Read CSV file
             data = pd.read_csv(self.csv_path)
             data['Date'] = pd.to_datetime(data['Date'])
@@ -124,7 +184,8 @@ class DataLoader:
                         brand_name=brand_name,
                         industry_tag=industry_tag,
                         current_price=current_price,
-                        historical_data=historical_data
+                        historical_data=historical_data,
+                        dates=group_sorted['Date'].to_numpy(dtype='datetime64[D]')
                     )
                     stocks.append(stock)
             
@@ -0,0 +1,106 @@
+# Price panel for MyStok application
+#
+# Every ticker's closes and trading days in flat NumPy arrays, with offsets
+# so ticker i owns [offsets[i], offsets[i + 1]). Metrics as of any date come
+# from one binary search over all tickers at once, with no list slicing and
+# no re-reading of the file. The arrays are plain buffers, so they can also
+# be placed in shared memory for worker processes (see arrays/from_arrays).
+
+from typing import Dict, List, Sequence
+import numpy as np
+from ..data_structures.stock import Stock
+from ..scoring.indicators import VOLATILITY_WINDOW, daily_returns, flatten_histories, prefix_sums, segment_starts, window_mean_std
+
+# Stock.calculate_year_change compares with the close 364 observations back
+YEAR_OBSERVATIONS = 365
+
+
+def to_day(value) -> int:
+    # Days since the epoch for a date, string or datetime64
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+class PricePanel:
+
+    def __init__(self, tickers: List[str], industry_tags: List[str], prices: np.ndarray, days: np.ndarray, offsets: np.ndarray):
+        self.tickers = tickers
+        self.industry_tags = industry_tags
+        self.prices = prices
+        self.days = days
+        self.offsets = offsets
+        self.lengths = np.diff(offsets)
+        self.starts = segment_starts(offsets)
+
+        # Sorted composite keys (ticker number, day) for one searchsorted per date
+        self.day_span = int(days.max() - days.min() + 2) if len(days) else 1
+        self.first_day = int(days.min()) if len(days) else 0
+        self.last_day = int(days.max()) if len(days) else 0
+        owner = np.repeat(np.arange(len(tickers), dtype=np.int64), self.lengths)
+        self.keys = owner * self.day_span + (days - self.first_day)
+
+        self.returns = daily_returns(prices, offsets)
+        self.return_sums = prefix_sums(self.returns)
+
+    @classmethod
+    def from_stocks(cls, stocks: Sequence[Stock]) -> "PricePanel":
+        missing = [stock.ticker for stock in stocks if stock.dates is None]
+        if missing:
+            raise ValueError(f"Stocks need dates for a price panel (missing for {', '.join(missing[:5])})")
+        prices, offsets = flatten_histories([stock.historical_data for stock in stocks])
+        if offsets[-1]:
+            days = np.concatenate([np.asarray(stock.dates, dtype="datetime64[D]").astype(np.int64) for stock in stocks])
+        else:
+            days = np.zeros(0, dtype=np.int64)
+        return cls([stock.ticker for stock in stocks], [stock.industry_tag for stock in stocks], prices, days, offsets)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        # The numeric buffers; tickers and tags travel separately
+        return {"prices": self.prices, "days": self.days, "offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, tickers: List[str], industry_tags: List[str], arrays: Dict[str, np.ndarray]) -> "PricePanel":
+        return cls(tickers, industry_tags, arrays["prices"], arrays["days"], arrays["offsets"])
+
+    def trading_days(self) -> np.ndarray:
+        # Every day on which at least one ticker has a close, sorted
+        return np.unique(self.days)
+
+    def positions_at(self, day: int) -> np.ndarray:
+        # Flat index of each ticker's last close on or before `day`, -1 if none
+        ticker_numbers = np.arange(len(self.tickers), dtype=np.int64)
+        offset = min(max(day - self.first_day, -1), self.day_span - 1)
+        found = np.searchsorted(self.keys, ticker_numbers * self.day_span + offset, side="right") - 1
+        return np.where(found >= self.offsets[:-1], found, -1)
+
+    def metrics_at(self, day: int) -> Dict[str, np.ndarray]:
+        # The Stock metrics each ticker would have had with data up to `day`.
+        # count is the number of closes seen so far; a ticker with fewer than
+        # two is not listed yet (the loader skips such stocks too).
+        position = self.positions_at(day)
+        listed = position >= 0
+        count = np.where(listed, position - self.offsets[:-1] + 1, 0)
+        safe = np.where(listed, position, 0)
+        current = np.where(listed, self.prices[safe] if len(self.prices) else 0.0, np.nan)
+
+        has_previous = count >= 2
+        previous = np.where(has_previous, self.prices[np.maximum(safe - 1, 0)] if len(self.prices) else 0.0, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            percent_change = np.where(has_previous & (previous != 0), (current - previous) / previous * 100, 0.0)
+
+        has_year = count >= YEAR_OBSERVATIONS
+        year_ago = self.prices[np.maximum(safe - (YEAR_OBSERVATIONS - 1), 0)] if len(self.prices) else np.zeros(len(count))
+        year_change = np.where(has_year, current - year_ago, 0.0)
+
+        volatility = np.full(len(count), np.nan)
+        if listed.any():
+            _, volatility[listed] = window_mean_std(self.return_sums, self.starts, VOLATILITY_WINDOW, position[listed])
+
+        return {
+            "position": position,
+            "count": count,
+            "listed": has_previous,
+            "current_price": current,
+            "percent_change": percent_change,
+            "year_change": year_change,
+            "volatility": volatility
+        }
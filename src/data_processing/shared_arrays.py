@@ -0,0 +1,53 @@
+# Shared-memory arrays for MyStok worker processes
+#
+# Named NumPy arrays copied once into a single shared memory block. The
+# block's name and the layout (offset, dtype, shape per array) are all a
+# worker needs to map the same arrays without copying, so only those cross
+# the process boundary. Workers may also write into arrays reserved for
+# their results.
+
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+import numpy as np
+
+# name -> (byte offset, dtype string, shape)
+Layout = Dict[str, Tuple[int, str, Tuple[int, ...]]]
+
+
+class SharedArrays:
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.layout: Layout = {}
+        position = 0
+        for name, array in arrays.items():
+            self.layout[name] = (position, array.dtype.str, array.shape)
+            # 8-byte alignment keeps every view aligned for its dtype
+            position += -(-array.nbytes // 8) * 8
+        self.memory = shared_memory.SharedMemory(create=True, size=max(position, 1))
+        self.arrays = {name: view(self.memory, entry) for name, entry in self.layout.items()}
+        for name, array in arrays.items():
+            self.arrays[name][...] = array
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        self.arrays = {}
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # views handed out are still alive; the mapping goes with them
+        self.memory.unlink()
+
+
+def view(memory: shared_memory.SharedMemory, entry: Tuple[int, str, Tuple[int, ...]]) -> np.ndarray:
+    offset, dtype, shape = entry
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset)
+
+
+def attach(memory_name: str, layout: Layout) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    # Map a block created by SharedArrays in another process. Keep the
+    # returned memory object alive as long as the arrays are used.
+    memory = shared_memory.SharedMemory(name=memory_name)
+    return memory, {name: view(memory, entry) for name, entry in layout.items()}
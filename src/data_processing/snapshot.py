@@ -0,0 +1,102 @@
+# Versioned dataset snapshots for MyStok application
+#
+# A snapshot bundles everything a query reads: the stocks, a per-sector
+# index and a Recommender whose caches and rankings belong to that version
+# only. Snapshots are never changed after publishing. A writer builds the
+# next one completely and then swaps a single reference, so readers that
+# grabbed the old snapshot keep a consistent view without taking a lock.
+# An old version is freed by reference counting once its last reader is done.
+
+import threading
+import weakref
+from time import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+from ..data_structures.stock import Stock
+from ..scoring.recommender import Recommender, SECTORS
+from ..scoring.stock_scorer import StockScorer
+
+
+class DatasetSnapshot:
+    # Immutable view of one dataset version
+
+    __slots__ = ("version", "stocks", "sector_index", "recommender", "data_summary", "created_at", "__weakref__")
+
+    def __init__(self, version: int, stocks: List[Stock], data_summary: Optional[Dict[str, Any]] = None):
+        set_field = super().__setattr__
+        stocks = tuple(stocks)
+        sector_index = build_sector_index(stocks)
+        set_field("version", version)
+        set_field("stocks", stocks)
+        set_field("sector_index", MappingProxyType(sector_index))
+        set_field("recommender", Recommender(stocks, sector_index))
+        set_field("data_summary", MappingProxyType(dict(data_summary or {})))
+        set_field("created_at", time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DatasetSnapshot is read-only")
+
+    def __repr__(self) -> str:
+        return f"DatasetSnapshot(version={self.version}, stocks={len(self.stocks)})"
+
+
+def get_keyword_sectors() -> Dict[str, List[str]]:
+    # Lower-cased industry tag -> sectors that include it, from the scorer's rules
+    keyword_sector: Dict[str, List[str]] = {}
+    scorer = StockScorer("medium", "medium", "technology")
+    for sector in SECTORS:
+        for keyword in scorer.get_sector_keywords(sector):
+            keyword_sector.setdefault(keyword, []).append(sector)
+    return keyword_sector
+
+
+def build_sector_index(stocks: Tuple[Stock, ...]) -> Dict[str, Tuple[Stock, ...]]:
+    # Same sector rules the scorer uses, computed once per version
+    keyword_sector = get_keyword_sectors()
+    index: Dict[str, List[Stock]] = {sector: [] for sector in SECTORS}
+    for stock in stocks:
+        for sector in keyword_sector.get(stock.industry_tag.lower(), ()):
+            index[sector].append(stock)
+    return {sector: tuple(members) for sector, members in index.items()}
+
+
+class SnapshotStore:
+    # Holds the current snapshot. Readers call current(); writers publish().
+
+    def __init__(self):
+        self._current: Optional[DatasetSnapshot] = None
+        self._version = 0
+        self._writer_lock = threading.Lock()
+        self._live = weakref.WeakValueDictionary()
+
+    def current(self) -> Optional[DatasetSnapshot]:
+        # A single reference read, so no lock is needed
+        return self._current
+
+    def publish(self, stocks: List[Stock], data_summary: Optional[Dict[str, Any]] = None) -> DatasetSnapshot:
+        # Build the next version off to the side, then swap it in
+        with self._writer_lock:
+            snapshot = DatasetSnapshot(self._version + 1, stocks, data_summary)
+            self._version = snapshot.version
+            self._live[snapshot.version] = snapshot
+            self._current = snapshot
+        return snapshot
+
+    def ingest(self, csv_path: str) -> Optional[DatasetSnapshot]:
+        # Load a fresh copy of the data and publish it; the current version
+        # stays in place if loading fails
+        from .data_loader import DataLoader
+
+        loader = DataLoader(csv_path)
+        stocks = loader.load_stocks()
+        if not stocks:
+            return None
+        return self.publish(stocks, loader.get_data_summary())
+
+    def live_versions(self) -> List[int]:
+        # Versions still referenced by the store or by a reader
+        return sorted(self._live.keys())
+
+    def stocks(self) -> Tuple[Stock, ...]:
+        snapshot = self._current
+        return snapshot.stocks if snapshot is not None else ()
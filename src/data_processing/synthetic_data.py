@@ -0,0 +1,147 @@
+# Synthetic market data generator for MyStok application
+#
+# Produces price histories in the same schema DataLoader reads
+# (Date, Ticker, Brand_Name, Industry_Tag, Close) so scaling benchmarks and
+# memory tests can run offline at any size. Every ticker gets its own RNG
+# derived from (seed, ticker number), so the output does not depend on how
+# the tickers are chunked.
+#
+# Usage:
+#   python -m src.data_processing.synthetic_data --tickers 10000 --years 20 --out synthetic.csv
+
+import argparse
+import sys
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from .data_loader import DataLoader
+from ..data_structures.stock import Stock
+
+TRADING_DAYS_PER_YEAR = 252
+
+# Industry tags the sector mappings know about, weighted equally by default
+DEFAULT_SECTOR_MIX = {
+    "technology": 1.0, "e-commerce": 1.0, "social media": 1.0,
+    "footwear": 1.0, "apparel": 1.0, "fitness": 1.0,
+    "healthcare": 1.0, "finance": 1.0, "cryptocurrency": 1.0,
+    "automotive": 1.0, "aviation": 1.0, "food": 1.0, "food & beverage": 1.0,
+    "entertainment": 1.0, "gaming": 1.0, "music": 1.0, "energy": 1.0,
+    "consumer goods": 1.0, "retail": 1.0, "hospitality": 1.0
+}
+
+COLUMNS = ["Date", "Ticker", "Brand_Name", "Industry_Tag", "Close"]
+
+
+class SyntheticMarketGenerator:
+    # Seeded geometric Brownian motion price paths for a configurable universe
+
+    def __init__(self, num_tickers: int = 100, history_days: int = TRADING_DAYS_PER_YEAR * 5,
+                 min_history_days: Optional[int] = None, end_date: str = "2025-06-30",
+                 sector_mix: Optional[Dict[str, float]] = None, missing_rate: float = 0.0,
+                 duplicate_rate: float = 0.0, annual_drift: float = 0.07,
+                 volatility_range: tuple = (0.15, 0.60), start_price_range: tuple = (5.0, 500.0),
+                 seed: int = 0):
+        self.num_tickers = num_tickers
+        self.history_days = history_days
+        self.min_history_days = history_days if min_history_days is None else min(min_history_days, history_days)
+        self.end_date = end_date
+        self.sector_mix = sector_mix or DEFAULT_SECTOR_MIX
+        self.missing_rate = missing_rate
+        self.duplicate_rate = duplicate_rate
+        self.annual_drift = annual_drift
+        self.volatility_range = volatility_range
+        self.start_price_range = start_price_range
+        self.seed = seed
+
+        self.dates = pd.bdate_range(end=end_date, periods=history_days).strftime("%Y-%m-%d").to_numpy()
+        self.industries = list(self.sector_mix.keys())
+        weights = np.array([self.sector_mix[tag] for tag in self.industries], dtype=float)
+        self.industry_weights = weights / weights.sum()
+
+    def ticker_rng(self, ticker_number: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, ticker_number])
+
+    def generate_ticker(self, ticker_number: int) -> pd.DataFrame:
+        # Rows for one ticker, including any injected missing or duplicate rows
+        rng = self.ticker_rng(ticker_number)
+        ticker = f"SYN{ticker_number:05d}"
+        industry = self.industries[rng.choice(len(self.industries), p=self.industry_weights)]
+        length = int(rng.integers(self.min_history_days, self.history_days + 1))
+
+        # Geometric Brownian motion with per-ticker volatility
+        daily_vol = rng.uniform(*self.volatility_range) / np.sqrt(TRADING_DAYS_PER_YEAR)
+        daily_drift = self.annual_drift / TRADING_DAYS_PER_YEAR - 0.5 * daily_vol ** 2
+        log_returns = rng.normal(daily_drift, daily_vol, length)
+        low, high = np.log(self.start_price_range[0]), np.log(self.start_price_range[1])
+        start_price = np.exp(rng.uniform(low, high))
+        closes = np.round(start_price * np.exp(np.cumsum(log_returns)), 4)
+
+        if self.missing_rate > 0:
+            closes[rng.random(length) < self.missing_rate] = np.nan
+
+        frame = pd.DataFrame({
+            "Date": self.dates[-length:],
+            "Ticker": ticker,
+            "Brand_Name": f"Synthetic {ticker_number:05d} Inc",
+            "Industry_Tag": industry,
+            "Close": closes
+        })
+
+        if self.duplicate_rate > 0:
+            duplicates = frame[rng.random(length) < self.duplicate_rate]
+            frame = pd.concat([frame, duplicates], ignore_index=True)
+
+        return frame
+
+    def iter_frames(self, chunk_size: int = 500) -> Iterator[pd.DataFrame]:
+        # Yield the universe a chunk of tickers at a time to bound memory
+        for start in range(0, self.num_tickers, chunk_size):
+            end = min(start + chunk_size, self.num_tickers)
+            yield pd.concat([self.generate_ticker(i) for i in range(start, end)], ignore_index=True)
+
+    def generate_frame(self) -> pd.DataFrame:
+        frames = list(self.iter_frames())
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def generate_stocks(self) -> List[Stock]:
+        # Same data as the CSV, run through DataLoader's cleaning and grouping
+        return DataLoader("<synthetic>").load_stocks_from_dataframe(self.generate_frame())
+
+    def write_csv(self, path: str, chunk_size: int = 500) -> int:
+        rows = 0
+        with open(path, "w", newline="") as f:
+            for i, frame in enumerate(self.iter_frames(chunk_size)):
+                frame.to_csv(f, header=(i == 0), index=False)
+                rows += len(frame)
+        return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic MyStok price data")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--min-years", type=float, default=None, help="shortest ticker history")
+    parser.add_argument("--end-date", default="2025-06-30")
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--drift", type=float, default=0.07, help="annual drift")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="CSV file to write")
+    args = parser.parse_args(argv)
+
+    history_days = int(args.years * TRADING_DAYS_PER_YEAR)
+    min_history_days = int(args.min_years * TRADING_DAYS_PER_YEAR) if args.min_years is not None else None
+    generator = SyntheticMarketGenerator(
+        num_tickers=args.tickers, history_days=history_days, min_history_days=min_history_days,
+        end_date=args.end_date, missing_rate=args.missing_rate, duplicate_rate=args.duplicate_rate,
+        annual_drift=args.drift, seed=args.seed
+    )
+    rows = generator.write_csv(args.out)
+    print(f"Wrote {rows} rows for {args.tickers} tickers to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
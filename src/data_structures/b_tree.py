@@ -0,0 +1,194 @@
+# B-tree implementation for MyStok application
+
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional, Tuple
+from .stock import Stock
+
+
+class BTreeNode:
+    # Node class for B-tree. Leaves hold the entries and are linked left to
+    # right; internal nodes only hold separator keys.
+
+    def __init__(self, leaf: bool):
+        self.leaf = leaf
+        self.keys: List[float] = []
+        self.children: List["BTreeNode"] = []
+        self.values: List[Stock] = []
+        self.next: Optional["BTreeNode"] = None
+
+    def __str__(self) -> str:
+        return f"BTreeNode(leaf={self.leaf}, keys={len(self.keys)})"
+
+
+class BTree:
+    # Wide-fanout B+ tree keyed by negated score, so a left-to-right leaf
+    # scan yields the highest scores first. Each node keeps its keys in one
+    # flat list, which keeps lookups to a handful of bisects.
+
+    def __init__(self, order: int = 64):
+        self.order = order
+        self.root = BTreeNode(leaf=True)
+        self.size = 0
+
+    def build(self, items: List[Tuple[float, Stock]]) -> None:
+        # Bulk load from sorted entries instead of inserting one at a time
+        entries = sorted(((-score, stock) for score, stock in items), key=lambda x: x[0])
+        self.size = len(entries)
+
+        leaves = []
+        for start in range(0, len(entries), self.order):
+            leaf = BTreeNode(leaf=True)
+            chunk = entries[start:start + self.order]
+            leaf.keys = [key for key, _ in chunk]
+            leaf.values = [stock for _, stock in chunk]
+            if leaves:
+                leaves[-1].next = leaf
+            leaves.append(leaf)
+
+        if not leaves:
+            self.root = BTreeNode(leaf=True)
+            return
+
+        level = leaves
+        while len(level) > 1:
+            parents = []
+            for start in range(0, len(level), self.order):
+                parent = BTreeNode(leaf=False)
+                parent.children = level[start:start + self.order]
+                parent.keys = [self.min_key(child) for child in parent.children[1:]]
+                parents.append(parent)
+            level = parents
+        self.root = level[0]
+
+    def min_key(self, node: BTreeNode) -> float:
+        while not node.leaf:
+            node = node.children[0]
+        return node.keys[0]
+
+    def insert(self, score: float, stock_data: Stock) -> None:
+        split = self.insert_helper(self.root, -score, stock_data)
+        if split is not None:
+            separator, right = split
+            new_root = BTreeNode(leaf=False)
+            new_root.keys = [separator]
+            new_root.children = [self.root, right]
+            self.root = new_root
+        self.size += 1
+
+    def insert_helper(self, node: BTreeNode, key: float, stock_data: Stock) -> Optional[Tuple[float, BTreeNode]]:
+        # Returns (separator, new right sibling) when node had to split
+        if node.leaf:
+            position = bisect_right(node.keys, key)
+            node.keys.insert(position, key)
+            node.values.insert(position, stock_data)
+            if len(node.keys) <= self.order:
+                return None
+
+            middle = len(node.keys) // 2
+            right = BTreeNode(leaf=True)
+            right.keys = node.keys[middle:]
+            right.values = node.values[middle:]
+            del node.keys[middle:]
+            del node.values[middle:]
+            right.next = node.next
+            node.next = right
+            return right.keys[0], right
+
+        position = bisect_right(node.keys, key)
+        split = self.insert_helper(node.children[position], key, stock_data)
+        if split is None:
+            return None
+
+        separator, child = split
+        node.keys.insert(position, separator)
+        node.children.insert(position + 1, child)
+        if len(node.children) <= self.order:
+            return None
+
+        middle = len(node.keys) // 2
+        right = BTreeNode(leaf=False)
+        promoted = node.keys[middle]
+        right.keys = node.keys[middle + 1:]
+        right.children = node.children[middle + 1:]
+        del node.keys[middle:]
+        del node.children[middle + 1:]
+        return promoted, right
+
+    def find_leaf(self, key: float) -> BTreeNode:
+        # Leftmost leaf that can hold key
+        node = self.root
+        while not node.leaf:
+            node = node.children[bisect_left(node.keys, key)]
+        return node
+
+    def delete(self, score: float, stock_data: Stock) -> bool:
+        # Entries are removed from their leaf without rebalancing; separators
+        # stay valid as bounds and empty leaves are skipped by the scans.
+        key = -score
+        leaf = self.find_leaf(key)
+        while leaf is not None:
+            start = bisect_left(leaf.keys, key)
+            for position in range(start, len(leaf.keys)):
+                if leaf.keys[position] != key:
+                    return False
+                if leaf.values[position] is stock_data:
+                    del leaf.keys[position]
+                    del leaf.values[position]
+                    self.size -= 1
+                    return True
+            leaf = leaf.next
+        return False
+
+    def first_leaf(self) -> BTreeNode:
+        node = self.root
+        while not node.leaf:
+            node = node.children[0]
+        return node
+
+    def get_top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        result = []
+        leaf = self.first_leaf()
+        while leaf is not None and len(result) < k:
+            take = min(k - len(result), len(leaf.keys))
+            result.extend((-leaf.keys[i], leaf.values[i]) for i in range(take))
+            leaf = leaf.next
+        return result
+
+    def iter_descending(self) -> Iterator[Tuple[float, Stock]]:
+        leaf = self.first_leaf()
+        while leaf is not None:
+            for i in range(len(leaf.keys)):
+                yield (-leaf.keys[i], leaf.values[i])
+            leaf = leaf.next
+
+    def get_stocks_in_range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        # Highest scores first
+        result = []
+        low_key, high_key = -max_score, -min_score
+        leaf = self.find_leaf(low_key)
+        while leaf is not None:
+            start = bisect_left(leaf.keys, low_key)
+            end = bisect_right(leaf.keys, high_key)
+            result.extend((-leaf.keys[i], leaf.values[i]) for i in range(start, end))
+            if end < len(leaf.keys):
+                break
+            leaf = leaf.next
+        return result
+
+    def count_greater(self, score: float) -> int:
+        key = -score
+        count = 0
+        leaf = self.first_leaf()
+        while leaf is not None:
+            position = bisect_left(leaf.keys, key)
+            count += position
+            if position < len(leaf.keys):
+                break
+            leaf = leaf.next
+        return count
+
+    def get_size(self) -> int:
+        return self.size
+
+    def is_empty(self) -> bool:
+        return self.size == 0
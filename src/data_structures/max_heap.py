@@ -1,15 +1,22 @@
 # Max Heap implementation for MyStok application
 
-from typing import List, Tuple, Optional
+import heapq
+from typing import Dict, Iterator, List, Tuple, Optional
 from .stock import Stock
 
 
 class MaxHeap:
     def __init__(self):
         self.heap: List[Tuple[float, Stock]] = []
+        # Index of each stock in self.heap. Built by the first update() and
+        # kept in step from then on, so heaps that are never updated (and
+        # the scratch copies get_top_k drains) do not pay for it.
+        self.positions: Optional[Dict[Stock, int]] = None
     
     def insert(self, score: float, stock_data: Stock) -> None:
         self.heap.append((score, stock_data))
+        if self.positions is not None:
+            self.positions[stock_data] = len(self.heap) - 1
         self.heapify_up(len(self.heap) - 1)
     
     def extract_max(self) -> Optional[Tuple[float, Stock]]:
@@ -19,6 +26,10 @@ class MaxHeap:
         max_item = self.heap[0]
         self.heap[0] = self.heap[-1]
         self.heap.pop()
+        if self.positions is not None:
+            del self.positions[max_item[1]]
+            if self.heap:
+                self.positions[self.heap[0][1]] = 0
         
         if self.heap:
             self.heapify_down(0)
@@ -40,13 +51,32 @@ class MaxHeap:
         
         return result
     
+    def iter_descending(self) -> Iterator[Tuple[float, Stock]]:
+        # Entries highest first without changing the heap: a second heap holds
+        # the frontier of positions, so the first k cost O(k log k)
+        if not self.heap:
+            return
+        frontier = [(-self.heap[0][0], 0)]
+        while frontier:
+            _, index = heapq.heappop(frontier)
+            yield self.heap[index]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (-self.heap[child][0], child))
+    
     def peek_max(self) -> Optional[Tuple[float, Stock]]:
         return self.heap[0] if self.heap else None
     
+    def swap(self, i: int, j: int) -> None:
+        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        if self.positions is not None:
+            self.positions[self.heap[i][1]] = i
+            self.positions[self.heap[j][1]] = j
+    
     def heapify_up(self, index: int) -> None:
         parent = (index - 1) // 2
         if parent >= 0 and self.heap[index][0] > self.heap[parent][0]:
-            self.heap[index], self.heap[parent] = self.heap[parent], self.heap[index]
+            self.swap(index, parent)
             self.heapify_up(parent)
     
     def heapify_down(self, index: int) -> None:
@@ -61,14 +91,45 @@ class MaxHeap:
             largest = right
         
         if largest != index:
-            self.heap[index], self.heap[largest] = self.heap[largest], self.heap[index]
+            self.swap(index, largest)
             self.heapify_down(largest)
     
     def build_heap(self, items: List[Tuple[float, Stock]]) -> None:
         self.heap = items.copy()
+        self.positions = None
         for i in range(len(self.heap) // 2 - 1, -1, -1):
             self.heapify_down(i)
     
+    def update(self, stock_data: Stock, new_score: float) -> bool:
+        # Change the score of a stock already in the heap and restore heap
+        # order: O(log n) once the position index exists
+        if self.positions is None:
+            self.positions = {stock: index for index, (_, stock) in enumerate(self.heap)}
+        index = self.positions.get(stock_data)
+        if index is None:
+            return False
+        old_score = self.heap[index][0]
+        self.heap[index] = (new_score, stock_data)
+        if new_score > old_score:
+            self.heapify_up(index)
+        else:
+            self.heapify_down(index)
+        return True
+    
+    def count_greater(self, score: float) -> int:
+        # Count entries scoring strictly higher than score
+        count = 0
+        stack = [0] if self.heap else []
+        while stack:
+            index = stack.pop()
+            if self.heap[index][0] > score:
+                count += 1
+                # Children can only be higher if their parent is higher
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(self.heap):
+                        stack.append(child)
+        return count
+    
     def get_size(self) -> int:
         return len(self.heap)
     
@@ -76,4 +137,5 @@ class MaxHeap:
         return len(self.heap) == 0
     
     def clear(self) -> None:
-        self.heap.clear() 
\ No newline at end of file
+        self.heap.clear()
+        self.positions = None 
\ No newline at end of file
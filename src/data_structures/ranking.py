@@ -0,0 +1,294 @@
+# Ranking backends for MyStok application
+#
+# Every ranking structure is driven through the same protocol:
+# build, top_k, descending, range, rank and update. Backends are looked up
+# by name in RANKING_BACKENDS so the interfaces and the performance
+# comparison never have to know which concrete structure they are using.
+
+import heapq
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from .stock import Stock
+from .max_heap import MaxHeap
+from .red_black_tree import RedBlackTree
+from .sorted_array import SortedArray
+from .b_tree import BTree
+
+
+class RankingBackend:
+    # Base class for ranking backends. Subclasses wrap one data structure
+    # and keep self.scores up to date so rank and update can find a stock.
+
+    name = "base"
+    label = "Ranking Backend"
+
+    def __init__(self):
+        self.scores: Dict[Stock, float] = {}
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        raise NotImplementedError
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        raise NotImplementedError
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        # Lazy stream of every entry, highest score first
+        raise NotImplementedError
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        # Stocks scoring within [min_score, max_score], highest first
+        raise NotImplementedError
+
+    def count_greater(self, score: float) -> int:
+        raise NotImplementedError
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        raise NotImplementedError
+
+    def rank(self, stock: Stock) -> Optional[int]:
+        # 1-based position of stock; ties share the better rank
+        score = self.scores.get(stock)
+        if score is None:
+            return None
+        return self.count_greater(score) + 1
+
+    def get_size(self) -> int:
+        return len(self.scores)
+
+
+class HeapRanking(RankingBackend):
+    name = "max_heap"
+    label = "Max Heap"
+
+    def __init__(self):
+        super().__init__()
+        self.heap = MaxHeap()
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        self.heap = MaxHeap()
+        self.heap.build_heap(scored_stocks)
+        self.scores = {stock: score for score, stock in scored_stocks}
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        return self.heap.get_top_k(k)
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        return self.heap.iter_descending()
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        result = [item for item in self.heap.heap if min_score <= item[0] <= max_score]
+        result.sort(key=lambda x: x[0], reverse=True)
+        return result
+
+    def count_greater(self, score: float) -> int:
+        return self.heap.count_greater(score)
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        if stock not in self.scores or not self.heap.update(stock, new_score):
+            return False
+        self.scores[stock] = new_score
+        return True
+
+
+class TreeRanking(RankingBackend):
+    name = "red_black_tree"
+    label = "Red-Black Tree"
+
+    def __init__(self):
+        super().__init__()
+        self.tree = RedBlackTree()
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        self.tree = RedBlackTree()
+        for score, stock in scored_stocks:
+            self.tree.insert(score, stock)
+        self.scores = {stock: score for score, stock in scored_stocks}
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        return self.tree.get_top_k(k)
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        return self.tree.iter_descending()
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        result = self.tree.get_stocks_in_range(min_score, max_score)
+        result.reverse()
+        return result
+
+    def count_greater(self, score: float) -> int:
+        return self.tree.count_greater(score)
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        old_score = self.scores.get(stock)
+        if old_score is None or not self.tree.delete(old_score, stock):
+            return False
+        self.tree.insert(new_score, stock)
+        self.scores[stock] = new_score
+        return True
+
+
+class SortedArrayRanking(RankingBackend):
+    name = "sorted_array"
+    label = "Sorted Array"
+
+    def __init__(self):
+        super().__init__()
+        self.array = SortedArray()
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        self.array = SortedArray()
+        self.array.build(scored_stocks)
+        self.scores = {stock: score for score, stock in scored_stocks}
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        return self.array.get_top_k(k)
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        return self.array.iter_descending()
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        return self.array.get_stocks_in_range(min_score, max_score)
+
+    def count_greater(self, score: float) -> int:
+        return self.array.count_greater(score)
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        old_score = self.scores.get(stock)
+        if old_score is None or not self.array.update(stock, old_score, new_score):
+            return False
+        self.scores[stock] = new_score
+        return True
+
+
+class BTreeRanking(RankingBackend):
+    name = "b_tree"
+    label = "B-Tree"
+
+    def __init__(self, order: int = 64):
+        super().__init__()
+        self.order = order
+        self.tree = BTree(order)
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        self.tree = BTree(self.order)
+        self.tree.build(scored_stocks)
+        self.scores = {stock: score for score, stock in scored_stocks}
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        return self.tree.get_top_k(k)
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        return self.tree.iter_descending()
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        return self.tree.get_stocks_in_range(min_score, max_score)
+
+    def count_greater(self, score: float) -> int:
+        return self.tree.count_greater(score)
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        old_score = self.scores.get(stock)
+        if old_score is None or not self.tree.delete(old_score, stock):
+            return False
+        self.tree.insert(new_score, stock)
+        self.scores[stock] = new_score
+        return True
+
+
+class SelectionRanking(RankingBackend):
+    # Keeps no ordered structure: build only records the scores and each
+    # query selects from them. top_k is a bounded-heap partial selection,
+    # O(n log k), so a one-off query does not pay O(n log n) to order
+    # entries it never reads.
+    name = "partial_select"
+    label = "Partial Selection"
+
+    def build(self, scored_stocks: List[Tuple[float, Stock]]) -> None:
+        self.scores = {stock: score for score, stock in scored_stocks}
+
+    def entries(self) -> Iterator[Tuple[float, Stock]]:
+        return ((score, stock) for stock, score in self.scores.items())
+
+    def top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        if k <= 0:
+            return []
+        return heapq.nlargest(k, self.entries(), key=itemgetter(0))
+
+    def descending(self) -> Iterator[Tuple[float, Stock]]:
+        # Sorted on the first read
+        yield from sorted(self.entries(), key=itemgetter(0), reverse=True)
+
+    def range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        result = [item for item in self.entries() if min_score <= item[0] <= max_score]
+        result.sort(key=itemgetter(0), reverse=True)
+        return result
+
+    def count_greater(self, score: float) -> int:
+        return sum(1 for value in self.scores.values() if value > score)
+
+    def update(self, stock: Stock, new_score: float) -> bool:
+        if stock not in self.scores:
+            return False
+        self.scores[stock] = new_score
+        return True
+
+
+def merge_top_k(streams: Iterable[Iterator[Tuple[float, Stock]]], k: int) -> List[Tuple[float, Stock]]:
+    # Top k of several descending streams by a lazy k-way merge: one heap
+    # entry per stream, so after each stream's first item the work is
+    # O(k log s). A stock found in more than one stream is kept once.
+    result: List[Tuple[float, Stock]] = []
+    if k <= 0:
+        return result
+    seen = set()
+    for score, stock in heapq.merge(*streams, key=itemgetter(0), reverse=True):
+        if stock in seen:
+            continue
+        seen.add(stock)
+        result.append((score, stock))
+        if len(result) == k:
+            break
+    return result
+
+
+RANKING_BACKENDS: Dict[str, Type[RankingBackend]] = {}
+# Not a backend of its own: resolved per query to the backend the
+# calibrated cost model predicts is fastest (scoring/backend_selection.py)
+AUTO_BACKEND = "auto"
+
+
+def register_backend(backend_class: Type[RankingBackend]) -> None:
+    RANKING_BACKENDS[backend_class.name] = backend_class
+
+
+def create_backend(name: str) -> RankingBackend:
+    if name not in RANKING_BACKENDS:
+        raise ValueError(f"Unknown ranking backend: {name}")
+    return RANKING_BACKENDS[name]()
+
+
+def get_backend_names() -> List[str]:
+    return list(RANKING_BACKENDS.keys())
+
+
+def get_backend_choices() -> List[str]:
+    # What a query may ask for: every backend, or auto
+    return get_backend_names() + [AUTO_BACKEND]
+
+
+def get_backend_label(name: str) -> str:
+    if name == AUTO_BACKEND:
+        return "Auto (Fastest Predicted)"
+    backend_class = RANKING_BACKENDS.get(name)
+    return backend_class.label if backend_class else name.replace("_", " ").title()
+
+
+def rank_top_k(name: str, scored_stocks: List[Tuple[float, Stock]], k: int = 10) -> List[Tuple[float, Stock]]:
+    # Build the named backend over scored_stocks and return its top k
+    backend = create_backend(name)
+    backend.build(scored_stocks)
+    return backend.top_k(k)
+
+
+for _backend in (HeapRanking, TreeRanking, SortedArrayRanking, BTreeRanking, SelectionRanking):
+    register_backend(_backend)
@@ -1,6 +1,6 @@
 # Red-Black Tree implementation for MyStok application
 
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 from .stock import Stock
 
 
@@ -137,15 +137,179 @@ class RedBlackTree:
         if node is None:
             return
 
-        if min_score < node.score:
+        # Equal scores can sit on either side of a node once rotations have
+        # moved them, so both bounds are inclusive when choosing subtrees
+        if min_score <= node.score:
             self.range_search_helper(node.left, min_score, max_score, result)
         
         if min_score <= node.score <= max_score:
             result.append((node.score, node.stock_data))
 
-        if max_score > node.score:
+        if max_score >= node.score:
             self.range_search_helper(node.right, min_score, max_score, result)
     
+    def get_top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        # Reverse in-order walk that stops after k nodes
+        result = []
+        stack = []
+        current = self.root
+        while (stack or current is not None) and len(result) < k:
+            while current is not None:
+                stack.append(current)
+                current = current.right
+            current = stack.pop()
+            result.append((current.score, current.stock_data))
+            current = current.left
+        return result
+    
+    def iter_descending(self) -> Iterator[Tuple[float, Stock]]:
+        # Lazy reverse in-order walk
+        stack = []
+        current = self.root
+        while stack or current is not None:
+            while current is not None:
+                stack.append(current)
+                current = current.right
+            current = stack.pop()
+            yield (current.score, current.stock_data)
+            current = current.left
+    
+    def count_greater(self, score: float) -> int:
+        # Count nodes scoring strictly higher than score
+        count = 0
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.score > score:
+                count += 1
+                if node.left is not None:
+                    stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        return count
+    
+    def find_node(self, score: float, stock_data: Stock) -> Optional[Node]:
+        # Equal scores can sit on either side after rotations, so check both
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if score < node.score:
+                if node.left is not None:
+                    stack.append(node.left)
+            elif score > node.score:
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                if node.stock_data is stock_data:
+                    return node
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+        return None
+    
+    def delete(self, score: float, stock_data: Stock) -> bool:
+        node = self.find_node(score, stock_data)
+        if node is None:
+            return False
+        
+        removed_color = node.color
+        if node.left is None:
+            child, child_parent = node.right, node.parent
+            self.transplant(node, node.right)
+        elif node.right is None:
+            child, child_parent = node.left, node.parent
+            self.transplant(node, node.left)
+        else:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            removed_color = successor.color
+            child = successor.right
+            if successor.parent == node:
+                child_parent = successor
+            else:
+                child_parent = successor.parent
+                self.transplant(successor, successor.right)
+                successor.right = node.right
+                successor.right.parent = successor
+            self.transplant(node, successor)
+            successor.left = node.left
+            successor.left.parent = successor
+            successor.color = node.color
+        
+        if removed_color == "BLACK":
+            self.fix_delete(child, child_parent)
+        
+        self.size -= 1
+        return True
+    
+    def transplant(self, old: Node, new: Optional[Node]):
+        if old.parent is None:
+            self.root = new
+        elif old == old.parent.left:
+            old.parent.left = new
+        else:
+            old.parent.right = new
+        if new is not None:
+            new.parent = old.parent
+    
+    def fix_delete(self, node: Optional[Node], parent: Optional[Node]):
+        # Leaves are None here, so the parent is tracked alongside the node
+        while node != self.root and (node is None or node.color == "BLACK"):
+            if node == parent.left:
+                sibling = parent.right
+                if sibling.color == "RED":
+                    sibling.color = "BLACK"
+                    parent.color = "RED"
+                    self.left_rotate(parent)
+                    sibling = parent.right
+                if self.is_black(sibling.left) and self.is_black(sibling.right):
+                    sibling.color = "RED"
+                    node = parent
+                    parent = node.parent
+                else:
+                    if self.is_black(sibling.right):
+                        sibling.left.color = "BLACK"
+                        sibling.color = "RED"
+                        self.right_rotate(sibling)
+                        sibling = parent.right
+                    sibling.color = parent.color
+                    parent.color = "BLACK"
+                    sibling.right.color = "BLACK"
+                    self.left_rotate(parent)
+                    node = self.root
+                    parent = None
+            else:
+                sibling = parent.left
+                if sibling.color == "RED":
+                    sibling.color = "BLACK"
+                    parent.color = "RED"
+                    self.right_rotate(parent)
+                    sibling = parent.left
+                if self.is_black(sibling.left) and self.is_black(sibling.right):
+                    sibling.color = "RED"
+                    node = parent
+                    parent = node.parent
+                else:
+                    if self.is_black(sibling.left):
+                        sibling.right.color = "BLACK"
+                        sibling.color = "RED"
+                        self.left_rotate(sibling)
+                        sibling = parent.left
+                    sibling.color = parent.color
+                    parent.color = "BLACK"
+                    sibling.left.color = "BLACK"
+                    self.right_rotate(parent)
+                    node = self.root
+                    parent = None
+        
+        if node is not None:
+            node.color = "BLACK"
+    
+    def is_black(self, node: Optional[Node]) -> bool:
+        return node is None or node.color == "BLACK"
+    
     def get_size(self) -> int:
         return self.size
     
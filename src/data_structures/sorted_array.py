@@ -0,0 +1,87 @@
+# Sorted array implementation for MyStok application
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Tuple
+from .stock import Stock
+
+
+class SortedArray:
+    # Keeps negated scores in ascending order so the highest score comes first.
+    # Scores and stock indices live in two parallel flat arrays; stocks are
+    # stored once in a table and referenced by index.
+
+    def __init__(self):
+        self.keys = array("d")
+        self.indices = array("l")
+        self.stocks: List[Stock] = []
+        self.stock_index: Dict[Stock, int] = {}
+
+    def build(self, items: List[Tuple[float, Stock]]) -> None:
+        self.stocks = [stock for _, stock in items]
+        self.stock_index = {stock: i for i, stock in enumerate(self.stocks)}
+        order = sorted(range(len(items)), key=lambda i: -items[i][0])
+        self.keys = array("d", (-items[i][0] for i in order))
+        self.indices = array("l", order)
+
+    def insert(self, score: float, stock_data: Stock) -> None:
+        index = self.stock_index.get(stock_data)
+        if index is None:
+            index = len(self.stocks)
+            self.stocks.append(stock_data)
+            self.stock_index[stock_data] = index
+
+        position = bisect_right(self.keys, -score)
+        self.keys.insert(position, -score)
+        self.indices.insert(position, index)
+
+    def remove(self, score: float, stock_data: Stock) -> bool:
+        index = self.stock_index.get(stock_data)
+        if index is None:
+            return False
+
+        # Only the run of equal keys has to be scanned
+        lo = bisect_left(self.keys, -score)
+        hi = bisect_right(self.keys, -score)
+        for position in range(lo, hi):
+            if self.indices[position] == index:
+                del self.keys[position]
+                del self.indices[position]
+                return True
+        return False
+
+    def update(self, stock_data: Stock, old_score: float, new_score: float) -> bool:
+        if not self.remove(old_score, stock_data):
+            return False
+        self.insert(new_score, stock_data)
+        return True
+
+    def get_top_k(self, k: int) -> List[Tuple[float, Stock]]:
+        if k <= 0:
+            return []
+        return [(-self.keys[i], self.stocks[self.indices[i]]) for i in range(min(k, len(self.keys)))]
+
+    def iter_descending(self) -> Iterator[Tuple[float, Stock]]:
+        for i in range(len(self.keys)):
+            yield (-self.keys[i], self.stocks[self.indices[i]])
+
+    def get_stocks_in_range(self, min_score: float, max_score: float) -> List[Tuple[float, Stock]]:
+        # Highest scores first
+        lo = bisect_left(self.keys, -max_score)
+        hi = bisect_right(self.keys, -min_score)
+        return [(-self.keys[i], self.stocks[self.indices[i]]) for i in range(lo, hi)]
+
+    def count_greater(self, score: float) -> int:
+        return bisect_left(self.keys, -score)
+
+    def get_size(self) -> int:
+        return len(self.keys)
+
+    def is_empty(self) -> bool:
+        return len(self.keys) == 0
+
+    def clear(self) -> None:
+        self.keys = array("d")
+        self.indices = array("l")
+        self.stocks = []
+        self.stock_index = {}
@@ -1,23 +1,52 @@
 # Stock data model for MyStok application
 
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 
 class Stock:
     # Represents a stock with its information
     
-    def __init__(self, ticker: str, brand_name: str, industry_tag: str, current_price: float, historical_data: List[float]):
-        # Initialize a Stock object
+    def __init__(self, ticker: str, brand_name: str, industry_tag: str, current_price: float, historical_data: List[float],
+                 dates: Optional[Sequence] = None):
+        # Initialize a Stock object. dates, when known, holds the trading day
+        # of each close in historical_data (a datetime64[D] array from the loader).
         self.ticker = ticker
         self.brand_name = brand_name
         self.industry_tag = industry_tag
         self.current_price = current_price
         self.historical_data = historical_data
+        self.dates = dates
         
         # Calculate metrics
         self.percent_change = self.calculate_percent_change()
         self.year_change = self.calculate_year_change()
     
+    def append_prices(self, prices: List[float], dates: Optional[Sequence] = None) -> None:
+        # Add new closes to the end of the history and refresh the metrics.
+        # Cached indicators go stale because the history length changes.
+        if not prices:
+            return
+        if self.dates is not None:
+            if dates is None or len(dates) != len(prices):
+                raise ValueError("Stock has dates; append_prices needs one date per price")
+            if hasattr(self.dates, "dtype"):
+                import numpy as np
+                self.dates = np.concatenate([self.dates, np.asarray(dates, dtype=self.dates.dtype)])
+            else:
+                self.dates = list(self.dates) + list(dates)
+        self.historical_data = list(self.historical_data) + list(prices)
+        self.current_price = self.historical_data[-1]
+        self.percent_change = self.calculate_percent_change()
+        self.year_change = self.calculate_year_change()
+    
+    def as_of(self, count: int) -> "Stock":
+        # This stock as it was after its first `count` closes
+        if count >= len(self.historical_data):
+            return self
+        dates = self.dates[:count] if self.dates is not None else None
+        return Stock(self.ticker, self.brand_name, self.industry_tag, self.historical_data[count - 1],
+                     self.historical_data[:count], dates)
+    
     def calculate_percent_change(self) -> float:
         # Calculate percent change for risk assessment
         if len(self.historical_data) < 2:
@@ -0,0 +1,173 @@
+# Pipeline stage instrumentation for MyStok application
+#
+# Stages are wrapped in PROFILER.span("name"). While profiling is off, span()
+# returns one shared do-nothing object, so instrumented code pays for a
+# single attribute check. When on, every span records its duration and any
+# counts attached to it (rows, stocks, ...), and the totals can be printed
+# as a stage breakdown or written as a Chrome trace (chrome://tracing).
+#
+# Enable with `python main.py --profile`, or set MYSTOK_PROFILE to "1", to a
+# .json path (trace) or to a .prof path (cProfile stats). Reports go to
+# stderr so they never mix with batch output on stdout.
+
+import atexit
+import cProfile
+import json
+import os
+import sys
+import threading
+from time import perf_counter_ns
+from typing import Dict, List, Any, Optional
+
+
+class NullSpan:
+    # Stand-in used while profiling is disabled
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add(self, name: str, amount: int = 1) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    # One timed run of a stage
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.counts: Dict[str, int] = {}
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self, perf_counter_ns() - self.start)
+        return False
+
+    def add(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+
+class Profiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.max_events = 100000
+        self.origin = perf_counter_ns()
+        self.lock = threading.Lock()
+        self.json_path: Optional[str] = None
+        self.cprofile_path: Optional[str] = None
+        self.cprofiler: Optional[cProfile.Profile] = None
+        self.print_report = True
+
+    def span(self, name: str):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, span: Span, duration_ns: int) -> None:
+        name = span.name
+        with self.lock:
+            stat = self.stats.setdefault(name, {"calls": 0, "total_ns": 0, "max_ns": 0, "counts": {}})
+            stat["calls"] += 1
+            stat["total_ns"] += duration_ns
+            stat["max_ns"] = max(stat["max_ns"], duration_ns)
+            for count_name, amount in span.counts.items():
+                stat["counts"][count_name] = stat["counts"].get(count_name, 0) + amount
+
+            if len(self.events) < self.max_events:
+                self.events.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": (span.start - self.origin) / 1000,
+                    "dur": duration_ns / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": dict(span.counts)
+                })
+
+    def enable(self, json_path: Optional[str] = None, cprofile_path: Optional[str] = None, print_report: bool = True) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        self.json_path = json_path
+        self.cprofile_path = cprofile_path
+        self.print_report = print_report
+        self.origin = perf_counter_ns()
+        if cprofile_path:
+            self.cprofiler = cProfile.Profile()
+            self.cprofiler.enable()
+        # The GUI leaves through sys.exit, so results are written at exit
+        atexit.register(self.finish)
+
+    def configure_from_env(self, variable: str = "MYSTOK_PROFILE") -> None:
+        value = os.environ.get(variable, "").strip()
+        if not value or value == "0":
+            return
+        if value.endswith(".json"):
+            self.enable(json_path=value)
+        elif value.endswith(".prof"):
+            self.enable(cprofile_path=value)
+        else:
+            self.enable()
+
+    def finish(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False
+
+        if self.cprofiler is not None:
+            self.cprofiler.disable()
+            self.cprofiler.dump_stats(self.cprofile_path)
+            print(f"cProfile stats written to {self.cprofile_path}", file=sys.stderr)
+            self.cprofiler = None
+        if self.json_path:
+            self.write_json(self.json_path)
+            print(f"Stage trace written to {self.json_path}", file=sys.stderr)
+        if self.print_report:
+            print(self.report(), file=sys.stderr)
+
+    def report(self) -> str:
+        # Stage breakdown, slowest first
+        if not self.stats:
+            return "\nPROFILE: no stages recorded"
+
+        lines = ["\nPROFILE (stage breakdown)",
+                 f"{'stage':<22}{'calls':>8}{'total ms':>12}{'max ms':>10}  counts"]
+        for name, stat in sorted(self.stats.items(), key=lambda x: x[1]["total_ns"], reverse=True):
+            counts = ", ".join(f"{key}={value}" for key, value in stat["counts"].items())
+            lines.append(f"{name:<22}{stat['calls']:>8}{stat['total_ns'] / 1e6:>12.2f}"
+                         f"{stat['max_ns'] / 1e6:>10.2f}  {counts}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        summary = {
+            name: {
+                "calls": stat["calls"],
+                "total_ms": stat["total_ns"] / 1e6,
+                "max_ms": stat["max_ns"] / 1e6,
+                "counts": stat["counts"]
+            }
+            for name, stat in self.stats.items()
+        }
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "stages": summary}, f, indent=1)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = {}
+            self.events = []
+
+
+PROFILER = Profiler()
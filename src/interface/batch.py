@@ -0,0 +1,194 @@
+# Non-interactive batch interface for MyStok application
+#
+# Loads the dataset once and answers any number of queries against it.
+# Queries come from command-line flags (one query) or from a file of many:
+#   CSV with a header row:  id,risk,time,sector,structure,top_k,max_correlation,as_of,monte_carlo
+#   JSON lines:             {"id": "a1", "risk": "low", "time": "long", "sector": "energy"}
+# Only risk, time and sector are required. sector may list several sectors
+# ("energy,finance") or be "all" for the whole market. max_correlation turns on
+# diversified selection; as_of (YYYY-MM-DD) scores the stocks as they stood
+# on that date; monte_carlo (true/1) scores risk by simulated horizon losses
+# and adds value_at_risk and prob_loss to each stock. Results stream to
+# stdout or a file as JSON lines (one object per query) or CSV (one row per
+# stock).
+
+import csv
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+from ..data_structures.ranking import get_backend_choices
+from ..data_processing.snapshot import SnapshotStore
+
+CSV_FIELDS = [
+    "id", "risk", "time", "sector", "structure", "max_correlation", "as_of", "monte_carlo", "rank", "ticker", "brand_name",
+    "industry", "score", "certainty", "current_price", "percent_change", "year_change", "value_at_risk", "prob_loss", "error"
+]
+
+
+def read_queries(path: str) -> Iterator[Any]:
+    # Yield queries from a CSV or JSON-lines file. A JSON line is yielded as
+    # the text it was, and decoded with the rest of the query's validation,
+    # so one bad line fails that query and not the whole batch.
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".json", ".ndjson")):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+        else:
+            for row in csv.DictReader(f):
+                yield {key.strip(): value.strip() for key, value in row.items() if key and value}
+
+
+def normalize_query(query: Any, index: int, default_structure: str, default_top_k: int) -> Dict[str, Any]:
+    # sector may list several sectors ("energy,finance", or a JSON list) or be "all"
+    if not isinstance(query, dict):
+        raise ValueError(f"expected an object, got {type(query).__name__}")
+    sector = query.get("sector", "")
+    return {
+        "id": str(query.get("id", index)),
+        "risk": str(query.get("risk", "")).lower(),
+        "time": str(query.get("time", "")).lower(),
+        "sector": sector.lower() if isinstance(sector, str) else ",".join(str(name) for name in sector).lower(),
+        "structure": str(query.get("structure") or default_structure),
+        "top_k": parse_count(query.get("top_k"), default_top_k, "top_k"),
+        "max_correlation": float(query["max_correlation"]) if query.get("max_correlation") not in (None, "") else None,
+        "as_of": str(query["as_of"]) if query.get("as_of") not in (None, "") else None,
+        "monte_carlo": parse_flag(query.get("monte_carlo"))
+    }
+
+
+def parse_count(value: Any, default: int, name: str) -> int:
+    # A positive whole number, or default when the field is left out
+    count = default if value in (None, "") else int(value)
+    if count < 1:
+        raise ValueError(f"{name} must be at least 1, got {count}")
+    return count
+
+
+def parse_flag(value: Any) -> bool:
+    # true/false from JSON, or yes/no, 1/0, on/off from CSV and query strings
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("", "0", "false", "no", "off"):
+            return False
+        if value in ("1", "true", "yes", "on"):
+            return True
+        raise ValueError(f"expected true or false, got {value!r}")
+    return bool(value)
+
+
+class BatchRunner:
+
+    def __init__(self, csv_path: str, default_structure: str = "max_heap", default_top_k: int = 10):
+        self.csv_path = csv_path
+        self.default_structure = default_structure
+        self.default_top_k = default_top_k
+        self.store = SnapshotStore()
+
+    def load(self) -> bool:
+        snapshot = self.store.ingest(self.csv_path)
+        if snapshot is None:
+            print("Error: No stock data loaded. Please check the CSV file.", file=sys.stderr)
+            return False
+        print(f"Loaded {len(snapshot.stocks)} stocks (version {snapshot.version}).", file=sys.stderr)
+        return True
+
+    def answer(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        # One result object per query; errors are reported, not raised.
+        # The whole query reads from one snapshot even if a reload lands midway.
+        result = dict(query)
+        snapshot = self.store.current()
+        result["version"] = snapshot.version
+        try:
+            snapshot.recommender.validate(query["risk"], query["time"], query["sector"])
+            if query["structure"] not in get_backend_choices():
+                raise ValueError(f"Unknown structure: {query['structure']}")
+            recommendations = snapshot.recommender.recommend(
+                query["risk"], query["time"], query["sector"], query["structure"], query["top_k"], query["max_correlation"],
+                query["as_of"], query["monte_carlo"]
+            )
+        except ValueError as x:
+            result["error"] = str(x)
+            result["recommendations"] = []
+            return result
+
+        result["certainty"] = recommendations[0][2] if recommendations else 0.0
+        result["recommendations"] = [
+            {
+                "rank": rank,
+                "ticker": stock.ticker,
+                "brand_name": stock.brand_name,
+                "industry": stock.industry_tag,
+                "score": round(score, 4),
+                "current_price": stock.current_price,
+                "percent_change": round(stock.percent_change, 4),
+                "year_change": round(stock.year_change, 4)
+            }
+            for rank, (score, stock, _) in enumerate(recommendations, 1)
+        ]
+        if query["monte_carlo"]:
+            risk = snapshot.recommender.get_monte_carlo_risk(query["time"])
+            for row, (_, stock, _) in zip(result["recommendations"], recommendations):
+                figures = risk.lookup(stock)
+                row["value_at_risk"] = round(figures["var"], 4) if figures else None
+                row["prob_loss"] = round(figures["prob_loss"], 4) if figures else None
+        return result
+
+    def run(self, queries: Iterable[Dict[str, Any]], out: TextIO, output_format: str = "jsonl") -> int:
+        # Stream answers as they are produced; returns the number of failed queries
+        failures = 0
+        writer = None
+        if output_format == "csv":
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+
+        for index, raw_query in enumerate(queries, 1):
+            try:
+                if isinstance(raw_query, str):
+                    raw_query = json.loads(raw_query)
+                query = normalize_query(raw_query, index, self.default_structure, self.default_top_k)
+            except (TypeError, ValueError) as x:
+                # A line that is not JSON (json.JSONDecodeError) fails here too
+                query_id = raw_query.get("id", index) if isinstance(raw_query, dict) else index
+                result = {"id": str(query_id), "error": f"Invalid query: {x}", "recommendations": []}
+            else:
+                result = self.answer(query)
+            if "error" in result:
+                failures += 1
+
+            if writer is None:
+                out.write(json.dumps(result) + "\n")
+            else:
+                self.write_csv_rows(writer, result)
+        out.flush()
+        return failures
+
+    def write_csv_rows(self, writer: csv.DictWriter, result: Dict[str, Any]) -> None:
+        base = {key: result.get(key, "") for key in ("id", "risk", "time", "sector", "structure", "max_correlation", "as_of", "monte_carlo")}
+        if not result["recommendations"]:
+            writer.writerow({**base, "error": result.get("error", "no recommendations")})
+            return
+        for row in result["recommendations"]:
+            writer.writerow({**base, **row, "certainty": round(result["certainty"], 4)})
+
+
+def run_batch(csv_path: str, queries: List[Dict[str, Any]], query_file: Optional[str], output_path: Optional[str],
+              output_format: str, structure: str, top_k: int) -> int:
+    # Entry point used by main.py; returns a process exit code
+    runner = BatchRunner(csv_path, structure, top_k)
+    if not runner.load():
+        return 1
+
+    source = read_queries(query_file) if query_file else queries
+    out = open(output_path, "w", newline="") if output_path else sys.stdout
+    try:
+        failures = runner.run(source, out, output_format)
+    finally:
+        if output_path:
+            out.close()
+
+    if failures:
+        print(f"{failures} quer{'y' if failures == 1 else 'ies'} failed.", file=sys.stderr)
+        return 1
+    return 0
@@ -2,27 +2,68 @@
 #Terminal interface for MyStok application.
 
 import sys
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from ..data_processing.data_loader import DataLoader
 from ..data_processing.sector_grouper import SectorGrouper
-from ..data_structures.red_black_tree import RedBlackTree
-from ..data_structures.max_heap import MaxHeap
-from ..scoring.stock_scorer import StockScorer
+from ..data_structures.ranking import get_backend_choices, get_backend_label
+from ..data_processing.snapshot import SnapshotStore
+from ..data_processing.price_panel import to_day
+from ..scoring.recommender import Recommender, RISK_PROFILES, TIME_INVESTMENTS, SECTORS, ALL_SECTORS, parse_sectors
 from ..scoring.performance_comparison import PerformanceComparator
+from ..scoring.similarity import WINDOW_DAYS
+from ..scoring.sector_aggregates import RELATIVE_STRENGTH_DAYS
+from ..scoring.monte_carlo import CONFIDENCE
 from ..data_structures.stock import Stock
 
 
+SESSION_HELP = """
+Session commands (change one setting and the query reruns):
+  risk low|medium|high            time short|medium|long
+  sector NAME[,NAME...]|all       structure NAME|compare
+  diversify CAP|off   skip stocks whose returns correlate above CAP with a pick
+  asof YYYY-MM-DD|off score the stocks as they stood on that date
+  montecarlo on|off   score risk by simulated losses over the time horizon
+  similar N|TICKER [K]  stocks whose last year's price path moves most like
+                      recommendation N (or TICKER); K of them, 5 by default
+  run        rerun the current query
+  params     show the current settings
+  summary    show the data summary
+  sectors    sector overview: average score for the current profile, index returns
+  history    list earlier queries; 'show N' prints query N again
+  help       show this list;  quit  leave the session
+Leave the value off (e.g. 'sector') to pick from the menu."""
+
+def sector_label(sector: str) -> str:
+    # "energy" -> "Energy sector", "energy,finance" -> "Energy, Finance sectors", "all" -> "All Sectors"
+    if sector == ALL_SECTORS:
+        return "All Sectors"
+    names = [name.replace("_", " ").title() for name in sector.split(",")]
+    return f"{', '.join(names)} sector{'s' if len(names) > 1 else ''}"
+
+
+# Query key: (dataset version, risk, time, sector, structure, correlation cap, as-of date, Monte Carlo risk)
+QueryKey = Tuple[int, str, str, str, str, Optional[float], Optional[str], bool]
+
+
 class MyStokCLI:
     # Terminal-based user interface for MyStok application
     
-    def __init__(self, csv_path: str = "resources/World-Stock-Prices-Dataset.csv"):
-        # Make CLI
+    def __init__(self, csv_path: str = "resources/World-Stock-Prices-Dataset.csv", store: Optional[SnapshotStore] = None):
+        # Make CLI. Passing the store of an interface that already loaded the
+        # data (the GUI) reuses its snapshot, sector index and caches.
         self.data_loader = DataLoader(csv_path)
         self.sector_grouper = SectorGrouper()
-        self.red_black_tree = RedBlackTree()
-        self.max_heap = MaxHeap()
+        self.store = store if store is not None else SnapshotStore()
         self.performance_comparator = PerformanceComparator()
-        self.stocks = []
+        
+        # Session state: answers by query key, and the order they were asked in
+        self.results: Dict[QueryKey, Any] = {}
+        self.history: List[QueryKey] = []
+    
+    @property
+    def stocks(self) -> Tuple[Stock, ...]:
+        # Stocks of the current dataset snapshot
+        return self.store.stocks()
     
     def run(self) -> None:
         # Main application loop
@@ -31,34 +72,245 @@ class MyStokCLI:
         print("Members: James Jean Philipe, Ignatius Martin, Anay Patel")
         
         try:
-            # Load data
-            print("\nLoading stock data...")
-            self.stocks = self.data_loader.load_stocks()
-            
+            # Load data unless it was handed over already
             if not self.stocks:
-                print("Error: No stock data loaded. Please check the CSV file.")
-                return
+                print("\nLoading stock data...")
+                stocks = self.data_loader.load_stocks()
+                
+                if not stocks:
+                    print("Error: No stock data loaded. Please check the CSV file.")
+                    return
+                
+                self.store.publish(stocks, self.data_loader.get_data_summary())
             
             print(f"Successfully loaded {len(self.stocks)} stocks.")
             
             # Get user inputs
-            risk_profile = self.get_risk_profile()
-            time_investment = self.get_time_investment()
-            sector_preference = self.get_sector_preference()
-            data_structure_choice = self.get_data_structure_choice()
+            params = {
+                "risk": self.get_risk_profile(),
+                "time": self.get_time_investment(),
+                "sector": self.get_sector_preference(),
+                "structure": self.get_data_structure_choice(),
+                "diversify": None,
+                "as_of": None,
+                "monte_carlo": False
+            }
             
-            # Process and display recommendations 
-            if data_structure_choice == "compare":
-                self.compare_performance(risk_profile, time_investment, sector_preference)
-            else:
-                recommendations = self.get_recommendations(risk_profile, time_investment, sector_preference, data_structure_choice)
-                self.display_recommendations(recommendations, data_structure_choice)
+            # Process and display recommendations, then keep the session open
+            # so further queries reuse the loaded data and built results
+            self.answer(params)
+            self.run_session(params)
             
         except KeyboardInterrupt:
             print("\n\nApplication interrupted by user.")
         except Exception as e:
             print(f"\nError: {e}")
     
+    def run_session(self, params: Dict[str, Any]) -> None:
+        # Read commands until quit or end of input
+        print(SESSION_HELP)
+        while True:
+            try:
+                line = input("\nmystok> ").strip()
+            except (EOFError, KeyboardInterrupt):
+                print()
+                return
+            
+            command, _, value = line.partition(" ")
+            command = command.lower()
+            value = value.strip().lower().replace(" ", "_")
+            if not command:
+                continue
+            elif command in ("quit", "exit", "q"):
+                return
+            elif command == "help":
+                print(SESSION_HELP)
+            elif command == "run":
+                self.answer(params)
+            elif command == "params":
+                print(self.describe(params))
+            elif command == "summary":
+                self.show_data_summary()
+            elif command == "sectors":
+                self.show_sector_overview(params)
+            elif command == "history":
+                self.show_history()
+            elif command == "show":
+                self.show_history_entry(value)
+            elif command == "diversify":
+                self.set_diversify(params, value)
+            elif command == "asof":
+                self.set_as_of(params, value)
+            elif command == "montecarlo":
+                self.set_monte_carlo(params, value)
+            elif command == "similar":
+                self.show_similar(line.split()[1:])
+            elif command in params:
+                choice = self.parse_setting(command, value)
+                if choice is not None:
+                    params[command] = choice
+                    self.answer(params)
+            else:
+                print(f"Unknown command '{command}'. Type 'help' for the list.")
+    
+    def get_setting_options(self, setting: str) -> List[str]:
+        if setting == "risk":
+            return RISK_PROFILES
+        if setting == "time":
+            return TIME_INVESTMENTS
+        if setting == "sector":
+            return SECTORS + [ALL_SECTORS]
+        return get_backend_choices() + ["compare"]
+    
+    def parse_setting(self, setting: str, value: str) -> Optional[str]:
+        # A name, its number in the menu, or nothing to show the menu
+        if not value:
+            prompts = {
+                "risk": self.get_risk_profile,
+                "time": self.get_time_investment,
+                "sector": self.get_sector_preference,
+                "structure": self.get_data_structure_choice
+            }
+            return prompts[setting]()
+        
+        options = self.get_setting_options(setting)
+        if setting == "sector" and "," in value:
+            try:
+                return ",".join(parse_sectors(value))
+            except ValueError as x:
+                print(f"{x}. Choose from: {', '.join(options)}")
+                return None
+        if value.isdigit() and 1 <= int(value) <= len(options):
+            return options[int(value) - 1]
+        if value in options:
+            return value
+        print(f"Unknown {setting} '{value}'. Choose from: {', '.join(options)}")
+        return None
+    
+    def set_diversify(self, params: Dict[str, Any], value: str) -> None:
+        if value in ("off", "none"):
+            cap = None
+        else:
+            try:
+                cap = float(value)
+                self.get_recommender().validate_max_correlation(cap)
+            except ValueError:
+                print("Usage: diversify CAP (a correlation between -1 and 1, e.g. 0.6) or diversify off")
+                return
+        params["diversify"] = cap
+        self.answer(params)
+    
+    def set_as_of(self, params: Dict[str, Any], value: str) -> None:
+        if value in ("off", "none", "latest"):
+            params["as_of"] = None
+        else:
+            try:
+                to_day(value)
+            except ValueError:
+                print("Usage: asof YYYY-MM-DD or asof off")
+                return
+            params["as_of"] = value
+        self.answer(params)
+    
+    def set_monte_carlo(self, params: Dict[str, Any], value: str) -> None:
+        if value not in ("on", "off"):
+            print("Usage: montecarlo on|off")
+            return
+        params["monte_carlo"] = value == "on"
+        self.answer(params)
+    
+    def show_similar(self, args: List[str]) -> None:
+        # Peers by price trajectory of a ticker, or of a stock in the last answer
+        if not args or len(args) > 2 or (len(args) == 2 and not args[1].isdigit()):
+            print("Usage: similar N|TICKER [K], where N is a rank in the last recommendations")
+            return
+        ticker = args[0]
+        if ticker.isdigit():
+            last = self.results.get(self.history[-1]) if self.history and self.history[-1][4] != "compare" else None
+            if not last or not 1 <= int(ticker) <= len(last):
+                print(f"No recommendation number {ticker} in the last answer.")
+                return
+            ticker = last[int(ticker) - 1][1].ticker
+        k = int(args[1]) if len(args) == 2 else 5
+        
+        try:
+            peers = self.get_recommender().similar_stocks(ticker, k)
+        except ValueError as x:
+            print(f"Error: {x}")
+            return
+        print(f"\nSTOCKS MOVING LIKE {ticker.upper()} (last {WINDOW_DAYS} trading days)")
+        if not peers:
+            print("No other stocks have enough history to compare.")
+        for i, (similarity, stock) in enumerate(peers, 1):
+            print(f"{i}. {stock.brand_name} ({stock.ticker}) - correlation {similarity:.2f}, {stock.industry_tag}")
+    
+    def describe(self, params: Dict[str, Any]) -> str:
+        structure = params["structure"]
+        label = "Compare Performance" if structure == "compare" else get_backend_label(structure)
+        diversify = "off" if params["diversify"] is None else f"correlation <= {params['diversify']}"
+        as_of = params["as_of"] or "latest"
+        monte_carlo = "on" if params["monte_carlo"] else "off"
+        return (f"risk={params['risk']}, time={params['time']}, sector={params['sector']}, structure={label}, diversify={diversify}, "
+                f"as of={as_of}, monte carlo={monte_carlo}")
+    
+    def answer(self, params: Dict[str, Any]) -> None:
+        # Run a query, or print the earlier answer when nothing has changed
+        version = self.store.current().version
+        key = (version, params["risk"], params["time"], params["sector"], params["structure"], params["diversify"], params["as_of"],
+               params["monte_carlo"])
+        self.history.append(key)
+        if key in self.results:
+            print(f"\nSame inputs as query {self.history.index(key) + 1}; showing the earlier result.")
+            self.display_result(key, self.results[key])
+            return
+        
+        if params["structure"] == "compare":
+            self.results[key] = self.compare_performance(params["risk"], params["time"], params["sector"])
+        else:
+            try:
+                recommendations = self.get_recommendations(params["risk"], params["time"], params["sector"], params["structure"],
+                                                           params["diversify"], params["as_of"], params["monte_carlo"])
+            except ValueError as x:
+                self.history.pop()
+                print(f"Error: {x}")
+                return
+            self.results[key] = recommendations
+            self.display_recommendations(recommendations, params["structure"], params["sector"],
+                                         params["time"] if params["monte_carlo"] else None)
+    
+    def display_result(self, key: QueryKey, result: Any) -> None:
+        structure = key[4]
+        if structure == "compare":
+            print(self.performance_comparator.get_performance_summary(result))
+            if "error" not in result:
+                self.display_comparison_results(result)
+        else:
+            self.display_recommendations(result, structure, key[3], key[2] if key[7] else None)
+    
+    def show_history(self) -> None:
+        if not self.history:
+            print("No queries yet.")
+            return
+        print("\nQUERY HISTORY")
+        for i, key in enumerate(self.history, 1):
+            _, risk, time, sector, structure, cap, as_of, monte_carlo = key
+            result = self.results.get(key)
+            if structure == "compare":
+                outcome = "comparison" if result and "error" not in result else "no data"
+            else:
+                outcome = f"top: {result[0][1].ticker}" if result else "no recommendations"
+            diversify = f", diversify={cap}" if cap is not None and structure != "compare" else ""
+            diversify += f", as of={as_of}" if as_of is not None and structure != "compare" else ""
+            diversify += ", monte carlo" if monte_carlo and structure != "compare" else ""
+            print(f"{i}. risk={risk}, time={time}, sector={sector}, structure={structure}{diversify} ({outcome})")
+    
+    def show_history_entry(self, value: str) -> None:
+        if not value.isdigit() or not 1 <= int(value) <= len(self.history):
+            print(f"Usage: show N, where N is between 1 and {len(self.history)}.")
+            return
+        key = self.history[int(value) - 1]
+        self.display_result(key, self.results[key])
+    
     def get_risk_profile(self) -> str:
         # Get user risk profile preference
         print("\nRisk Profile:")
@@ -108,9 +360,11 @@ class MyStokCLI:
             "food", "entertainment", "energy", "consumer_goods", "real_estate"
         ]
         
+        sectors.append(ALL_SECTORS)
+        
         print("\nSector Preference:")
         for i, sector in enumerate(sectors, 1):
-            print(f"{i}. {sector.title()}")
+            print(f"{i}. {sector_label(sector)}")
         
         while True:
             try:
@@ -127,71 +381,84 @@ class MyStokCLI:
     
     def get_data_structure_choice(self) -> str:
         # Get user data structure preference
+        descriptions = {
+            "max_heap": "Efficient for retrieving top k elements",
+            "red_black_tree": "Efficient for range queries and balanced operations",
+            "sorted_array": "Flat parallel arrays searched with bisect",
+            "b_tree": "Wide-fanout tree with few levels to walk",
+            "partial_select": "Selects the top k straight from the scores, nothing kept in order",
+            "auto": "Whichever of these is predicted fastest for the query on this machine"
+        }
+        choices = get_backend_choices() + ["compare"]
+        
         print("\nData Structure Selection:")
-        print("1. Use Max Heap - Efficient for retrieving top k elements")
-        print("2. Use Red-Black Tree - Efficient for range queries and balanced operations")
-        print("3. Compare Performance - Test both data structures and show performance metrics")
+        for i, name in enumerate(choices, 1):
+            if name == "compare":
+                print(f"{i}. Compare Performance - Test all data structures and show performance metrics")
+            else:
+                print(f"{i}. Use {get_backend_label(name)} - {descriptions.get(name, 'Ranking backend')}")
         
         while True:
             try:
-                choice = input("Enter your choice (1-3): ").strip()
-                if choice == "1":
-                    return "max_heap"
-                elif choice == "2":
-                    return "red_black_tree"
-                elif choice == "3":
-                    return "compare"
+                choice = input(f"Enter your choice (1-{len(choices)}): ").strip()
+                choice_num = int(choice)
+                if 1 <= choice_num <= len(choices):
+                    return choices[choice_num - 1]
                 else:
-                    print("Invalid choice. Please enter 1, 2, or 3.")
+                    print(f"Please enter a number between 1 and {len(choices)}.")
+            except ValueError:
+                print("Please enter a valid number.")
             except KeyboardInterrupt:
                 sys.exit(0)
     
-    def get_recommendations(self, risk_profile: str, time_investment: str, sector_preference: str, data_structure: str) -> List[Tuple[float, Stock, float]]:
+    def get_recommendations(self, risk_profile: str, time_investment: str, sector_preference: str, data_structure: str,
+                            max_correlation: Optional[float] = None, as_of: Optional[str] = None,
+                            monte_carlo: bool = False) -> List[Tuple[float, Stock, float]]:
         # Get stock recommendations based on user preferences
-        print(f"\nAnalyzing stocks for {sector_preference.title()} sector using {data_structure.replace('_', ' ').title()}...")
+        print(f"\nAnalyzing stocks for {sector_label(sector_preference)} using {get_backend_label(data_structure)}...")
         
-        # Create scorer with user preferences
-        scorer = StockScorer(risk_profile, time_investment, sector_preference)
-        
-        # Filter stocks by sector
-        sector_stocks = scorer.filter_by_sector(self.stocks)
-        
-        if not sector_stocks:
-            return []
-        
-        # Score all stocks
-        scored_stocks = scorer.score_stocks(sector_stocks)
-        
-        # Use selected data structure
-        if data_structure == "max_heap":
-            recommendations = self.get_recommendations_using_heap(scored_stocks)
-        else:  # red_black_tree
-            recommendations = self.get_recommendations_using_tree(scored_stocks)
-        
-        if not recommendations:
-            return []
-        
-        # Calculate certainty percentage
-        certainty = scorer.calculate_certainty(recommendations)
-        
-        # Add certainty to each recommendation
-        result = [(score, stock, certainty) for score, stock in recommendations]
-        
-        return result
+        # Filter, score and rank with the selected data structure
+        return self.get_recommender().recommend(risk_profile, time_investment, sector_preference, data_structure,
+                                                max_correlation=max_correlation, as_of=as_of, monte_carlo=monte_carlo)
+    
+    def get_recommender(self) -> Recommender:
+        # Recommender of the current snapshot; its caches live with that version
+        return self.store.current().recommender
     
-    def display_recommendations(self, recommendations: List[Tuple[float, Stock, float]], data_structure: str = "unknown") -> None:
-        # Display recommendations with certainty percentages
+    def show_sector_overview(self, params: Dict[str, Any]) -> None:
+        # Per-sector figures, precomputed once per dataset version
+        overview = self.get_recommender().get_sector_aggregates().overview
+        profile = f"{params['risk']}/{params['time']}"
+        
+        def percent(value: Optional[float]) -> str:
+            return f"{value:+.2f}%" if value is not None else "n/a"
+        
+        print(f"\nSECTOR OVERVIEW (average score for risk={params['risk']}, time={params['time']})")
+        print(f"{'Sector':<16}{'Stocks':>8}{'Avg Score':>11}{'Med Yr Chg':>12}{'Index 1M':>11}{'Index 1Y':>11}")
+        for sector, row in overview.items():
+            score = row["average_scores"][profile]
+            score_text = f"{score:.1f}" if score is not None else "n/a"
+            year_text = f"${row['median_year_change']:.2f}" if row["median_year_change"] is not None else "n/a"
+            print(f"{sector.replace('_', ' ').title():<16}{row['stocks']:>8}{score_text:>11}{year_text:>12}"
+                  f"{percent(row['return_1m']):>11}{percent(row['return_1y']):>11}")
+    
+    def display_recommendations(self, recommendations: List[Tuple[float, Stock, float]], data_structure: str = "unknown",
+                                sector: Optional[str] = None, monte_carlo_time: Optional[str] = None) -> None:
+        # Display recommendations with certainty percentages; with
+        # monte_carlo_time, also the simulated risk over that horizon
         if not recommendations:
             print("\nNo recommendations found for the selected criteria.")
             print("Try selecting a different sector or adjusting your preferences.")
             return
         
-        print(f"\nTOP STOCK RECOMMENDATIONS ({data_structure.replace('_', ' ').title()})")
+        print(f"\nTOP STOCK RECOMMENDATIONS ({get_backend_label(data_structure)})")
         
         # Display certainty percentage
         certainty = recommendations[0][2] if recommendations else 0.0
         print(f"Overall Certainty: {certainty:.1f}%")
         
+        aggregates = self.get_recommender().get_sector_aggregates() if sector else None
+        simulated = self.get_recommender().get_monte_carlo_risk(monte_carlo_time) if monte_carlo_time else None
         for i, (score, stock, _) in enumerate(recommendations, 1):
             print(f"\n{i}. {stock.brand_name} ({stock.ticker})")
             print(f"   Score: {score:.1f}/100")
@@ -200,12 +467,24 @@ class MyStokCLI:
             print(f"   Risk Metrics:")
             print(f"     - Percent Change: {stock.percent_change:.2f}%")
             print(f"     - Year Change: ${stock.year_change:.2f}")
+            stock_sector = sector if sector in SECTORS else aggregates.sector_of(stock) if aggregates else None
+            relative = aggregates.relative_strength(stock, stock_sector) if stock_sector else None
+            if relative is not None:
+                print(f"     - vs Sector ({RELATIVE_STRENGTH_DAYS} days): {relative:+.2f}%")
+            figures = simulated.lookup(stock) if simulated else None
+            if figures:
+                print(f"     - {CONFIDENCE:.0%} VaR ({simulated.horizon} days): {figures['var']:.2f}%, "
+                      f"chance of loss {figures['prob_loss']:.0%}")
         
         print("\nRECOMMENDATION INTERPRETATION")
         print("- Higher scores indicate better alignment with your preferences")
         print("- Certainty percentage reflects confidence in recommendations")
         print("- Percent Change shows recent price volatility")
         print("- Year Change indicates long-term performance")
+        if aggregates:
+            print("- vs Sector is the return over the period minus the sector's equal-weighted index")
+        if simulated:
+            print(f"- VaR is the loss over the horizon exceeded on only {1 - CONFIDENCE:.0%} of {simulated.paths} simulated paths")
         
         # Provide investment advice based on certainty
         if certainty >= 80:
@@ -215,41 +494,9 @@ class MyStokCLI:
         else:
             print("\n🔴 LOW CONFIDENCE: Consider waiting or adjusting your preferences.")
     
-    def get_recommendations_using_heap(self, scored_stocks: List[Tuple[float, Stock]]) -> List[Tuple[float, Stock]]:
-        # Get recommendations using Max Heap data structure
-        # Clear and rebuild heap
-        self.max_heap = MaxHeap()
-        
-        # Insert all stocks into heap
-        for score, stock in scored_stocks:
-            self.max_heap.insert(score, stock)
-        
-        # Get top 10 recommendations
-        return self.max_heap.get_top_k(10)
-    
-    def get_recommendations_using_tree(self, scored_stocks: List[Tuple[float, Stock]]) -> List[Tuple[float, Stock]]:
-        # Get recommendations using Red-Black Tree data structure
-        # Clear and rebuild tree
-        self.red_black_tree = RedBlackTree()
-        
-        # Insert all stocks into tree
-        for score, stock in scored_stocks:
-            self.red_black_tree.insert(score, stock)
-        
-        # Get top 10 recommendations using range query
-        if scored_stocks:
-            max_score = max(score for score, _ in scored_stocks)
-            min_score = max_score - 100  # Get a wide range to ensure we get top 10
-            top_stocks = self.red_black_tree.get_stocks_in_range(min_score, max_score)
-            # Sort by score and take top 10
-            top_stocks.sort(key=lambda x: x[0], reverse=True)
-            return top_stocks[:10]
-        else:
-            return []
-    
-    def compare_performance(self, risk_profile: str, time_investment: str, sector_preference: str) -> None:
-        # Compare performance between Red-Black Tree and Max Heap data structures
-        print(f"\nComparing performance for {sector_preference.title()} sector...")
+    def compare_performance(self, risk_profile: str, time_investment: str, sector_preference: str) -> Dict[str, Any]:
+        # Compare performance between the ranking backends
+        print(f"\nComparing performance for {sector_label(sector_preference)}...")
         
         # Run performance comparison
         results = self.performance_comparator.compare_performance(
@@ -263,25 +510,18 @@ class MyStokCLI:
         # Display recommendations from both data structures
         if "error" not in results:
             self.display_comparison_results(results)
+        return results
     
     def display_comparison_results(self, results: Dict[str, Any]) -> None:
-        # Display comparison results from both data structures
-        rb_results = results["red_black_tree"]
-        heap_results = results["max_heap"]
-        
+        # Display comparison results from every backend
         print("\nRECOMMENDATIONS COMPARISON")
         
-        # Display Red-Black Tree recommendations
-        print("\nRed-Black Tree Recommendations:")
-        for i, (score, stock) in enumerate(rb_results["top_stocks"][:5], 1):
-            print(f"{i}. {stock.brand_name} ({stock.ticker}) - Score: {score:.1f}")
-        
-        # Display Max Heap recommendations
-        print("\nMax Heap Recommendations:")
-        for i, (score, stock) in enumerate(heap_results["top_stocks"][:5], 1):
-            print(f"{i}. {stock.brand_name} ({stock.ticker}) - Score: {score:.1f}")
+        for result in results["backends"].values():
+            print(f"\n{result['label']} Recommendations:")
+            for i, (score, stock) in enumerate(result["top_stocks"][:5], 1):
+                print(f"{i}. {stock.brand_name} ({stock.ticker}) - Score: {score:.1f}")
         
-        print("\nNote: Both data structures should produce the same top recommendations")
+        print("\nNote: All data structures should produce the same top recommendations")
         print("Performance differences are in insertion and query times.")
     
     def show_data_summary(self) -> None:
@@ -290,8 +530,9 @@ class MyStokCLI:
             print("No data loaded.")
             return
         
-        summary = self.data_loader.get_data_summary()
-        sector_stats = self.sector_grouper.get_sector_statistics(self.stocks)
+        snapshot = self.store.current()
+        summary = snapshot.data_summary
+        sector_stats = snapshot.recommender.get_sector_aggregates().category_counts
         
         print("\nDATA SUMMARY")
         print(f"Total Stocks: {len(self.stocks)}")
@@ -1,14 +1,53 @@
 import pygame
 import sys
-from typing import List, Tuple, Dict, Any
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional
 from ..data_processing.data_loader import DataLoader
 from ..data_processing.sector_grouper import SectorGrouper
-from ..data_structures.red_black_tree import RedBlackTree
-from ..data_structures.max_heap import MaxHeap
-from ..scoring.stock_scorer import StockScorer
+from ..data_structures.ranking import get_backend_choices, get_backend_label
+from ..data_processing.snapshot import SnapshotStore
 from ..scoring.performance_comparison import PerformanceComparator
+from ..scoring.similarity import WINDOW_DAYS
+from ..scoring.recommender import ALL_SECTORS
 from ..data_structures.stock import Stock
 
+# Posted by the loader thread when the dataset is published (or failed)
+DATA_LOADED = pygame.USEREVENT + 1
+# Posted by the query worker when a recommend/compare job finishes
+JOB_DONE = pygame.USEREVENT + 2
+
+FPS_CAP = 30
+PROGRESS_POLL_MS = 100
+# Left/Right on the recommendation results move the as-of date by this much
+AS_OF_STEP_DAYS = 30
+
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, string, color), least recently
+    # used first out. Most labels never change, so a frame rarely renders text.
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.surfaces: "OrderedDict[Tuple[Any, str, Tuple[int, int, int]], pygame.Surface]" = OrderedDict()
+    
+    def render(self, font, text: str, color) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def clear(self):
+        self.surfaces.clear()
+
 
 class MyStokGUI:
     # Pygame-based graphical user interface for MyStok application
@@ -39,14 +78,20 @@ class MyStokGUI:
         self.header_font = pygame.font.Font(None, 36)
         self.normal_font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
+        self.text_cache = TextCache()
+        
+        # Rendering: redraw only when something changed, at most FPS_CAP times a second
+        self.clock = pygame.time.Clock()
+        self.needs_redraw = True
+        self.drawn_progress = None
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
         
         # Initialize data components
+        self.csv_path = csv_path
         self.data_loader = DataLoader(csv_path)
         self.sector_grouper = SectorGrouper()
-        self.red_black_tree = RedBlackTree()
-        self.max_heap = MaxHeap()
+        self.store = SnapshotStore()
         self.performance_comparator = PerformanceComparator()
-        self.stocks = []
         
         # GUI state
         self.current_screen = "welcome"
@@ -56,36 +101,96 @@ class MyStokGUI:
         self.data_structure_choice = None
         self.recommendations = []
         self.performance_results = None
-        
-        # Load data
-        self.load_data()
+        # Days before the last close to score at; 0 is the latest data
+        self.as_of_shift = 0
+        self.as_of_label = None
+        # Stocks that move like a clicked recommendation, as (correlation, stock)
+        self.peer_ticker = None
+        self.peers = []
+        
+        # Data loads on a worker thread; the menus work in the meantime and a
+        # query picked before it finishes waits on the loading screen
+        self.loading = True
+        self.load_progress = ("starting", 0, 0)
+        self.pending_query = False
+        self.loader_thread = threading.Thread(target=self.load_data, name="mystok-loader", daemon=True)
+        self.loader_thread.start()
+        
+        # Recommend/compare jobs run one at a time on a worker thread. Each
+        # job gets an id; a result whose id is no longer current was cancelled
+        # and is dropped.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mystok-query")
+        self.job: Optional[Future] = None
+        self.job_id = 0
+        self.job_screen = "results"
     
     def load_data(self):
-        # Load stock data
+        # Load stock data (runs on the loader thread)
         try:
-            self.stocks = self.data_loader.load_stocks()
+            stocks = self.data_loader.load_stocks(self.report_progress)
+            snapshot = self.store.publish(stocks, self.data_loader.get_data_summary())
+            # Ready before the sector screen needs it
+            snapshot.recommender.get_sector_aggregates()
         except Exception as e:
             print(f"Error loading data: {e}")
-            self.stocks = []
+            self.store.publish([])
+        finally:
+            self.loading = False
+            self.post_event(DATA_LOADED)
+    
+    def report_progress(self, stage: str, done: int, total: int):
+        # Called from the loader thread; a single tuple assignment is atomic
+        self.load_progress = (stage, done, total)
+    
+    def on_data_loaded(self):
+        # Start the query the user picked while data was still loading
+        if self.pending_query:
+            self.pending_query = False
+            self.run_query()
+    
+    def text(self, font, text: str, color) -> pygame.Surface:
+        return self.text_cache.render(font, text, color)
     
     def run(self):
-        # Main loop for the GUI
+        # Main loop for the GUI. Sleeps in event.wait() while idle; while data
+        # is loading it wakes up to repaint the progress readout only.
         running = True
         while running:
-            for event in pygame.event.get():
+            self.render()
+            self.clock.tick(FPS_CAP)
+            
+            for event in self.wait_for_events():
+                if event.type == pygame.NOEVENT:
+                    continue
+                self.needs_redraw = True
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.handle_click(event.pos)
                 elif event.type == pygame.KEYDOWN:
                     self.handle_key(event.key)
-            
-            self.draw()
-            pygame.display.flip()
+                elif event.type == DATA_LOADED:
+                    self.on_data_loaded()
+                elif event.type == JOB_DONE:
+                    self.on_job_done(event.job_id)
         
+        self.executor.shutdown(wait=False, cancel_futures=True)
         pygame.quit()
         sys.exit()
     
+    def wait_for_events(self) -> List[pygame.event.Event]:
+        # Block until an event arrives; poll while progress can change
+        timeout = PROGRESS_POLL_MS if self.loading else 0
+        return [pygame.event.wait(timeout)] + pygame.event.get()
+    
+    def render(self):
+        if self.needs_redraw:
+            self.draw()
+            pygame.display.flip()
+            self.needs_redraw = False
+        elif self.loading and self.load_progress != self.drawn_progress:
+            pygame.display.update(self.draw_progress())
+    
     def handle_click(self, pos):
         if self.current_screen == "welcome":
             self.handle_welcome_click(pos)
@@ -99,11 +204,26 @@ class MyStokGUI:
             self.handle_data_structure_click(pos)
         elif self.current_screen == "results":
             self.handle_results_click(pos)
+        elif self.current_screen == "peers":
+            self.handle_peers_click(pos)
     
     def handle_key(self, key):
         if key == pygame.K_ESCAPE:
+            self.pending_query = False
+            self.cancel_job()
             if self.current_screen != "welcome":
                 self.current_screen = "welcome"
+        elif self.current_screen == "results" and self.data_structure_choice != "compare" and self.sector_preference != ALL_SECTORS:
+            # Step the recommendations through time without leaving the screen
+            if key == pygame.K_LEFT:
+                self.as_of_shift += AS_OF_STEP_DAYS
+            elif key == pygame.K_RIGHT and self.as_of_shift > 0:
+                self.as_of_shift = max(self.as_of_shift - AS_OF_STEP_DAYS, 0)
+            elif key == pygame.K_HOME and self.as_of_shift > 0:
+                self.as_of_shift = 0
+            else:
+                return
+            self.run_query()
     
     def handle_welcome_click(self, pos):
         if 300 <= pos[0] <= 700 and 450 <= pos[1] <= 510:
@@ -138,7 +258,8 @@ class MyStokGUI:
                 self.current_screen = "sector_preference"
     
     def handle_sector_click(self, pos):
-        sectors = ["technology", "fashion", "healthcare", "finance", "automotive", "food", "entertainment", "energy", "consumer_goods", "real_estate"]
+        sectors = ["technology", "fashion", "healthcare", "finance", "automotive", "food", "entertainment", "energy", "consumer_goods", "real_estate",
+                   ALL_SECTORS]
         
         if 300 <= pos[0] <= 700:
             for i, sector in enumerate(sectors):
@@ -148,72 +269,124 @@ class MyStokGUI:
                     self.current_screen = "data_structure"
                     break
     
+    def get_data_structure_options(self):
+        return get_backend_choices() + ["compare"]
+    
     def handle_data_structure_click(self, pos):
         if 300 <= pos[0] <= 700:
-            if 150 <= pos[1] <= 210:
-                self.data_structure_choice = "max_heap"
-                self.get_recommendations()
-            elif 230 <= pos[1] <= 290:
-                self.data_structure_choice = "red_black_tree"
-                self.get_recommendations()
-            elif 310 <= pos[1] <= 370:
-                self.data_structure_choice = "compare"
-                self.compare_performance()
+            for i, option in enumerate(self.get_data_structure_options()):
+                y = 150 + i * 70
+                if y <= pos[1] <= y + 60:
+                    self.data_structure_choice = option
+                    if self.loading:
+                        self.pending_query = True
+                        self.current_screen = "loading"
+                    else:
+                        self.run_query()
+                    break
+    
+    def run_query(self):
+        # Submit the selected query to the worker and show the computing screen.
+        # Arguments are captured now, so later menu clicks cannot change them.
+        args = (self.risk_profile, self.time_investment, self.sector_preference)
+        if self.data_structure_choice == "compare":
+            self.submit_job("results", self.compare_performance, *args)
+        else:
+            self.submit_job("results", self.get_shifted_recommendations, *args, self.data_structure_choice, self.as_of_shift)
+    
+    def run_peer_query(self, ticker: str):
+        self.peer_ticker = ticker
+        self.submit_job("peers", self.get_recommender().similar_stocks, ticker, 5)
+    
+    def submit_job(self, screen: str, function, *args):
+        # The result is shown on `screen` when the job finishes
+        self.job_id += 1
+        job_id = self.job_id
+        self.job_screen = screen
+        self.job = self.executor.submit(function, *args)
+        self.job.add_done_callback(lambda future: self.post_event(JOB_DONE, job_id=job_id))
+        self.current_screen = "computing"
+    
+    def post_event(self, event_type: int, **attributes):
+        # Wake the main loop from a worker thread
+        try:
+            pygame.event.post(pygame.event.Event(event_type, **attributes))
+        except pygame.error:
+            pass  # window already closed
+    
+    def on_job_done(self, job_id: int):
+        if self.job is None or job_id != self.job_id:
+            return
+        job, self.job = self.job, None
+        try:
+            result = job.result()
+        except Exception as e:
+            print(f"Error computing results: {e}")
+            result = None
+        
+        if self.job_screen == "peers":
+            self.peers = result or []
+        elif self.data_structure_choice == "compare":
+            self.performance_results = result
+        else:
+            self.as_of_label, self.recommendations = result or (None, [])
+        self.current_screen = self.job_screen
+    
+    def cancel_job(self):
+        # A job that has not started is dropped from the queue. One already
+        # running cannot be interrupted, so it finishes and its result is ignored.
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
     
     def handle_results_click(self, pos):
         if 300 <= pos[0] <= 700 and 600 <= pos[1] <= 660:
             self.current_screen = "welcome"
             self.reset_state()
+        elif self.data_structure_choice != "compare" and 200 <= pos[0] <= 800:
+            # A recommendation was clicked: show the stocks that move like it
+            for i, (_, stock, _) in enumerate(self.recommendations[:5]):
+                y = 120 + i * 80
+                if y <= pos[1] <= y + 65:
+                    self.run_peer_query(stock.ticker)
+                    break
     
-    def get_recommendations(self):
-        # Get stock recommendations for user
-        scorer = StockScorer(self.risk_profile, self.time_investment, self.sector_preference)
-        sector_stocks = scorer.filter_by_sector(self.stocks)
-        
-        if not sector_stocks:
-            self.recommendations = []
+    def handle_peers_click(self, pos):
+        if 300 <= pos[0] <= 700 and 600 <= pos[1] <= 660:
             self.current_screen = "results"
-            return
-        
-        scored_stocks = scorer.score_stocks(sector_stocks)
-        
-        if self.data_structure_choice == "max_heap":
-            recommendations = self.get_recommendations_using_heap(scored_stocks)
-        else:
-            recommendations = self.get_recommendations_using_tree(scored_stocks)
-        
-        if recommendations:
-            certainty = scorer.calculate_certainty(recommendations)
-            self.recommendations = [(score, stock, certainty) for score, stock in recommendations]
-        
-        self.current_screen = "results"
     
-    def compare_performance(self):
-        # Compare performance between max heap and red black tree
-        results = self.performance_comparator.compare_performance(
-            self.stocks, self.risk_profile, self.time_investment, self.sector_preference
+    def get_recommendations(self, risk_profile: str, time_investment: str, sector_preference: str, data_structure: str):
+        # Get stock recommendations for user (runs on the query worker)
+        return self.get_recommender().recommend(risk_profile, time_investment, sector_preference, data_structure)
+    
+    def get_shifted_recommendations(self, risk_profile: str, time_investment: str, sector_preference: str,
+                                    data_structure: str, shift: int) -> Tuple[Optional[str], List]:
+        # Recommendations `shift` days before the last close, with the date used
+        if shift <= 0:
+            return None, self.get_recommendations(risk_profile, time_investment, sector_preference, data_structure)
+        recommender = self.get_recommender()
+        as_of = str(date(1970, 1, 1) + timedelta(days=recommender.get_panel().last_day - shift))
+        return as_of, recommender.recommend(risk_profile, time_investment, sector_preference, data_structure, as_of=as_of)
+    
+    def compare_performance(self, risk_profile: str, time_investment: str, sector_preference: str):
+        # Compare performance between the ranking structures (runs on the query worker)
+        return self.performance_comparator.compare_performance(
+            self.stocks, risk_profile, time_investment, sector_preference
         )
-        self.performance_results = results
-        self.current_screen = "results"
-    
-    def get_recommendations_using_heap(self, scored_stocks):
-        self.max_heap = MaxHeap()
-        for score, stock in scored_stocks:
-            self.max_heap.insert(score, stock)
-        return self.max_heap.get_top_k(10)
-    
-    def get_recommendations_using_tree(self, scored_stocks):
-        self.red_black_tree = RedBlackTree()
-        for score, stock in scored_stocks:
-            self.red_black_tree.insert(score, stock)
-        
-        if scored_stocks:
-            max_score = max(score for score, _ in scored_stocks)
-            min_score = max_score - 100
-            top_stocks = self.red_black_tree.get_stocks_in_range(min_score, max_score)
-            top_stocks.sort(key=lambda x: x[0], reverse=True)
-            return top_stocks[:10]
-        return []
+    
+    @property
+    def stocks(self):
+        # Stocks of the current dataset snapshot
+        return self.store.stocks()
+    
+    def get_recommender(self):
+        return self.store.current().recommender
+    
+    def get_sector_overview(self) -> Dict[str, Dict[str, Any]]:
+        snapshot = self.store.current()
+        if self.loading or snapshot is None or not snapshot.stocks:
+            return {}
+        return snapshot.recommender.get_sector_aggregates().overview
     
     def reset_state(self):
         self.risk_profile = None
@@ -222,15 +395,25 @@ class MyStokGUI:
         self.data_structure_choice = None
         self.recommendations = []
         self.performance_results = None
+        self.as_of_shift = 0
+        self.as_of_label = None
+        self.peer_ticker = None
+        self.peers = []
+        self.pending_query = False
+        self.cancel_job()
     
     def switch_to_cli(self):
         # Switch from pygame to command line interface
         print("\nSwitching to Command Line Interface...")
+        self.executor.shutdown(wait=False, cancel_futures=True)
         pygame.quit()
         
-        # Use CLI
-        from src.interface.cli import MyStokCLI
-        cli = MyStokCLI("resources/World-Stock-Prices-Dataset.csv")
+        # Hand the loaded snapshot over instead of reading the CSV again
+        if self.loading:
+            print("Waiting for stock data to finish loading...")
+            self.loader_thread.join()
+        from .cli import MyStokCLI
+        cli = MyStokCLI(self.csv_path, store=self.store)
         cli.run()
         
         # Exit the program 
@@ -252,15 +435,72 @@ class MyStokGUI:
             self.draw_data_structure_screen()
         elif self.current_screen == "results":
             self.draw_results_screen()
+        elif self.current_screen == "peers":
+            self.draw_peers_screen()
+        elif self.current_screen == "loading":
+            self.draw_loading_screen()
+        elif self.current_screen == "computing":
+            self.draw_computing_screen()
+        
+        if self.loading:
+            self.draw_progress()
+    
+    def get_progress_text(self) -> str:
+        stage, done, total = self.load_progress
+        if stage == "rows":
+            return f"Loading data: {done:,} rows parsed"
+        if stage == "clean":
+            return f"Loading data: cleaning {done or total:,} rows"
+        if stage == "tickers":
+            return f"Loading data: {done:,} of {total:,} tickers built"
+        return "Loading data..."
+    
+    def draw_progress(self) -> pygame.Rect:
+        # Paint just the progress readout and return the rect that changed
+        if self.current_screen == "loading":
+            rect = pygame.Rect(0, 270, self.screen_width, 100)
+            self.screen.fill(self.BACKGROUND_GRAY, rect)
+            status = self.text(self.normal_font, self.get_progress_text(), self.BLACK)
+            self.screen.blit(status, (self.screen_width//2 - status.get_width()//2, 280))
+            
+            # Only the ticker stage has a known total
+            stage, done, total = self.load_progress
+            pygame.draw.rect(self.screen, self.WHITE, (300, 330, 400, 30))
+            if stage == "tickers" and total:
+                pygame.draw.rect(self.screen, self.FOREST_GREEN, (300, 330, int(400 * done / total), 30))
+            pygame.draw.rect(self.screen, self.GOLD, (300, 330, 400, 30), 2)
+        else:
+            rect = pygame.Rect(0, self.screen_height - 30, self.screen_width, 30)
+            self.screen.fill(self.BACKGROUND_GRAY, rect)
+            status = self.text(self.small_font, self.get_progress_text(), self.GRAY)
+            self.screen.blit(status, (10, self.screen_height - 25))
+        self.drawn_progress = self.load_progress
+        return rect
+    
+    def draw_loading_screen(self):
+        title = self.text(self.header_font, "Loading Stock Data", self.FOREST_GREEN)
+        self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 200))
+        
+        hint = self.text(self.small_font, "Your results will appear as soon as the data is ready. Press Escape to go back.", self.GRAY)
+        self.screen.blit(hint, (self.screen_width//2 - hint.get_width()//2, 390))
+    
+    def draw_computing_screen(self):
+        # Shown until the worker posts JOB_DONE
+        heading = "Comparing Data Structures..." if self.data_structure_choice == "compare" else "Computing Recommendations..."
+        title = self.text(self.header_font, heading, self.FOREST_GREEN)
+        self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 250))
+        
+        hint = self.text(self.small_font, "Press Escape to cancel.", self.GRAY)
+        self.screen.blit(hint, (self.screen_width//2 - hint.get_width()//2, 310))
     
     def draw_welcome_screen(self):
         # Draw welcome screen
-        title = self.title_font.render("MyStok", True, self.FOREST_GREEN)
-        subtitle = self.header_font.render("Stock Recommendation System", True, self.FOREST_GREEN)
-        team = self.normal_font.render("Team: Project 3 Group 55", True, self.FOREST_GREEN)
-        members = self.normal_font.render("Members: James Jean Philipe, Ignatius Martin, Anay Patel", True, self.FOREST_GREEN)
-        start_button = self.header_font.render("Click to Start", True, self.WHITE)
-        cli_button = self.normal_font.render("Switch to Command Line", True, self.WHITE)
+        title = self.text(self.title_font, "MyStok", self.FOREST_GREEN)
+        subtitle = self.text(self.header_font, "Stock Recommendation System", self.FOREST_GREEN)
+        team = self.text(self.normal_font, "Team: Project 3 Group 55", self.FOREST_GREEN)
+        members = self.text(self.normal_font, "Members: James Jean Philipe, Ignatius Martin, Anay Patel", self.FOREST_GREEN)
+        start_button = self.text(self.header_font, "Click to Start", self.WHITE)
+        cli_button = self.text(self.normal_font, "Switch to Command Line", self.WHITE)
         
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 150))
         self.screen.blit(subtitle, (self.screen_width//2 - subtitle.get_width()//2, 220))
@@ -275,12 +515,12 @@ class MyStokGUI:
         # Draw CLI button 
         pygame.draw.rect(self.screen, self.WHITE, (300, 530, 400, 40)) 
         pygame.draw.rect(self.screen, self.GOLD, (300, 530, 400, 40), 2) 
-        cli_button_text = self.normal_font.render("Switch to Command Line", True, self.BLACK)  
+        cli_button_text = self.text(self.normal_font, "Switch to Command Line", self.BLACK)  
         self.screen.blit(cli_button_text, (self.screen_width//2 - cli_button_text.get_width()//2, 540))
     
     def draw_risk_screen(self):
         # Draw risk profile screen
-        title = self.header_font.render("Select Risk Profile", True, self.FOREST_GREEN)
+        title = self.text(self.header_font, "Select Risk Profile", self.FOREST_GREEN)
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 80))
         
         options = [
@@ -293,15 +533,15 @@ class MyStokGUI:
             y = 150 + i * 80
             pygame.draw.rect(self.screen, self.WHITE, (300, y, 400, 60))
             pygame.draw.rect(self.screen, self.GOLD, (300, y, 400, 60), 2)
-            option_text = self.normal_font.render(option, True, self.BLACK)
-            desc_text = self.small_font.render(desc, True, self.GRAY)
+            option_text = self.text(self.normal_font, option, self.BLACK)
+            desc_text = self.text(self.small_font, desc, self.GRAY)
             
             self.screen.blit(option_text, (320, y + 15))
             self.screen.blit(desc_text, (320, y + 35))
     
     def draw_time_screen(self):
         # Draw time investment screen
-        title = self.header_font.render("Select Investment Time Horizon", True, self.FOREST_GREEN)
+        title = self.text(self.header_font, "Select Investment Time Horizon", self.FOREST_GREEN)
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 80))
         
         options = [
@@ -314,48 +554,54 @@ class MyStokGUI:
             y = 150 + i * 80
             pygame.draw.rect(self.screen, self.WHITE, (300, y, 400, 60))  
             pygame.draw.rect(self.screen, self.GOLD, (300, y, 400, 60), 2) 
-            option_text = self.normal_font.render(option, True, self.BLACK)
-            desc_text = self.small_font.render(desc, True, self.GRAY)
+            option_text = self.text(self.normal_font, option, self.BLACK)
+            desc_text = self.text(self.small_font, desc, self.GRAY)
             
             self.screen.blit(option_text, (320, y + 15))
             self.screen.blit(desc_text, (320, y + 35))
     
     def draw_sector_screen(self):
         # Draw sector preference screen
-        title = self.header_font.render("Select Sector Preference", True, self.FOREST_GREEN)
+        title = self.text(self.header_font, "Select Sector Preference", self.FOREST_GREEN)
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 80))
         
         sectors = ["Technology", "Fashion", "Healthcare", "Finance", "Automotive",
-                  "Food", "Entertainment", "Energy", "Consumer Goods", "Real Estate"]
+                  "Food", "Entertainment", "Energy", "Consumer Goods", "Real Estate", "All Sectors"]
         
         for i, sector in enumerate(sectors):
             y = 120 + i * 45
             pygame.draw.rect(self.screen, self.WHITE, (300, y, 400, 45))  
             pygame.draw.rect(self.screen, self.GOLD, (300, y, 400, 45), 2)  
-            sector_text = self.normal_font.render(sector, True, self.BLACK)
+            sector_text = self.text(self.normal_font, sector, self.BLACK)
             self.screen.blit(sector_text, (320, y + 12))
+            
+            # Members and the sector index's 1-year return, once data is in
+            row = self.get_sector_overview().get(sector.lower().replace(" ", "_"))
+            if row:
+                year = f", 1y {row['return_1y']:+.1f}%" if row["return_1y"] is not None else ""
+                stats_text = self.text(self.small_font, f"{row['stocks']} stocks{year}", self.GRAY)
+                self.screen.blit(stats_text, (680 - stats_text.get_width(), y + 16))
     
     def draw_data_structure_screen(self):
         # Draw data structure screen
-        title = self.header_font.render("Select Data Structure", True, self.FOREST_GREEN)
+        title = self.text(self.header_font, "Select Data Structure", self.FOREST_GREEN)
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 80))
         
         options = [
-            ("Max Heap"),
-            ("Red-Black Tree"),
-            ("Compare Performance")
+            "Compare Performance" if name == "compare" else get_backend_label(name)
+            for name in self.get_data_structure_options()
         ]
         
         for i, option in enumerate(options):
-            y = 150 + i * 80
+            y = 150 + i * 70
             pygame.draw.rect(self.screen, self.WHITE, (300, y, 400, 60)) 
             pygame.draw.rect(self.screen, self.GOLD, (300, y, 400, 60), 2) 
-            option_text = self.normal_font.render(option, True, self.BLACK)
+            option_text = self.text(self.normal_font, option, self.BLACK)
             
             self.screen.blit(option_text, (320, y + 20))
     
     def draw_results_screen(self):
-        title = self.header_font.render("Results", True, self.FOREST_GREEN)
+        title = self.text(self.header_font, "Results", self.FOREST_GREEN)
         self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 40))
         
         if self.data_structure_choice == "compare":
@@ -366,49 +612,52 @@ class MyStokGUI:
         # Draw back button
         pygame.draw.rect(self.screen, self.FOREST_GREEN, (300, 600, 400, 60))
         pygame.draw.rect(self.screen, self.DARK_GOLD, (300, 600, 400, 60), 3) 
-        back_text = self.header_font.render("Back to Start", True, self.WHITE)
+        back_text = self.text(self.header_font, "Back to Start", self.WHITE)
         self.screen.blit(back_text, (self.screen_width//2 - back_text.get_width()//2, 615))
     
     def draw_performance_results(self):
         # Draw performance comparison results
         if not self.performance_results or "error" in self.performance_results:
-            error_text = self.normal_font.render("No performance data available", True, self.RED)
+            error_text = self.text(self.normal_font, "No performance data available", self.RED)
             self.screen.blit(error_text, (self.screen_width//2 - error_text.get_width()//2, 150))
             return
         
-        rb_time = self.performance_results["red_black_tree"]["total_time"]
-        heap_time = self.performance_results["max_heap"]["total_time"]
-        
-        if rb_time < heap_time:
-            winner = "Red-Black Tree"
-            diff = heap_time - rb_time
-        else:
-            winner = "Max Heap"
-            diff = rb_time - heap_time
-        
-        results = [
-            f"Red-Black Tree: {rb_time:.6f}s",
-            f"Max Heap: {heap_time:.6f}s",
-            f"Winner: {winner} ({diff:.6f}s faster)"
-        ]
+        backends = sorted(self.performance_results["backends"].values(), key=lambda x: x["total_time"])
         
-        for i, result in enumerate(results):
-            y = 120 + i * 50
-            result_text = self.normal_font.render(result, True, self.BLACK)
+        for i, result in enumerate(backends):
+            y = 120 + i * 60
+            timing = f"{result['label']}: build {result['build_time']:.6f}s, query {result['query_time']:.6f}s"
+            result_text = self.text(self.normal_font, timing, self.BLACK)
             self.screen.blit(result_text, (self.screen_width//2 - result_text.get_width()//2, y))
+            
+            memory = self.performance_comparator.get_memory_text(result)
+            if memory:
+                memory_text = self.text(self.small_font, memory, self.GRAY)
+                self.screen.blit(memory_text, (self.screen_width//2 - memory_text.get_width()//2, y + 25))
+        
+        winner = self.performance_comparator.get_winner_text(self.performance_results)
+        if winner:
+            winner_text = self.text(self.normal_font, winner, self.FOREST_GREEN)
+            self.screen.blit(winner_text, (self.screen_width//2 - winner_text.get_width()//2, 120 + len(backends) * 60))
     
     def draw_recommendation_results(self):
+        as_of = f"As of {self.as_of_label}" if self.as_of_label else "As of the latest close"
+        if self.sector_preference != ALL_SECTORS:
+            as_of += "   (Left/Right: 30 days, Home: latest)"
+        as_of_text = self.text(self.small_font, as_of, self.GRAY)
+        self.screen.blit(as_of_text, (self.screen_width//2 - as_of_text.get_width()//2, 85))
+        
         if not self.recommendations:
-            no_results = self.normal_font.render("No recommendations found", True, self.RED)
+            no_results = self.text(self.normal_font, "No recommendations found", self.RED)
             self.screen.blit(no_results, (self.screen_width//2 - no_results.get_width()//2, 150))
             return
         
         # Display top 5 recommendations 
         for i, (score, stock, certainty) in enumerate(self.recommendations[:5]):
             y = 120 + i * 80
-            stock_text = self.normal_font.render(f"{i+1}. {stock.brand_name} ({stock.ticker})", True, self.BLACK)
-            score_text = self.small_font.render(f"Score: {score:.1f}/100", True, self.FOREST_GREEN)
-            price_text = self.small_font.render(f"Price: ${stock.current_price:.2f}", True, self.GRAY)
+            stock_text = self.text(self.normal_font, f"{i+1}. {stock.brand_name} ({stock.ticker})", self.BLACK)
+            score_text = self.text(self.small_font, f"Score: {score:.1f}/100", self.FOREST_GREEN)
+            price_text = self.text(self.small_font, f"Price: ${stock.current_price:.2f}", self.GRAY)
             
             self.screen.blit(stock_text, (self.screen_width//2 - stock_text.get_width()//2, y))
             self.screen.blit(score_text, (self.screen_width//2 - score_text.get_width()//2, y + 25))
@@ -417,5 +666,32 @@ class MyStokGUI:
         # Display certainty
         if self.recommendations:
             certainty = self.recommendations[0][2]
-            certainty_text = self.normal_font.render(f"Certainty: {certainty:.1f}%", True, self.GREEN)
-            self.screen.blit(certainty_text, (self.screen_width//2 - certainty_text.get_width()//2, 520)) 
\ No newline at end of file
+            certainty_text = self.text(self.normal_font, f"Certainty: {certainty:.1f}%", self.GREEN)
+            self.screen.blit(certainty_text, (self.screen_width//2 - certainty_text.get_width()//2, 520)) 
+            hint_text = self.text(self.small_font, "Click a stock to see others whose price moves like it", self.GRAY)
+            self.screen.blit(hint_text, (self.screen_width//2 - hint_text.get_width()//2, 555))
+    
+    def draw_peers_screen(self):
+        title = self.text(self.header_font, f"Moving Like {self.peer_ticker}", self.FOREST_GREEN)
+        self.screen.blit(title, (self.screen_width//2 - title.get_width()//2, 40))
+        subtitle = self.text(self.small_font, f"Correlation of price paths over the last {WINDOW_DAYS} trading days", self.GRAY)
+        self.screen.blit(subtitle, (self.screen_width//2 - subtitle.get_width()//2, 85))
+        
+        if not self.peers:
+            no_results = self.text(self.normal_font, "No similar stocks found", self.RED)
+            self.screen.blit(no_results, (self.screen_width//2 - no_results.get_width()//2, 150))
+        
+        for i, (similarity, stock) in enumerate(self.peers[:5]):
+            y = 120 + i * 80
+            stock_text = self.text(self.normal_font, f"{i+1}. {stock.brand_name} ({stock.ticker})", self.BLACK)
+            similarity_text = self.text(self.small_font, f"Correlation: {similarity:.2f}", self.FOREST_GREEN)
+            industry_text = self.text(self.small_font, f"Industry: {stock.industry_tag}", self.GRAY)
+            
+            self.screen.blit(stock_text, (self.screen_width//2 - stock_text.get_width()//2, y))
+            self.screen.blit(similarity_text, (self.screen_width//2 - similarity_text.get_width()//2, y + 25))
+            self.screen.blit(industry_text, (self.screen_width//2 - industry_text.get_width()//2, y + 45))
+        
+        pygame.draw.rect(self.screen, self.FOREST_GREEN, (300, 600, 400, 60))
+        pygame.draw.rect(self.screen, self.DARK_GOLD, (300, 600, 400, 60), 3)
+        back_text = self.text(self.header_font, "Back to Results", self.WHITE)
+        self.screen.blit(back_text, (self.screen_width//2 - back_text.get_width()//2, 615))
\ No newline at end of file
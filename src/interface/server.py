@@ -0,0 +1,248 @@
+# Recommendation server for MyStok application
+#
+# Loads the dataset once and answers HTTP/JSON queries on localhost using
+# only asyncio from the standard library. Scoring, ranking and comparisons
+# run on a thread pool so the event loop keeps accepting requests.
+#
+#   GET /recommend?risk=low&time=long&sector=energy|energy,finance|all[&structure=b_tree|auto&top_k=5&max_correlation=0.6&as_of=2024-03-15&monte_carlo=1]
+#   GET /compare?risk=low&time=long&sector=energy[&top_k=10]
+#   GET /similar?ticker=AAPL[&k=5]   stocks whose price path moves most like the ticker's
+#   GET /summary
+#   GET /health
+#   POST /reload   re-read the CSV and swap in a new dataset version; queries
+#                  already running finish on the version they started with
+#
+# Start with `python main.py --serve` or `python -m src.interface.server`.
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import perf_counter
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit, parse_qsl
+from .batch import BatchRunner, normalize_query, parse_count
+from ..data_processing.snapshot import DatasetSnapshot
+from ..scoring.performance_comparison import PerformanceComparator
+
+MAX_HEADER_BYTES = 16384
+# No endpoint reads a body; anything up to this size is skipped
+MAX_BODY_BYTES = 65536
+
+
+class RecommendationServer:
+
+    def __init__(self, csv_path: str, host: str = "127.0.0.1", port: int = 8765, workers: int = 4):
+        self.host = host
+        self.port = port
+        self.runner = BatchRunner(csv_path)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mystok")
+        self.comparator = PerformanceComparator()
+        # Comparisons time themselves and trace memory, so run one at a time
+        self.compare_lock = threading.Lock()
+        self.summaries: Dict[int, Dict[str, Any]] = {}
+
+    def load(self) -> bool:
+        return self.runner.load()
+
+    def build_summary(self, snapshot: DatasetSnapshot) -> Dict[str, Any]:
+        date_range = snapshot.data_summary.get("date_range", {})
+        aggregates = snapshot.recommender.get_sector_aggregates()
+        return {
+            "version": snapshot.version,
+            "total_stocks": len(snapshot.stocks),
+            "total_rows": int(snapshot.data_summary.get("total_rows", 0)),
+            "date_range": {key: str(value) for key, value in date_range.items()},
+            "sectors": aggregates.category_counts,
+            "sector_overview": aggregates.overview
+        }
+
+    def handle_summary(self) -> Tuple[int, Dict[str, Any]]:
+        snapshot = self.runner.store.current()
+        if snapshot.version not in self.summaries:
+            self.summaries = {snapshot.version: self.build_summary(snapshot)}
+        return HTTPStatus.OK, self.summaries[snapshot.version]
+
+    def handle_reload(self) -> Tuple[int, Dict[str, Any]]:
+        snapshot = self.runner.store.ingest(self.runner.csv_path)
+        if snapshot is None:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Reload failed; still serving the previous version"}
+        return HTTPStatus.OK, {"version": snapshot.version, "stocks": len(snapshot.stocks),
+                               "live_versions": self.runner.store.live_versions()}
+
+    def handle_recommend(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        try:
+            query = normalize_query(params, 1, self.runner.default_structure, self.runner.default_top_k)
+        except ValueError as x:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid query: {x}"}
+        result = self.runner.answer(query)
+        return (HTTPStatus.BAD_REQUEST if "error" in result else HTTPStatus.OK), result
+
+    def handle_compare(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        snapshot = self.runner.store.current()
+        try:
+            query = normalize_query(params, 1, self.runner.default_structure, self.runner.default_top_k)
+            snapshot.recommender.validate(query["risk"], query["time"], query["sector"])
+        except ValueError as x:
+            return HTTPStatus.BAD_REQUEST, {"error": str(x)}
+
+        with self.compare_lock:
+            results = self.comparator.compare_performance(
+                snapshot.stocks, query["risk"], query["time"], query["sector"], query["top_k"]
+            )
+        if "error" in results:
+            return HTTPStatus.NOT_FOUND, {"error": results["error"]}
+
+        backends = {}
+        for name, result in results["backends"].items():
+            backends[name] = {
+                "label": result["label"],
+                "build_time": result["build_time"],
+                "query_time": result["query_time"],
+                "build_stats": result["build_stats"],
+                "query_stats": result["query_stats"],
+                "memory": result["memory"],
+                "top_stocks": [{"ticker": stock.ticker, "score": round(score, 4)} for score, stock in result["top_stocks"]]
+            }
+        return HTTPStatus.OK, {
+            "version": snapshot.version,
+            "total_stocks": results["total_stocks"],
+            "backends": backends,
+            "summary": self.comparator.get_winner_text(results)
+        }
+
+    def handle_similar(self, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        snapshot = self.runner.store.current()
+        try:
+            if "ticker" not in params:
+                raise ValueError("missing ticker")
+            k = parse_count(params.get("k"), 5, "k")
+            peers = snapshot.recommender.similar_stocks(params["ticker"], k)
+        except ValueError as x:
+            return HTTPStatus.BAD_REQUEST, {"error": str(x)}
+        return HTTPStatus.OK, {
+            "version": snapshot.version,
+            "ticker": params["ticker"].upper(),
+            "similar": [{"ticker": stock.ticker, "brand_name": stock.brand_name, "industry": stock.industry_tag,
+                         "correlation": round(similarity, 4)} for similarity, stock in peers]
+        }
+    
+    def route(self, method: str, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        # Runs on the thread pool
+        if method == "POST":
+            if path == "/reload":
+                return self.handle_reload()
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"POST is not supported for {path}"}
+        if path == "/recommend":
+            return self.handle_recommend(params)
+        if path == "/compare":
+            return self.handle_compare(params)
+        if path == "/similar":
+            return self.handle_similar(params)
+        if path == "/summary":
+            return self.handle_summary()
+        if path == "/health":
+            snapshot = self.runner.store.current()
+            return HTTPStatus.OK, {"status": "ok", "version": snapshot.version, "stocks": len(snapshot.stocks)}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {path}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # HTTP/1.1 with keep-alive; GET, plus POST for /reload
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                # Request bodies are not used; skip over one if sent. A bad
+                # length leaves the stream unframed, so the connection closes.
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                    if not 0 <= length <= MAX_BODY_BYTES:
+                        raise ValueError(f"must be between 0 and {MAX_BODY_BYTES}")
+                except ValueError as x:
+                    self.write_response(writer, HTTPStatus.BAD_REQUEST, {"error": f"Invalid Content-Length: {x}"}, False)
+                    await writer.drain()
+                    break
+                if length:
+                    try:
+                        await reader.readexactly(length)
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                if len(parts) != 3 or parts[0] not in ("GET", "POST"):
+                    status, body = HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET and POST are supported"}
+                else:
+                    url = urlsplit(parts[1])
+                    params = dict(parse_qsl(url.query))
+                    started = perf_counter()
+                    try:
+                        status, body = await loop.run_in_executor(self.executor, self.route, parts[0], url.path, params)
+                    except Exception as x:
+                        status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(x)}
+                    body = dict(body, elapsed_ms=round((perf_counter() - started) * 1000, 3))
+
+                self.write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def write_response(self, writer: asyncio.StreamWriter, status: int, body: Dict[str, Any], keep_alive: bool) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+
+    async def serve(self) -> None:
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        print(f"MyStok server listening on http://{self.host}:{self.port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def run(self) -> int:
+        if not self.load():
+            return 1
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\nServer stopped.", file=sys.stderr)
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="MyStok recommendation server")
+    parser.add_argument("--data", default="resources/World-Stock-Prices-Dataset.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+    return RecommendationServer(args.data, args.host, args.port, args.workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
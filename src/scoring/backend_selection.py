@@ -0,0 +1,224 @@
+# Adaptive ranking backend selection for MyStok application
+#
+# The "auto" structure picks a ranking backend per query from a cost model
+# of this machine. Calibration times every registered backend with the
+# benchmark harness over a grid of n, k and query type and keeps the median
+# build and query times. A query's predicted cost on a backend is its build
+# time at n plus its query time at (n, k), both interpolated log-log between
+# the calibrated points and extrapolated from the nearest two beyond them.
+# The backend with the lowest prediction answers the query.
+#
+# The model is stored as JSON in MODEL_PATH (or $MYSTOK_COST_MODEL) by
+# running this module. When it is missing, unreadable or stale (another
+# Python, machine or set of backends), auto uses DEFAULT_COSTS, a
+# calibration shipped with the code. Serving processes never calibrate:
+# timing backends needs the garbage collector off process-wide and an idle
+# interpreter, neither of which a server or GUI answering queries has.
+#
+# Usage:
+#   python -m src.scoring.backend_selection
+#   python -m src.scoring.backend_selection --predict 5000 10 --query descending
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ..data_structures.stock import Stock
+from ..data_structures.ranking import get_backend_names
+from ..instrumentation.profiler import PROFILER
+from .benchmark import QUERY_TYPES, BenchmarkRunner, format_rows
+
+MODEL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mystok", "backend_costs.json")
+# Full-grid calibration on a reference machine, used until this one is calibrated
+DEFAULT_COSTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_backend_costs.json")
+MODEL_VERSION = 1
+FULL_SIZES = [100, 1000, 10000, 100000]
+CALIBRATION_KS = [1, 10, 100]
+# Bounds on the log-log slope used outside the calibrated range
+MAX_SLOPE = 2.0
+
+
+def machine_fingerprint() -> Dict[str, Any]:
+    # A stored model is only trusted on the machine and backends it measured
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "backends": get_backend_names()
+    }
+
+
+def synthetic_scored_stocks(n: int, seed: int = 0) -> List[Tuple[float, Stock]]:
+    # Uniform scores over placeholder stocks; backends only compare scores
+    rng = random.Random(seed)
+    return [(rng.uniform(0.0, 100.0), Stock(f"CAL{i}", f"Calibration {i}", "calibration", 100.0, [100.0, 100.0]))
+            for i in range(n)]
+
+
+def loglog_interpolate(xs: Sequence[float], ys: Sequence[float], x: float) -> float:
+    # ys at x from sorted points, piecewise linear in log space
+    if len(xs) == 1:
+        return ys[0] * x / xs[0]
+    log_x = math.log(max(x, 1.0))
+    log_xs = [math.log(value) for value in xs]
+    log_ys = [math.log(max(value, 1e-9)) for value in ys]
+    i = 0
+    while i < len(xs) - 2 and log_x > log_xs[i + 1]:
+        i += 1
+    slope = (log_ys[i + 1] - log_ys[i]) / (log_xs[i + 1] - log_xs[i])
+    if not log_xs[0] <= log_x <= log_xs[-1]:
+        slope = min(max(slope, 0.0), MAX_SLOPE)
+    return math.exp(log_ys[i] + slope * (log_x - log_xs[i]))
+
+
+class CostModel:
+    # Median build and query seconds per backend from a calibration sweep
+
+    def __init__(self, rows: List[Dict[str, Any]], fingerprint: Optional[Dict[str, Any]] = None):
+        self.rows = rows
+        self.fingerprint = fingerprint or machine_fingerprint()
+        # build[backend] = ([n...], [seconds...]); the build does not depend on k or the query
+        samples: Dict[str, Dict[int, List[float]]] = {}
+        # query[(backend, query)][n] = ([k...], [seconds...])
+        queries: Dict[Tuple[str, str], Dict[int, Dict[int, float]]] = {}
+        for row in rows:
+            samples.setdefault(row["backend"], {}).setdefault(row["n"], []).append(row["build_median"])
+            queries.setdefault((row["backend"], row["query"]), {}).setdefault(row["n"], {})[row["k"]] = row["query_median"]
+        self.build = {name: (sorted(by_n), [sorted(by_n[n])[len(by_n[n]) // 2] for n in sorted(by_n)])
+                      for name, by_n in samples.items()}
+        self.query = {key: {n: (sorted(by_k), [by_k[k] for k in sorted(by_k)]) for n, by_k in by_n.items()}
+                      for key, by_n in queries.items()}
+
+    @classmethod
+    def calibrate(cls, sizes: Sequence[int] = FULL_SIZES, ks: Sequence[int] = CALIBRATION_KS,
+                  queries: Sequence[str] = QUERY_TYPES, warmup: int = 1, repeats: int = 3, seed: int = 0) -> "CostModel":
+        with PROFILER.span("calibrate_backends") as span:
+            runner = BenchmarkRunner(get_backend_names(), warmup, repeats)
+            scored_stocks = synthetic_scored_stocks(max(sizes), seed)
+            rows = []
+            for n in sizes:
+                rows.extend(runner.sweep(scored_stocks, [n], [k for k in ks if k <= n], list(queries), seed))
+            span.add("runs", len(rows))
+        return cls(rows)
+
+    @property
+    def backends(self) -> List[str]:
+        return list(self.build)
+
+    def predict(self, backend: str, n: int, k: int, query: str = "top_k") -> float:
+        # Seconds to build the backend over n entries and answer one query
+        sizes, build_times = self.build[backend]
+        by_n = self.query.get((backend, query)) or self.query[(backend, "top_k")]
+        calibrated = sorted(by_n)
+        query_times = []
+        for size in calibrated:
+            ks, times = by_n[size]
+            query_times.append(loglog_interpolate(ks, times, max(min(k, size), 1)))
+        return loglog_interpolate(sizes, build_times, n) + loglog_interpolate(calibrated, query_times, n)
+
+    def choose(self, n: int, k: int, query: str = "top_k") -> str:
+        # The backend with the lowest predicted cost
+        return min(self.backends, key=lambda name: self.predict(name, n, k, query))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": MODEL_VERSION, "fingerprint": self.fingerprint, "rows": self.rows}
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CostModel"]:
+        # None if the file is missing, unreadable or from another setup
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") != MODEL_VERSION or data.get("fingerprint") != machine_fingerprint():
+                return None
+            return cls(data["rows"], data["fingerprint"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def defaults(cls) -> "CostModel":
+        # The shipped model, restricted to the backends registered here
+        with open(DEFAULT_COSTS) as f:
+            data = json.load(f)
+        names = set(get_backend_names())
+        return cls([row for row in data["rows"] if row["backend"] in names], data["fingerprint"])
+
+
+def model_path() -> str:
+    return os.environ.get("MYSTOK_COST_MODEL") or MODEL_PATH
+
+
+# The model in use by this process, loaded on first use
+LOADED_MODEL: Dict[str, CostModel] = {}
+MODEL_LOCK = threading.Lock()
+
+
+def get_cost_model() -> CostModel:
+    # The stored model, or the shipped defaults if there is none
+    with MODEL_LOCK:
+        if "model" not in LOADED_MODEL:
+            path = model_path()
+            model = CostModel.load(path)
+            if model is None:
+                print(f"No backend cost model for this machine at {path}; auto uses the shipped defaults "
+                      f"(run python -m src.scoring.backend_selection to calibrate).", file=sys.stderr)
+                model = CostModel.defaults()
+            LOADED_MODEL["model"] = model
+        return LOADED_MODEL["model"]
+
+
+def choose_backend(n: int, k: int, query: str = "top_k") -> str:
+    return get_cost_model().choose(n, k, query)
+
+
+def format_predictions(model: CostModel, n: int, k: int, query: str) -> str:
+    lines = [f"Predicted cost for n={n}, k={k}, query={query}:"]
+    for name in sorted(model.backends, key=lambda name: model.predict(name, n, k, query)):
+        lines.append(f"  {name:<16}{model.predict(name, n, k, query):>12.6f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Calibrate MyStok's automatic ranking backend choice",
+        epilog=f"The model is stored in {MODEL_PATH}; set MYSTOK_COST_MODEL to use another file. "
+               "Without one, auto uses costs shipped with MyStok.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=FULL_SIZES)
+    parser.add_argument("--ks", type=int, nargs="+", default=CALIBRATION_KS)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--out", default=None, help=f"where to store the model (default: {model_path()})")
+    parser.add_argument("--predict", type=int, nargs=2, metavar=("N", "K"), help="show predictions from the stored model instead")
+    parser.add_argument("--query", default="top_k", choices=QUERY_TYPES)
+    args = parser.parse_args(argv)
+
+    path = args.out or model_path()
+    if args.predict:
+        model = CostModel.load(path)
+        if model is None:
+            print(f"No usable cost model at {path}; showing the shipped defaults (run without --predict to calibrate).")
+            model = CostModel.defaults()
+        print(format_predictions(model, args.predict[0], args.predict[1], args.query))
+        return 0
+
+    model = CostModel.calibrate(sorted(args.sizes), sorted(args.ks), QUERY_TYPES, args.warmup, args.repeats)
+    print(format_rows(model.rows))
+    model.save(path)
+    print(f"Cost model saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# Backtester for the MyStok scoring model
+#
+# Replays history at regular rebalance dates. At each date every ticker is
+# scored with only the closes up to that date (PricePanel.metrics_at), the
+# top k of each sector are picked, and their forward return over the
+# horizon is compared with the equal-weighted sector average. Tickers with
+# no close after the date are left out of both.
+#
+# Dates are split across a process pool. The price panel is copied once
+# into shared memory and every worker maps it, so nothing large is pickled
+# per task. Each task scores all 9 profiles x 10 sectors for its dates.
+#
+# Usage:
+#   python -m src.scoring.backtest --horizon 21 --every 21 --top-k 10 --json backtest.json
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..data_processing.data_loader import DataLoader
+from ..data_processing.price_panel import PricePanel, to_day
+from ..data_processing.shared_arrays import Layout, SharedArrays, attach
+from ..data_processing.snapshot import get_keyword_sectors
+from ..data_structures.stock import Stock
+from .recommender import RISK_PROFILES, TIME_INVESTMENTS, SECTORS
+from .stock_scorer import StockScorer
+
+# Per worker process: the attached panel and the shared memory it maps
+WORKER_STATE: Dict[str, Any] = {}
+
+
+class SharedPanel(SharedArrays):
+    # A price panel's arrays copied into one shared memory block
+
+    def __init__(self, panel: PricePanel):
+        super().__init__(panel.arrays())
+        self.tickers = panel.tickers
+        self.industry_tags = panel.industry_tags
+
+
+def attach_worker(memory_name: str, layout: Layout, tickers: List[str], industry_tags: List[str]) -> None:
+    # Pool initializer: map the shared arrays without copying them
+    memory, arrays = attach(memory_name, layout)
+    WORKER_STATE["memory"] = memory
+    WORKER_STATE["panel"] = PricePanel.from_arrays(tickers, industry_tags, arrays)
+    WORKER_STATE["sectors"] = sector_masks(industry_tags)
+
+
+def sector_masks(industry_tags: Sequence[str]) -> Dict[str, np.ndarray]:
+    # Boolean membership per sector, with the same rules as the scorer
+    keyword_sectors = get_keyword_sectors()
+    masks = {sector: np.zeros(len(industry_tags), dtype=bool) for sector in SECTORS}
+    for i, tag in enumerate(industry_tags):
+        for sector in keyword_sectors.get(tag.lower(), ()):
+            masks[sector][i] = True
+    return masks
+
+
+def evaluate_window(panel: PricePanel, sectors: Dict[str, np.ndarray], day: int, exit_day: int, top_k: int) -> List[Dict[str, Any]]:
+    # One row per (risk, time, sector) for a single rebalance date
+    metrics = panel.metrics_at(day)
+    exit_position = panel.positions_at(exit_day)
+    tradable = metrics["listed"] & (exit_position > metrics["position"])
+    forward = np.full(len(tradable), np.nan)
+    forward[tradable] = panel.prices[exit_position[tradable]] / metrics["current_price"][tradable] - 1.0
+
+    rows = []
+    for risk in RISK_PROFILES:
+        for time in TIME_INVESTMENTS:
+            scores = StockScorer(risk, time, "technology").score_arrays(
+                metrics["percent_change"], metrics["year_change"], metrics["volatility"]
+            )
+            for sector, members in sectors.items():
+                candidates = np.flatnonzero(members & tradable)
+                if not len(candidates):
+                    continue
+                picks = candidates[np.argsort(-scores[candidates], kind="stable")[:top_k]]
+                top_return = float(forward[picks].mean())
+                sector_return = float(forward[candidates].mean())
+                rows.append({
+                    "risk": risk, "time": time, "sector": sector, "day": day,
+                    "candidates": len(candidates), "top_return": top_return,
+                    "sector_return": sector_return, "excess": top_return - sector_return
+                })
+    return rows
+
+
+def evaluate_chunk(windows: List[Tuple[int, int]], top_k: int) -> List[Dict[str, Any]]:
+    # Runs in a worker process against the shared panel
+    panel, sectors = WORKER_STATE["panel"], WORKER_STATE["sectors"]
+    rows = []
+    for day, exit_day in windows:
+        rows.extend(evaluate_window(panel, sectors, day, exit_day, top_k))
+    return rows
+
+
+class Backtester:
+
+    def __init__(self, stocks: Sequence[Stock], horizon: int = 21, every: int = 21, top_k: int = 10,
+                 min_history: int = 252, workers: Optional[int] = None):
+        self.panel = PricePanel.from_stocks(stocks)
+        self.horizon = horizon
+        self.every = every
+        self.top_k = top_k
+        self.min_history = min_history
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def windows(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Tuple[int, int]]:
+        # (rebalance day, exit day) pairs on the trading-day grid; none when
+        # the history is too short for min_history plus one horizon
+        days = self.panel.trading_days()
+        last = len(days) - 1 - self.horizon
+        chosen = []
+        for i in range(self.min_history, last + 1, self.every):
+            day = int(days[i])
+            if start is not None and day < to_day(start):
+                continue
+            if end is not None and day > to_day(end):
+                break
+            chosen.append((day, int(days[i + self.horizon])))
+        return chosen
+
+    def run(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        windows = self.windows(start, end)
+        if self.workers <= 1 or len(windows) < 2:
+            sectors = sector_masks(self.panel.industry_tags)
+            rows = []
+            for day, exit_day in windows:
+                rows.extend(evaluate_window(self.panel, sectors, day, exit_day, self.top_k))
+            return rows
+
+        chunks = [windows[i::self.workers * 4] for i in range(min(len(windows), self.workers * 4))]
+        shared = SharedPanel(self.panel)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=attach_worker,
+                                     initargs=(shared.memory.name, shared.layout, shared.tickers, shared.industry_tags)) as pool:
+                rows = []
+                for chunk_rows in pool.map(evaluate_chunk, chunks, [self.top_k] * len(chunks)):
+                    rows.extend(chunk_rows)
+        finally:
+            shared.close()
+        rows.sort(key=lambda row: row["day"])
+        return rows
+
+
+def summarize_backtest(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # One line per (risk, time, sector), best mean excess return first
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((row["risk"], row["time"], row["sector"]), []).append(row)
+
+    summary = []
+    for (risk, time, sector), group in groups.items():
+        excess = np.array([row["excess"] for row in group])
+        spread = excess.std(ddof=1) if len(excess) > 1 else 0.0
+        summary.append({
+            "risk": risk, "time": time, "sector": sector, "windows": len(group),
+            "mean_top_return": float(np.mean([row["top_return"] for row in group])),
+            "mean_sector_return": float(np.mean([row["sector_return"] for row in group])),
+            "mean_excess": float(excess.mean()),
+            "hit_rate": float((excess > 0).mean()),
+            "t_stat": float(excess.mean() / (spread / math.sqrt(len(excess)))) if spread > 0 else 0.0
+        })
+    summary.sort(key=lambda line: line["mean_excess"], reverse=True)
+    return summary
+
+
+def format_summary(summary: List[Dict[str, Any]]) -> str:
+    lines = [f"{'risk':<8}{'time':<8}{'sector':<16}{'windows':>8}{'top':>9}{'sector':>9}{'excess':>9}{'hit':>7}{'t':>7}"]
+    for line in summary:
+        lines.append(
+            f"{line['risk']:<8}{line['time']:<8}{line['sector']:<16}{line['windows']:>8}"
+            f"{line['mean_top_return'] * 100:>8.2f}%{line['mean_sector_return'] * 100:>8.2f}%"
+            f"{line['mean_excess'] * 100:>8.2f}%{line['hit_rate'] * 100:>6.0f}%{line['t_stat']:>7.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backtest MyStok recommendations")
+    parser.add_argument("--data", default="resources/World-Stock-Prices-Dataset.csv")
+    parser.add_argument("--horizon", type=int, default=21, help="holding period in trading days")
+    parser.add_argument("--every", type=int, default=21, help="trading days between rebalance dates")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--min-history", type=int, default=252, help="trading days before the first rebalance")
+    parser.add_argument("--start", help="first rebalance date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last rebalance date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", metavar="PATH", help="write the summary and every window to PATH")
+    args = parser.parse_args(argv)
+
+    stocks = DataLoader(args.data).load_stocks()
+    if not stocks:
+        print("Error: No stock data loaded. Please check the CSV file.")
+        return 1
+
+    backtester = Backtester(stocks, args.horizon, args.every, args.top_k, args.min_history, args.workers)
+    rows = backtester.run(args.start, args.end)
+    if not rows:
+        print(f"Not enough history for any rebalance date: need {args.min_history} trading days "
+              f"before the first one and {args.horizon} after it.")
+        return 1
+
+    summary = summarize_backtest(rows)
+    print(format_summary(summary))
+    if args.json:
+        for row in rows:
+            row["date"] = str(np.datetime64(row["day"], "D"))
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "summary": summary, "windows": rows}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# Benchmark harness for MyStok ranking backends
+#
+# Times build and query separately with perf_counter_ns, runs warmup rounds
+# before the measured repeats and keeps the garbage collector out of the
+# timed sections. Sweeps can be written as JSON or CSV for tracking.
+#
+# Usage:
+#   python -m src.scoring.benchmark --sizes 100 1000 --ks 10 50 --json results.json
+#   python -m src.scoring.benchmark --synthetic-tickers 10000 --sizes 1000 10000
+#   python -m src.scoring.benchmark --check
+
+import argparse
+import csv
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+from itertools import islice
+from time import perf_counter_ns
+from typing import Callable, List, Tuple, Dict, Any, Optional
+from ..data_structures.stock import Stock
+from ..data_structures.ranking import create_backend, get_backend_names
+
+QUERY_TYPES = ["top_k", "range", "descending"]
+
+
+def summarize(samples_ns: List[int]) -> Dict[str, float]:
+    # Summary statistics in seconds
+    if not samples_ns:
+        return {"runs": 0, "min": 0.0, "median": 0.0, "p95": 0.0, "mean": 0.0, "stddev": 0.0}
+
+    ordered = sorted(samples_ns)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "runs": len(ordered),
+        "min": ordered[0] / 1e9,
+        "median": statistics.median(ordered) / 1e9,
+        "p95": ordered[p95_index] / 1e9,
+        "mean": statistics.fmean(ordered) / 1e9,
+        "stddev": (statistics.stdev(ordered) if len(ordered) > 1 else 0.0) / 1e9
+    }
+
+
+def time_callable(fn: Callable[[], Any], warmup: int = 2, repeats: int = 10, disable_gc: bool = True) -> Dict[str, float]:
+    # Time fn() repeatedly with the same warmup and GC handling as the runner
+    samples = []
+    for run in range(warmup + max(1, repeats)):
+        gc_was_enabled = gc.isenabled()
+        if disable_gc:
+            gc.collect()
+            gc.disable()
+        try:
+            start = perf_counter_ns()
+            fn()
+            elapsed = perf_counter_ns() - start
+        finally:
+            if disable_gc and gc_was_enabled:
+                gc.enable()
+        if run >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def run_query(backend, query: str, k: int) -> List[Tuple[float, Stock]]:
+    if query == "range":
+        # Everything at or above the k-th best score
+        top = backend.top_k(k)
+        if not top:
+            return []
+        return backend.range(top[-1][0], top[0][0])
+    if query == "descending":
+        # The first k of the lazy stream, as a multi-sector merge reads it
+        return list(islice(backend.descending(), k))
+    return backend.top_k(k)
+
+
+def check_backends(scored_stocks: List[Tuple[float, Stock]], ks: List[int], backend_names: Optional[List[str]] = None) -> List[str]:
+    # Every backend must answer every query the same way. A range holds every
+    # stock within its bounds, so ranges are compared entry by entry (sorted,
+    # as backends may order ties differently). top_k and descending may pick
+    # any of the stocks tied at the k-th score, so only their scores are
+    # compared. Returns the disagreements.
+    names = backend_names or get_backend_names()
+    backends = {}
+    for name in names:
+        backends[name] = create_backend(name)
+        backends[name].build(scored_stocks)
+
+    def answers(backend) -> Dict[str, Any]:
+        result = {}
+        for query in QUERY_TYPES:
+            for k in ks:
+                entries = run_query(backend, query, k)
+                if query == "range":
+                    result[f"{query} k={k}"] = sorted((score, stock.ticker) for score, stock in entries)
+                else:
+                    result[f"{query} k={k}"] = [score for score, _ in entries]
+        result["range all"] = sorted((score, stock.ticker) for score, stock in backend.range(float("-inf"), float("inf")))
+        result["ranks"] = [backend.rank(stock) for _, stock in scored_stocks]
+        return result
+
+    problems = []
+    expected = answers(backends[names[0]])
+    for name in names[1:]:
+        for key, value in answers(backends[name]).items():
+            if value != expected[key]:
+                problems.append(f"{name} disagrees with {names[0]} on {key}")
+    return problems
+
+
+def duplicate_scored_stocks(n: int, distinct: int = 7, seed: int = 0) -> List[Tuple[float, Stock]]:
+    # Few distinct scores over many stocks, so every query crosses ties
+    rng = random.Random(seed)
+    return [(float(rng.randrange(distinct)), Stock(f"DUP{i}", f"Duplicate {i}", "check", 100.0, [100.0, 100.0]))
+            for i in range(n)]
+
+
+class BenchmarkRunner:
+    # Repeated, GC-controlled timing of ranking backends
+
+    def __init__(self, backend_names: Optional[List[str]] = None, warmup: int = 2, repeats: int = 10, disable_gc: bool = True):
+        self.backend_names = backend_names or get_backend_names()
+        self.warmup = warmup
+        self.repeats = max(1, repeats)
+        self.disable_gc = disable_gc
+
+    def time_backend(self, name: str, scored_stocks: List[Tuple[float, Stock]], k: int, query: str = "top_k") -> Dict[str, Any]:
+        build_samples = []
+        query_samples = []
+        backend = None
+        result = []
+
+        for run in range(self.warmup + self.repeats):
+            gc_was_enabled = gc.isenabled()
+            if self.disable_gc:
+                gc.collect()
+                gc.disable()
+            try:
+                start = perf_counter_ns()
+                backend = create_backend(name)
+                backend.build(scored_stocks)
+                built = perf_counter_ns()
+                result = run_query(backend, query, k)
+                done = perf_counter_ns()
+            finally:
+                if self.disable_gc and gc_was_enabled:
+                    gc.enable()
+
+            if run >= self.warmup:
+                build_samples.append(built - start)
+                query_samples.append(done - built)
+
+        return {
+            "backend": name,
+            "n": len(scored_stocks),
+            "k": k,
+            "query": query,
+            "build": summarize(build_samples),
+            "query_time": summarize(query_samples),
+            "top_stocks": result,
+            "size": backend.get_size() if backend is not None else 0
+        }
+
+    def sweep(self, scored_stocks: List[Tuple[float, Stock]], sizes: List[int], ks: List[int], queries: Optional[List[str]] = None, seed: int = 0) -> List[Dict[str, Any]]:
+        # One flat row per (backend, n, k, query). Each n is a seeded random
+        # sample so the input order is not the scorer's sorted order.
+        rows = []
+        rng = random.Random(seed)
+        for n in sizes:
+            if n > len(scored_stocks):
+                print(f"Skipping n={n}: only {len(scored_stocks)} scored stocks available")
+                continue
+            sample = rng.sample(scored_stocks, n)
+            for k in ks:
+                for query in queries or ["top_k"]:
+                    for name in self.backend_names:
+                        rows.append(self.flatten(self.time_backend(name, sample, k, query)))
+        return rows
+
+    def flatten(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        row = {key: result[key] for key in ("backend", "n", "k", "query")}
+        for phase, key in (("build", "build"), ("query", "query_time")):
+            for stat, value in result[key].items():
+                row[f"{phase}_{stat}"] = value
+        return row
+
+
+def write_json(rows: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+def write_csv(rows: List[Dict[str, Any]], path: str) -> None:
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'backend':<16}{'n':>8}{'k':>6}{'query':>12}{'build med':>14}{'build p95':>14}{'query med':>14}{'query p95':>14}"]
+    for row in rows:
+        lines.append(
+            f"{row['backend']:<16}{row['n']:>8}{row['k']:>6}{row['query']:>12}"
+            f"{row['build_median']:>13.6f}s{row['build_p95']:>13.6f}s"
+            f"{row['query_median']:>13.6f}s{row['query_p95']:>13.6f}s"
+        )
+    return "\n".join(lines)
+
+
+def load_scored_stocks(csv_path: str, risk_profile: str, time_investment: str, sector_preference: str, synthetic_tickers: int = 0, seed: int = 0) -> List[Tuple[float, Stock]]:
+    from ..data_processing.data_loader import DataLoader
+    from ..data_processing.synthetic_data import SyntheticMarketGenerator
+    from .stock_scorer import StockScorer
+
+    if synthetic_tickers > 0:
+        stocks = SyntheticMarketGenerator(num_tickers=synthetic_tickers, seed=seed).generate_stocks()
+    else:
+        stocks = DataLoader(csv_path).load_stocks()
+    scorer = StockScorer(risk_profile, time_investment, sector_preference)
+    if sector_preference != "all":
+        stocks = scorer.filter_by_sector(stocks)
+    return scorer.score_stocks(stocks)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MyStok ranking backends")
+    parser.add_argument("--csv", default="resources/World-Stock-Prices-Dataset.csv")
+    parser.add_argument("--synthetic-tickers", type=int, default=0, help="benchmark on generated data instead of --csv")
+    parser.add_argument("--risk", default="medium", choices=["low", "medium", "high"])
+    parser.add_argument("--time", default="medium", choices=["short", "medium", "long"])
+    parser.add_argument("--sector", default="all", help="sector to score, or 'all'")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--ks", type=int, nargs="+", default=[10])
+    parser.add_argument("--queries", nargs="+", default=["top_k"], choices=QUERY_TYPES)
+    parser.add_argument("--backends", nargs="+", default=None, choices=get_backend_names())
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--keep-gc", action="store_true", help="leave the garbage collector on while timing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write results as JSON")
+    parser.add_argument("--out-csv", dest="csv_out", help="write results as CSV")
+    parser.add_argument("--check", action="store_true", help="check that every backend returns the same results, then exit")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = []
+        for n in args.sizes:
+            problems.extend(check_backends(duplicate_scored_stocks(n, seed=args.seed), args.ks, args.backends))
+        if not args.synthetic_tickers and not os.path.exists(args.csv):
+            print(f"{args.csv} not found; checked duplicate scores only")
+        else:
+            problems.extend(check_backends(load_scored_stocks(args.csv, args.risk, args.time, args.sector,
+                                                              args.synthetic_tickers, args.seed), args.ks, args.backends))
+        for problem in problems:
+            print(problem)
+        print("Backends agree." if not problems else f"{len(problems)} disagreements.")
+        return 1 if problems else 0
+
+    scored_stocks = load_scored_stocks(args.csv, args.risk, args.time, args.sector, args.synthetic_tickers, args.seed)
+    if not scored_stocks:
+        print("Error: no stocks to benchmark.")
+        return 1
+
+    runner = BenchmarkRunner(args.backends, args.warmup, args.repeats, not args.keep_gc)
+    rows = runner.sweep(scored_stocks, args.sizes, args.ks, args.queries, args.seed)
+    print(format_rows(rows))
+
+    if args.json_path:
+        write_json(rows, args.json_path)
+    if args.csv_out:
+        write_csv(rows, args.csv_out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
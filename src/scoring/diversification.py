@@ -0,0 +1,98 @@
+# Diversified recommendations for MyStok application
+#
+# The highest scores are often names from the same sub-industry that move
+# together. Diversified selection walks candidates in score order and keeps
+# one only if its return correlation with every stock already picked is at
+# most max_correlation. It may return fewer than k stocks when too few
+# candidates pass the cap.
+#
+# Returns come from the last LOOKBACK_DAYS closes. When every candidate has
+# dates, the closes are aligned on a common trading-day grid: a missing day
+# carries the previous close forward, so its return is 0. Otherwise the
+# histories are aligned on their last observation.
+
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from ..data_structures.stock import Stock
+from ..instrumentation.profiler import PROFILER
+from .indicators import flatten_histories, gather_tails
+
+LOOKBACK_DAYS = 252
+
+
+def aligned_prices(stocks: Sequence[Stock], lookback: int = LOOKBACK_DAYS) -> np.ndarray:
+    # (stocks, lookback + 1) closes, newest last, NaN before a stock's first close
+    width = lookback + 1
+    prices, offsets = flatten_histories([stock.historical_data for stock in stocks])
+    if any(stock.dates is None for stock in stocks):
+        return gather_tails(prices, offsets, width)
+
+    # Only each stock's last `width` dates can fall in the last `width` dates overall
+    days = np.concatenate([np.asarray(stock.dates, dtype="datetime64[D]").astype(np.int64) for stock in stocks]).astype(np.float64)
+    day_tails = gather_tails(days, offsets, width)
+    price_tails = gather_tails(prices, offsets, width)
+    present = np.isfinite(day_tails)
+    grid = np.unique(day_tails[present])[-width:]
+
+    matrix = np.full((len(stocks), len(grid)), np.nan)
+    rows = np.broadcast_to(np.arange(len(stocks))[:, None], day_tails.shape)
+    on_grid = present & (day_tails >= grid[0])
+    matrix[rows[on_grid], np.searchsorted(grid, day_tails[on_grid])] = price_tails[on_grid]
+
+    # Forward fill along each row: index of the last seen close at each column
+    seen = np.where(np.isfinite(matrix), np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(seen, axis=1, out=seen)
+    filled = matrix[np.arange(len(stocks))[:, None], seen]
+    return filled
+
+
+def correlation_matrix(stocks: Sequence[Stock], lookback: int = LOOKBACK_DAYS) -> np.ndarray:
+    # Pearson correlation of daily log returns, (stocks, stocks) float32.
+    # Stocks with no usable returns correlate 0 with everything.
+    with PROFILER.span("correlation_matrix") as span:
+        prices = aligned_prices(stocks, lookback)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.diff(np.log(prices), axis=1)
+        returns[~np.isfinite(returns)] = np.nan
+
+        counts = np.isfinite(returns).sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centered = returns - np.nanmean(returns, axis=1, keepdims=True)
+        centered = np.nan_to_num(centered, nan=0.0)
+        norms = np.sqrt((centered * centered).sum(axis=1, keepdims=True))
+        scaled = np.divide(centered, norms, out=np.zeros_like(centered), where=(norms > 0) & (counts > 1))
+
+        scaled = scaled.astype(np.float32)
+        correlation = scaled @ scaled.T
+        span.add("stocks", len(stocks))
+    return correlation
+
+
+def select_diversified(ranked: Sequence[Tuple[float, Stock]], k: int, correlation: np.ndarray,
+                       index: Dict[Stock, int], max_correlation: float) -> List[Tuple[float, Stock]]:
+    # Greedy pick in score order under the correlation cap. Each pick updates
+    # every candidate's highest correlation with the picks so far in one step.
+    if not ranked or k <= 0:
+        return []
+    rows = np.fromiter((index[stock] for _, stock in ranked), dtype=np.int64, count=len(ranked))
+    highest = np.full(len(ranked), -np.inf, dtype=np.float32)
+    available = np.ones(len(ranked), dtype=bool)
+
+    picks = []
+    while len(picks) < k:
+        candidates = np.flatnonzero(available & (highest <= max_correlation))
+        if not len(candidates):
+            break
+        position = candidates[0]
+        picks.append(ranked[position])
+        available[position] = False
+        np.maximum(highest, correlation[rows[position], rows], out=highest)
+    return picks
+
+
+def diversify(ranked: Sequence[Tuple[float, Stock]], k: int, max_correlation: float,
+              lookback: int = LOOKBACK_DAYS) -> List[Tuple[float, Stock]]:
+    # One-off version that builds the matrix for just these candidates
+    stocks = [stock for _, stock in ranked]
+    index = {stock: i for i, stock in enumerate(stocks)}
+    return select_diversified(ranked, k, correlation_matrix(stocks, lookback), index, max_correlation)
@@ -0,0 +1,244 @@
+# Technical indicators for MyStok application
+#
+# Computes indicators for many tickers in one pass with NumPy. All price
+# histories are concatenated into a single flat array with per-ticker
+# offsets. Rolling windows come from cumulative sums over that array, and
+# exponential averages from a weighted tail gathered with fancy indexing.
+# No Python loop runs over the history of a ticker.
+#
+# Indicators are the latest values for each ticker:
+#   volatility      std of daily % returns over the last VOLATILITY_WINDOW days
+#   sma_20, sma_50  simple moving averages of the close
+#   ema_20          exponential moving average of the close
+#   rsi_14          relative strength index with Wilder smoothing
+#   max_drawdown    largest peak-to-trough fall over the whole history, in %
+#   return_Nd       % return over the last N observations
+# A value is NaN when the history is too short for it.
+
+import math
+import threading
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..data_structures.stock import Stock
+from ..instrumentation.profiler import PROFILER
+
+VOLATILITY_WINDOW = 20
+SMA_WINDOWS = (20, 50)
+EMA_SPAN = 20
+RSI_PERIOD = 14
+RETURN_PERIODS = (5, 21, 63, 252)
+# Exponential weights older than this fraction of the newest are dropped
+EMA_TOLERANCE = 1e-6
+
+
+def flatten_histories(histories: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    # One float array holding every history, and offsets so that ticker i
+    # owns prices[offsets[i]:offsets[i + 1]]
+    lengths = np.fromiter((len(history) for history in histories), dtype=np.int64, count=len(histories))
+    offsets = np.zeros(len(histories) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.zeros(0), offsets
+    prices = np.concatenate([np.asarray(history, dtype=np.float64) for history in histories if len(history)])
+    return prices, offsets
+
+
+def segment_starts(offsets: np.ndarray) -> np.ndarray:
+    # Start offset of the owning ticker for every element of the flat array
+    return np.repeat(offsets[:-1], np.diff(offsets))
+
+
+def daily_returns(prices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # Simple returns in %; NaN on the first observation of each ticker
+    returns = np.full(len(prices), np.nan)
+    if len(prices) > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[1:] = (prices[1:] / prices[:-1] - 1.0) * 100.0
+    returns[offsets[:-1][np.diff(offsets) > 0]] = np.nan
+    return returns
+
+
+def prefix_sums(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Cumulative sum, sum of squares and count of finite values, each with a
+    # leading 0, so any window's totals are two lookups
+    finite = np.isfinite(values)
+    clean = np.where(finite, values, 0.0)
+    sums = np.concatenate(([0.0], np.cumsum(clean)))
+    squares = np.concatenate(([0.0], np.cumsum(clean * clean)))
+    valid_counts = np.concatenate(([0], np.cumsum(finite)))
+    return sums, squares, valid_counts
+
+
+def rolling_mean_std(values: np.ndarray, starts: np.ndarray, window: int,
+                     positions: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Rolling mean and sample std of the windows ending at `positions` (every
+    # element by default), from cumulative sums over the flat array. A window
+    # is valid only if it stays inside one ticker and has no NaN.
+    if positions is None:
+        positions = np.arange(len(values))
+    return window_mean_std(prefix_sums(values), starts, window, positions)
+
+
+def window_mean_std(prefix: Tuple[np.ndarray, np.ndarray, np.ndarray], starts: np.ndarray, window: int,
+                    positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # rolling_mean_std on prefix sums computed once (see prefix_sums)
+    sums, squares, valid_counts = prefix
+    mean = np.full(len(positions), np.nan)
+    std = np.full(len(positions), np.nan)
+
+    end = positions + 1
+    begin = end - window
+    complete = begin >= starts[positions]
+    complete[complete] = valid_counts[end[complete]] - valid_counts[begin[complete]] == window
+    end, begin = end[complete], begin[complete]
+
+    window_sum = sums[end] - sums[begin]
+    mean[complete] = window_sum / window
+    if window > 1:
+        variance = (squares[end] - squares[begin] - window_sum * window_sum / window) / (window - 1)
+        std[complete] = np.sqrt(np.maximum(variance, 0.0))
+    return mean, std
+
+
+def gather_tails(values: np.ndarray, offsets: np.ndarray, length: int) -> np.ndarray:
+    # Last `length` values of every ticker as a (tickers, length) matrix,
+    # newest in the last column and NaN where the history is shorter
+    starts, ends = offsets[:-1, None], offsets[1:, None]
+    index = ends - length + np.arange(length)
+    inside = index >= starts
+    if len(values) == 0:
+        return np.full(index.shape, np.nan)
+    return np.where(inside, values[np.clip(index, 0, len(values) - 1)], np.nan)
+
+
+def exponential_average(tails: np.ndarray, alpha: float) -> np.ndarray:
+    # Weighted mean of each row with weights (1 - alpha)^age, normalised over
+    # the values present (the same as pandas ewm(adjust=True) on the tail)
+    ages = np.arange(tails.shape[1] - 1, -1, -1)
+    weights = (1.0 - alpha) ** ages
+    present = np.isfinite(tails)
+    total = (np.where(present, tails, 0.0) * weights).sum(axis=1)
+    norm = (present * weights).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(norm > 0, total / norm, np.nan)
+
+
+def tail_length(alpha: float, longest: int) -> int:
+    # Enough history for the dropped weights to fall under EMA_TOLERANCE
+    needed = int(math.ceil(math.log(EMA_TOLERANCE) / math.log(1.0 - alpha))) + 1
+    return max(1, min(needed, longest))
+
+
+def max_drawdowns(prices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # Running peaks for all tickers in one accumulate: each ticker's log
+    # prices are lifted above everything before it, so a peak never carries
+    # over from the previous ticker
+    result = np.full(len(offsets) - 1, np.nan)
+    lengths = np.diff(offsets)
+    if len(prices) == 0:
+        return result
+
+    logs = np.log(np.where(prices > 0, prices, np.nan))
+    logs = np.where(np.isfinite(logs), logs, np.nanmin(logs) if np.isfinite(logs).any() else 0.0)
+    lift = logs.max() - logs.min() + 1.0
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    lifted = logs + owner * lift
+    peaks = np.maximum.accumulate(lifted)
+    drawdown = (1.0 - np.exp(lifted - peaks)) * 100.0
+
+    has_prices = lengths > 0
+    result[has_prices] = np.maximum.reduceat(drawdown, offsets[:-1][has_prices])
+    return result
+
+
+def compute_indicators(histories: Sequence[Sequence[float]]) -> Dict[str, np.ndarray]:
+    # Columnar indicators for every history: {name: array with one value per ticker}
+    return indicator_columns(*flatten_histories(histories))
+
+
+def indicator_columns(prices: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+    # compute_indicators on histories already in flat form
+    lengths = np.diff(offsets)
+    last = offsets[1:] - 1
+    has_prices = lengths > 0
+    starts = segment_starts(offsets)
+    longest = int(lengths.max()) if len(lengths) else 0
+
+    def latest(series: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        # Spread values computed at each ticker's last position back to one per ticker
+        out = (np.full(len(lengths), np.nan), np.full(len(lengths), np.nan))
+        out[0][has_prices], out[1][has_prices] = series
+        return out
+
+    columns: Dict[str, np.ndarray] = {}
+    returns = daily_returns(prices, offsets)
+    _, columns["volatility"] = latest(rolling_mean_std(returns, starts, VOLATILITY_WINDOW, last[has_prices]))
+
+    for window in SMA_WINDOWS:
+        columns[f"sma_{window}"], _ = latest(rolling_mean_std(prices, starts, window, last[has_prices]))
+
+    alpha = 2.0 / (EMA_SPAN + 1)
+    columns[f"ema_{EMA_SPAN}"] = exponential_average(gather_tails(prices, offsets, tail_length(alpha, longest)), alpha)
+
+    # Wilder's RSI: exponential averages of gains and losses with alpha = 1/period
+    alpha = 1.0 / RSI_PERIOD
+    changes = gather_tails(returns, offsets, tail_length(alpha, longest))
+    gains = exponential_average(np.where(changes > 0, changes, np.where(np.isnan(changes), np.nan, 0.0)), alpha)
+    losses = exponential_average(np.where(changes < 0, -changes, np.where(np.isnan(changes), np.nan, 0.0)), alpha)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(losses > 0, 100.0 - 100.0 / (1.0 + gains / losses), np.where(gains > 0, 100.0, 50.0))
+    columns[f"rsi_{RSI_PERIOD}"] = np.where(lengths > RSI_PERIOD, rsi, np.nan)
+
+    columns["max_drawdown"] = max_drawdowns(prices, offsets)
+
+    for period in RETURN_PERIODS:
+        base = last - period
+        enough = has_prices & (lengths > period)
+        change = np.full(len(lengths), np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change[enough] = (prices[last[enough]] / prices[base[enough]] - 1.0) * 100.0
+        columns[f"return_{period}d"] = change
+    return columns
+
+
+class IndicatorEngine:
+    # Per-stock indicator cache. An entry remembers the history length it was
+    # computed from, so appending prices to a stock makes it stale; stale or
+    # missing stocks are recomputed together in one vectorized batch.
+    # Entries are dropped with their Stock objects.
+
+    def __init__(self):
+        self.cache: "weakref.WeakKeyDictionary[Stock, Tuple[int, Dict[str, float]]]" = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+    def lookup(self, stock: Stock):
+        entry = self.cache.get(stock)
+        if entry is not None and entry[0] == len(stock.historical_data):
+            return entry[1]
+        return None
+
+    def compute(self, stocks: Sequence[Stock]) -> List[Dict[str, float]]:
+        stale = [stock for stock in stocks if self.lookup(stock) is None]
+        if stale:
+            with PROFILER.span("compute_indicators") as span:
+                columns = compute_indicators([stock.historical_data for stock in stale])
+                names = list(columns)
+                rows = zip(*(columns[name].tolist() for name in names))
+                with self.lock:
+                    for stock, values in zip(stale, rows):
+                        self.cache[stock] = (len(stock.historical_data), dict(zip(names, values)))
+                span.add("stocks", len(stale))
+        return [self.cache[stock][1] for stock in stocks]
+
+    def get(self, stock: Stock) -> Dict[str, float]:
+        cached = self.lookup(stock)
+        return cached if cached is not None else self.compute([stock])[0]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+
+
+# Shared engine used by the scorer
+INDICATORS = IndicatorEngine()
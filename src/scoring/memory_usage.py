@@ -0,0 +1,100 @@
+# Memory accounting for MyStok ranking backends
+#
+# Two views of the same run: tracemalloc reports what building and querying
+# actually allocated (peak, retained, allocation count), and deep_sizeof
+# walks the finished structure to report what it keeps resident per element.
+# Stock objects are shared with the rest of the application, so they are
+# never charged to a structure.
+
+import sys
+import tracemalloc
+from types import FunctionType, ModuleType
+from typing import Any, Dict, List, Tuple
+from ..data_structures.stock import Stock
+from ..data_structures.ranking import create_backend
+from .benchmark import run_query
+
+SKIP_TYPES = (type, ModuleType, FunctionType, Stock)
+
+
+def deep_sizeof(obj: Any) -> int:
+    # Total getsizeof of obj and everything reachable from it, counted once
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+        for slot in getattr(type(current), "__slots__", ()):
+            if hasattr(current, slot):
+                stack.append(getattr(current, slot))
+    return total
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    # Snapshot without the blocks earlier snapshots allocated themselves
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def count_new_blocks(after: tracemalloc.Snapshot, before: tracemalloc.Snapshot) -> int:
+    # Net number of memory blocks allocated between two snapshots
+    return sum(max(0, stat.count_diff) for stat in after.compare_to(before, "filename"))
+
+
+def measure_backend_memory(name: str, scored_stocks: List[Tuple[float, Stock]], k: int, query: str = "top_k") -> Dict[str, Any]:
+    # One traced build and query. Kept separate from the timing runs because
+    # tracing slows allocation down considerably.
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+
+    try:
+        baseline_snapshot = take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        backend = create_backend(name)
+        backend.build(scored_stocks)
+        after_build, build_peak = tracemalloc.get_traced_memory()
+        build_snapshot = take_snapshot()
+        before_query, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        run_query(backend, query, k)
+        _, query_peak = tracemalloc.get_traced_memory()
+        query_snapshot = take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    elements = backend.get_size()
+    structure_bytes = deep_sizeof(backend)
+    return {
+        "build_peak": build_peak - baseline,
+        "query_peak": max(0, query_peak - before_query),
+        "retained": after_build - baseline,
+        "structure_bytes": structure_bytes,
+        "bytes_per_element": structure_bytes / elements if elements else 0.0,
+        "build_allocations": count_new_blocks(build_snapshot, baseline_snapshot),
+        "query_allocations": count_new_blocks(query_snapshot, build_snapshot)
+    }
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
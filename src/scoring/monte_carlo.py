@@ -0,0 +1,111 @@
+# Monte Carlo risk for MyStok application
+#
+# Bootstrap simulation of every stock's return over the investment horizon
+# (HORIZON_DAYS per time_investment). Paths resample the stock's own daily
+# log returns from its last LOOKBACK_DAYS, in blocks of consecutive days so
+# short-range autocorrelation survives. Each path is BLOCK_DRAWS blocks, and
+# a block's sum is two lookups in the stock's prefix sums. All stocks and
+# paths are drawn together as (stocks, paths) arrays in chunks of stocks,
+# with one seeded generator per chunk, so results are reproducible.
+#
+# Per stock the simulation gives:
+#   var             value-at-risk at CONFIDENCE: the horizon loss in % that
+#                   only 1 - CONFIDENCE of paths exceed (negative if even
+#                   those paths gain)
+#   prob_loss       share of paths that end below today's close
+#   expected_return mean horizon return over the paths, in %
+#   risk_measure    var turned back into a daily figure, var / (z * sqrt(h)),
+#                   so it is on the scale of the daily volatility the risk
+#                   score uses otherwise
+# Stocks with fewer than MIN_RETURNS returns get NaN and keep the usual
+# risk measure.
+
+import math
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+import numpy as np
+from ..data_structures.stock import Stock
+from ..instrumentation.profiler import PROFILER
+from .indicators import daily_returns, flatten_histories, gather_tails
+
+HORIZON_DAYS = {"short": 63, "medium": 252, "long": 756}
+LOOKBACK_DAYS = 756
+MIN_RETURNS = 60
+PATHS = 2000
+BLOCK_DRAWS = 21
+CONFIDENCE = 0.95
+SEED = 11
+# Stocks simulated together; bounds the (stocks, paths) working arrays
+CHUNK_STOCKS = 512
+
+
+def block_length(horizon: int) -> int:
+    return max(1, math.ceil(horizon / BLOCK_DRAWS))
+
+
+def simulate_returns(stocks: Sequence[Stock], horizon: int, paths: int = PATHS, seed: int = SEED,
+                     lookback: int = LOOKBACK_DAYS) -> Dict[str, np.ndarray]:
+    # Horizon risk figures for every stock, one array per figure
+    prices, offsets = flatten_histories([stock.historical_data[-(lookback + 1):] for stock in stocks])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_returns = np.log1p(daily_returns(prices, offsets) / 100.0)
+    # (stocks, lookback) with the newest return last; a stock's returns fill its last `counts` columns
+    tails = gather_tails(log_returns, offsets, lookback)
+    counts = np.isfinite(tails)[:, ::-1].cumprod(axis=1).sum(axis=1)
+    sums = np.concatenate([np.zeros((len(stocks), 1)), np.cumsum(np.nan_to_num(tails, nan=0.0, posinf=0.0, neginf=0.0), axis=1)], axis=1)
+
+    length = block_length(horizon)
+    full_blocks, remainder = divmod(horizon, length)
+    valid = counts >= max(MIN_RETURNS, length)
+    quantile = 1.0 - CONFIDENCE
+    results = {name: np.full(len(stocks), np.nan) for name in ("var", "prob_loss", "expected_return")}
+
+    for start in range(0, len(stocks), CHUNK_STOCKS):
+        rows = start + np.flatnonzero(valid[start:start + CHUNK_STOCKS])
+        if not len(rows):
+            continue
+        rng = np.random.default_rng([seed, start])
+        first = (lookback - counts[rows])[:, None]
+        chunk_sums = sums[rows]
+        picks = np.arange(len(rows))[:, None]
+        totals = np.zeros((len(rows), paths))
+        for size in [length] * full_blocks + ([remainder] if remainder else []):
+            # Block starts anywhere in the stock's returns that leaves room for `size` days
+            begin = first + rng.integers(0, (counts[rows] - size + 1)[:, None], size=(len(rows), paths))
+            totals += chunk_sums[picks, begin + size] - chunk_sums[picks, begin]
+        simple = np.expm1(totals) * 100.0
+        results["var"][rows] = -np.quantile(simple, quantile, axis=1)
+        results["prob_loss"][rows] = (simple < 0).mean(axis=1)
+        results["expected_return"][rows] = simple.mean(axis=1)
+
+    z = NormalDist().inv_cdf(CONFIDENCE)
+    results["risk_measure"] = np.maximum(results["var"], 0.0) / (z * math.sqrt(horizon))
+    return results
+
+
+class MonteCarloRisk:
+    # Simulated risk for a fixed universe and one horizon
+
+    def __init__(self, stocks: Sequence[Stock], time_investment: str, paths: int = PATHS, seed: int = SEED):
+        if time_investment not in HORIZON_DAYS:
+            raise ValueError(f"Unknown time investment: {time_investment}")
+        with PROFILER.span("monte_carlo_risk") as span:
+            self.stocks = list(stocks)
+            self.horizon = HORIZON_DAYS[time_investment]
+            self.paths = paths
+            self.row_of = {stock: row for row, stock in enumerate(self.stocks)}
+            self.figures = simulate_returns(self.stocks, self.horizon, paths, seed)
+            span.add("stocks", len(self.stocks))
+            span.add("paths", len(self.stocks) * paths)
+
+    def risk_measure(self, stock: Stock) -> float:
+        # NaN for a stock outside the universe or with too little history
+        row = self.row_of.get(stock)
+        return float(self.figures["risk_measure"][row]) if row is not None else math.nan
+
+    def lookup(self, stock: Stock) -> Optional[Dict[str, float]]:
+        # var, prob_loss and expected_return of the stock, if simulated
+        row = self.row_of.get(stock)
+        if row is None or math.isnan(self.figures["var"][row]):
+            return None
+        return {name: float(self.figures[name][row]) for name in ("var", "prob_loss", "expected_return")}
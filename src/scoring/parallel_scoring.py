@@ -0,0 +1,204 @@
+# Multiprocess scoring for very large universes
+#
+# Scoring is one NumPy pass, but over hundreds of thousands of tickers with
+# long histories the indicator step alone keeps one core busy. ParallelScorer
+# copies the flat price array, its offsets and each ticker's metrics into
+# shared memory once, and a process pool maps them without copying. Tickers
+# are split into contiguous blocks holding about the same number of closes,
+# so each task reads one slice of the flat array.
+#
+# - compute_indicators(): each worker computes the indicator columns for its
+#   blocks and writes them into shared output arrays.
+# - top_k(scorer, k): each worker scores its blocks for the profile, keeps
+#   the scorer's sector, and returns only its local top k (rows and scores).
+#   The parent merges those lists, so about k rows per block cross process
+#   boundaries however large the universe is.
+#
+# Results match StockScorer.score_stocks, ties included: higher score first,
+# then the earlier stock.
+#
+# Usage:
+#   python -m src.scoring.parallel_scoring --synthetic-tickers 200000 --workers 8
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..data_structures.stock import Stock
+from ..data_processing.shared_arrays import Layout, SharedArrays, attach
+from ..instrumentation.profiler import PROFILER
+from .indicators import compute_indicators, flatten_histories, indicator_columns
+from .stock_scorer import StockScorer
+
+# Tasks per worker, so a slow block does not leave the other workers idle
+BLOCKS_PER_WORKER = 4
+INDICATOR_NAMES = list(compute_indicators([[1.0, 1.0]]))
+
+# Per worker process: the shared memory and the arrays it maps
+WORKER_STATE: Dict[str, Any] = {}
+
+
+def attach_worker(memory_name: str, layout: Layout) -> None:
+    # Pool initializer: map the shared arrays without copying them
+    WORKER_STATE["memory"], WORKER_STATE["arrays"] = attach(memory_name, layout)
+
+
+def indicator_block(start: int, stop: int) -> int:
+    # Indicator columns for tickers [start, stop), written in place
+    arrays = WORKER_STATE["arrays"]
+    offsets = arrays["offsets"][start:stop + 1]
+    columns = indicator_columns(arrays["prices"][offsets[0]:offsets[-1]], offsets - offsets[0])
+    for name, values in columns.items():
+        arrays[f"indicator:{name}"][start:stop] = values
+    return stop - start
+
+
+def top_k_block(risk_profile: str, time_investment: str, codes: Optional[List[int]], start: int, stop: int,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # The block's k best (rows, scores), ordered by score and then row
+    arrays = WORKER_STATE["arrays"]
+    scores = StockScorer(risk_profile, time_investment, "technology").score_arrays(
+        arrays["percent_change"][start:stop], arrays["year_change"][start:stop], arrays["indicator:volatility"][start:stop]
+    )
+    rows = np.arange(start, stop) if codes is None else start + np.flatnonzero(np.isin(arrays["tag_codes"][start:stop], codes))
+    return select_top_k(rows, scores[rows - start], k)
+
+
+def select_top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Partial selection that keeps every tie with the k-th score, so the
+    # final order by (score, row) is the same as a full stable sort
+    if len(rows) > k > 0:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= threshold
+        rows, scores = rows[keep], scores[keep]
+    order = np.lexsort((rows, -scores))[:max(k, 0)]
+    return rows[order], scores[order]
+
+
+class ParallelScorer:
+    # A process pool over one universe; use as a context manager or call close()
+
+    def __init__(self, stocks: Sequence[Stock], workers: Optional[int] = None):
+        with PROFILER.span("share_universe") as span:
+            self.stocks = list(stocks)
+            self.workers = workers if workers is not None else (os.cpu_count() or 1)
+            prices, offsets = flatten_histories([stock.historical_data for stock in self.stocks])
+            tags = [stock.industry_tag.lower() for stock in self.stocks]
+            self.tag_code = {tag: code for code, tag in enumerate(dict.fromkeys(tags))}
+            count = len(self.stocks)
+            arrays = {
+                "prices": prices,
+                "offsets": offsets,
+                "percent_change": np.fromiter((stock.percent_change for stock in self.stocks), dtype=np.float64, count=count),
+                "year_change": np.fromiter((stock.year_change for stock in self.stocks), dtype=np.float64, count=count),
+                "tag_codes": np.fromiter((self.tag_code[tag] for tag in tags), dtype=np.int32, count=count)
+            }
+            for name in INDICATOR_NAMES:
+                arrays[f"indicator:{name}"] = np.full(count, np.nan)
+            self.shared = SharedArrays(arrays)
+            self.blocks = self.split_blocks(offsets)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=attach_worker,
+                                            initargs=(self.shared.name, self.shared.layout))
+            self.indicators_ready = False
+            span.add("stocks", count)
+
+    def split_blocks(self, offsets: np.ndarray) -> List[Tuple[int, int]]:
+        # Contiguous ticker ranges with about the same number of closes each
+        count = len(offsets) - 1
+        if count == 0:
+            return []
+        targets = np.linspace(0, offsets[-1], self.workers * BLOCKS_PER_WORKER + 1)
+        bounds = np.unique(np.concatenate(([0, count], np.searchsorted(offsets, targets[1:-1]))))
+        return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def compute_indicators(self) -> Dict[str, np.ndarray]:
+        # Every indicator column for the whole universe (views of shared memory)
+        if not self.indicators_ready:
+            with PROFILER.span("parallel_indicators") as span:
+                starts, stops = zip(*self.blocks) if self.blocks else ((), ())
+                done = sum(self.pool.map(indicator_block, starts, stops))
+                span.add("stocks", done)
+            self.indicators_ready = True
+        return {name: self.shared.arrays[f"indicator:{name}"] for name in INDICATOR_NAMES}
+
+    def top_k(self, scorer: StockScorer, k: int = 10, all_sectors: bool = False) -> List[Tuple[float, Stock]]:
+        # The scorer's top k in its sector (or the whole universe)
+        self.compute_indicators()
+        codes = None
+        if not all_sectors:
+            keywords = scorer.get_sector_keywords(scorer.sector_preference)
+            codes = [self.tag_code[keyword] for keyword in keywords if keyword in self.tag_code]
+        with PROFILER.span("parallel_top_k") as span:
+            tasks = [self.pool.submit(top_k_block, scorer.risk_profile, scorer.time_investment, codes, start, stop, k)
+                     for start, stop in self.blocks]
+            parts = [task.result() for task in tasks]
+            if not parts:
+                return []
+            rows, scores = select_top_k(np.concatenate([rows for rows, _ in parts]),
+                                        np.concatenate([scores for _, scores in parts]), k)
+            span.add("blocks", len(parts))
+        return [(score, self.stocks[row]) for score, row in zip(scores.tolist(), rows.tolist())]
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.shared.close()
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a universe across worker processes")
+    parser.add_argument("--data", default="resources/World-Stock-Prices-Dataset.csv")
+    parser.add_argument("--synthetic-tickers", type=int, default=0, help="score generated data instead of --data")
+    parser.add_argument("--years", type=int, default=10, help="history length of generated data")
+    parser.add_argument("--risk", default="medium", choices=["low", "medium", "high"])
+    parser.add_argument("--time", default="medium", choices=["short", "medium", "long"])
+    parser.add_argument("--sector", default="technology", help="sector to rank, or 'all'")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--serial", action="store_true", help="also score in this process and compare")
+    args = parser.parse_args(argv)
+
+    if args.synthetic_tickers > 0:
+        from ..data_processing.synthetic_data import SyntheticMarketGenerator, TRADING_DAYS_PER_YEAR
+        stocks = SyntheticMarketGenerator(num_tickers=args.synthetic_tickers,
+                                          history_days=TRADING_DAYS_PER_YEAR * args.years).generate_stocks()
+    else:
+        from ..data_processing.data_loader import DataLoader
+        stocks = DataLoader(args.data).load_stocks()
+    if not stocks:
+        print("Error: no stocks to score.")
+        return 1
+
+    all_sectors = args.sector == "all"
+    scorer = StockScorer(args.risk, args.time, "technology" if all_sectors else args.sector)
+    with ParallelScorer(stocks, args.workers) as parallel:
+        started = perf_counter()
+        parallel.compute_indicators()
+        indicators_done = perf_counter()
+        top = parallel.top_k(scorer, args.top_k, all_sectors)
+        finished = perf_counter()
+    print(f"{len(stocks)} stocks, {parallel.workers} workers, {len(parallel.blocks)} blocks")
+    print(f"Parallel: indicators {indicators_done - started:.3f}s, top {args.top_k} {finished - indicators_done:.3f}s")
+
+    if args.serial:
+        started = perf_counter()
+        universe = stocks if all_sectors else scorer.filter_by_sector(stocks)
+        expected = scorer.score_stocks(universe)[:args.top_k]
+        print(f"Serial:   {perf_counter() - started:.3f}s, same top {args.top_k}: "
+              f"{[stock.ticker for _, stock in expected] == [stock.ticker for _, stock in top]}")
+
+    for rank, (score, stock) in enumerate(top, 1):
+        print(f"{rank:>3}. {stock.ticker:<10} {score:8.3f}  {stock.industry_tag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,107 +1,123 @@
-import time
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from ..data_structures.stock import Stock
-from ..data_structures.red_black_tree import RedBlackTree
-from ..data_structures.max_heap import MaxHeap
+from ..data_structures.ranking import get_backend_names, get_backend_label
 from .stock_scorer import StockScorer
+from .recommender import OTHER_SECTOR, parse_sectors
+from .benchmark import BenchmarkRunner
+from .memory_usage import measure_backend_memory, format_bytes
 
 
 class PerformanceComparator:
-    # Compares performance between Red-Black Tree and Max Heap data structures
-    
-    def __init__(self):
-        self.red_black_tree = RedBlackTree()
-        self.max_heap = MaxHeap()
-    
+    # Compares performance between the registered ranking backends
+
+    def __init__(self, backend_names: Optional[List[str]] = None, warmup: int = 1, repeats: int = 5, measure_memory: bool = True):
+        self.backend_names = backend_names or get_backend_names()
+        self.runner = BenchmarkRunner(self.backend_names, warmup, repeats)
+        self.measure_memory = measure_memory
+
     def compare_performance(self, stocks: List[Stock], risk_profile: str, time_investment: str, sector_preference: str, top_k: int = 10) -> Dict[str, Any]:
         scorer = StockScorer(risk_profile, time_investment, sector_preference)
-        
+
         # Filter stocks by sector
-        sector_stocks = scorer.filter_by_sector(stocks)
-        
+        sector_stocks = self.filter_stocks(stocks, scorer, sector_preference)
+
         if not sector_stocks:
             return {
-                "error": "No stocks found for the selected sector", "red_black_tree": {}, "max_heap": {}
+                "error": "No stocks found for the selected sector", "backends": {}
             }
-        
+
         # Score all stocks based on user input
         scored_stocks = scorer.score_stocks(sector_stocks)
-        
-        # Test Red-Black Tree performance
-        rb_results = self.test_red_black_tree(scored_stocks, top_k)
-        
-        # Test Max Heap performance
-        heap_results = self.test_max_heap(scored_stocks, top_k)
-        
+
+        # Test every backend on the same scored input
+        backend_results = {}
+        for name in self.backend_names:
+            backend_results[name] = self.test_backend(name, scored_stocks, top_k)
+
         return {
-            "red_black_tree": rb_results,
-            "max_heap": heap_results,
+            "backends": backend_results,
             "total_stocks": len(sector_stocks)
         }
-    
-    def test_red_black_tree(self, scored_stocks: List[Tuple[float, Stock]], top_k: int) -> Dict[str, Any]:
-        start_time = time.time()
-        
-        self.red_black_tree = RedBlackTree()
-        
-        # Insert all stocks
-        for score, stock in scored_stocks:
-            self.red_black_tree.insert(score, stock)
-        
-        # Get top stock recommendations
-        if scored_stocks:
-            max_score = max(score for score, _ in scored_stocks)
-            min_score = max_score - 100 
-            top_stocks = self.red_black_tree.get_stocks_in_range(min_score, max_score)
-            # Sort by score
-            top_stocks.sort(key=lambda x: x[0], reverse=True)
-            top_stocks = top_stocks[:top_k]
-        else:
-            top_stocks = []
-        
-        total_time = time.time() - start_time
-        
-        return {
-            "total_time": total_time,
-            "top_stocks": top_stocks,
-            "tree_size": self.red_black_tree.get_size()
-        }
-    
-    def test_max_heap(self, scored_stocks: List[Tuple[float, Stock]], top_k: int) -> Dict[str, Any]:
-        # Test Max Heap performance
-        start_time = time.time()
-        
-        self.max_heap = MaxHeap()
-        
-        # Insert all stocks
-        for score, stock in scored_stocks:
-            self.max_heap.insert(score, stock)
-        
-        top_stocks = self.max_heap.get_top_k(top_k)
-        
-        total_time = time.time() - start_time
-        
+
+    def filter_stocks(self, stocks: List[Stock], scorer: StockScorer, sector_preference: str) -> List[Stock]:
+        # One sector, several ("energy,finance") or the whole market ("all")
+        try:
+            sectors = parse_sectors(sector_preference)
+        except ValueError:
+            return []
+        if len(sectors) == 1:
+            return scorer.filter_by_sector(stocks)
+        if OTHER_SECTOR in sectors:
+            return list(stocks)
+        keywords = {keyword for sector in sectors for keyword in scorer.get_sector_keywords(sector)}
+        return [stock for stock in stocks if stock.industry_tag.lower() in keywords]
+
+    def test_backend(self, name: str, scored_stocks: List[Tuple[float, Stock]], top_k: int) -> Dict[str, Any]:
+        # Median over repeated runs, build and query timed separately
+        result = self.runner.time_backend(name, scored_stocks, top_k)
+        memory = measure_backend_memory(name, scored_stocks, top_k) if self.measure_memory else None
+
         return {
-            "total_time": total_time,
-            "top_stocks": top_stocks,
-            "heap_size": self.max_heap.get_size()
+            "label": get_backend_label(name),
+            "build_time": result["build"]["median"],
+            "query_time": result["query_time"]["median"],
+            "total_time": result["build"]["median"] + result["query_time"]["median"],
+            "build_stats": result["build"],
+            "query_stats": result["query_time"],
+            "top_stocks": result["top_stocks"],
+            "size": result["size"],
+            "memory": memory
         }
-    
+
+    def get_ranked_times(self, results: Dict[str, Any]) -> List[Tuple[str, float]]:
+        # Backend labels and median times, fastest first
+        timings = [(result["label"], result["total_time"]) for result in results["backends"].values()]
+        timings.sort(key=lambda x: x[1])
+        return timings
+
+    def get_winner_text(self, results: Dict[str, Any]) -> str:
+        # Only name a winner when the gap to the runner-up is outside the run-to-run spread
+        ranked = sorted(results["backends"].values(), key=lambda x: x["total_time"])
+        if len(ranked) < 2:
+            return ""
+
+        best, runner_up = ranked[0], ranked[1]
+        diff = runner_up["total_time"] - best["total_time"]
+        noise = max(best["build_stats"]["stddev"] + best["query_stats"]["stddev"],
+                    runner_up["build_stats"]["stddev"] + runner_up["query_stats"]["stddev"])
+        if diff <= noise:
+            return f"No clear winner ({best['label']} and {runner_up['label']} within noise)"
+        return f"Winner: {best['label']} ({diff:.6f}s faster than next)"
+
+    def get_memory_text(self, result: Dict[str, Any]) -> str:
+        memory = result.get("memory")
+        if not memory:
+            return ""
+        return (f"memory: peak {format_bytes(memory['build_peak'])}, "
+                f"retained {format_bytes(memory['retained'])}, "
+                f"{memory['bytes_per_element']:.0f} B/element, "
+                f"{memory['build_allocations']} build / {memory['query_allocations']} query allocations")
+
     def get_performance_summary(self, results: Dict[str, Any]) -> str:
         # Make a performance comparison summary
         if "error" in results:
             return results["error"]
-        
-        rb_time = results["red_black_tree"]["total_time"]
-        heap_time = results["max_heap"]["total_time"]
-        
-        if rb_time < heap_time:
-            winner = "Red-Black Tree"
-            diff = heap_time - rb_time
-        else:
-            winner = "Max Heap"
-            diff = rb_time - heap_time
-        
-        summary = f"\nPerformance Comparison:\nRed-Black Tree: {rb_time:.6f}s\nMax Heap: {heap_time:.6f}s\nWinner: {winner} ({diff:.6f}s faster)\n"
-        
-        return summary 
\ No newline at end of file
+
+        ranked = sorted(results["backends"].values(), key=lambda x: x["total_time"])
+        runs = ranked[0]["build_stats"]["runs"] if ranked else 0
+
+        summary = f"\nPerformance Comparison (median of {runs} runs):\n"
+        for result in ranked:
+            summary += (f"{result['label']}: build {result['build_time']:.6f}s "
+                        f"(p95 {result['build_stats']['p95']:.6f}s), "
+                        f"query {result['query_time']:.6f}s "
+                        f"(p95 {result['query_stats']['p95']:.6f}s)\n")
+            memory_text = self.get_memory_text(result)
+            if memory_text:
+                summary += f"  {memory_text}\n"
+
+        winner = self.get_winner_text(results)
+        if winner:
+            summary += winner + "\n"
+
+        return summary
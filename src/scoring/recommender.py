@@ -0,0 +1,255 @@
+# Recommendation pipeline for MyStok application
+
+from typing import Any, List, Sequence, Tuple, Dict, Optional, Union
+import numpy as np
+from ..data_structures.stock import Stock
+from ..data_structures.ranking import AUTO_BACKEND, RankingBackend, create_backend, merge_top_k
+from ..data_processing.price_panel import PricePanel, to_day
+from ..instrumentation.profiler import PROFILER
+from .stock_scorer import StockScorer
+from .diversification import correlation_matrix, select_diversified
+from .similarity import SimilarityIndex
+from .sector_aggregates import SectorAggregates
+from .backend_selection import choose_backend
+from .monte_carlo import MonteCarloRisk
+
+RISK_PROFILES = ["low", "medium", "high"]
+TIME_INVESTMENTS = ["short", "medium", "long"]
+SECTORS = [
+    "technology", "fashion", "healthcare", "finance", "automotive",
+    "food", "entertainment", "energy", "consumer_goods", "real_estate"
+]
+# Sector choice covering the whole market: every sector, plus OTHER_SECTOR
+# for stocks whose industry is in none of them
+ALL_SECTORS = "all"
+OTHER_SECTOR = "other"
+
+
+def parse_sectors(sector_preference: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    # "energy", "energy,finance", ["energy", "finance"] or "all" -> sector names
+    if isinstance(sector_preference, str):
+        names = [name.strip(" _").lower() for name in sector_preference.split(",")]
+    else:
+        names = [str(name).strip().lower() for name in sector_preference]
+    names = [name for name in names if name]
+    if ALL_SECTORS in names:
+        return tuple(SECTORS) + (OTHER_SECTOR,)
+    unknown = [name for name in names if name not in SECTORS]
+    if unknown or not names:
+        raise ValueError(f"Unknown sector: {', '.join(unknown) if unknown else repr(sector_preference)}")
+    return tuple(dict.fromkeys(names))
+
+
+class Recommender:
+    # Filters, scores and ranks a loaded universe. The sector filter and
+    # finished answers are cached, so repeated queries over the same stocks
+    # do not redo the work. Each dataset snapshot has its own Recommender;
+    # a reload builds a new one, so the caches are never cleared in place.
+
+    def __init__(self, stocks: Sequence[Stock], sector_index: Optional[Dict[str, Sequence[Stock]]] = None):
+        self.stocks = stocks
+        self.sector_cache: Dict[str, Sequence[Stock]] = dict(sector_index or {})
+        self.result_cache: Dict[Tuple[str, str, str, str, int, Optional[float], Optional[int], bool], List[Tuple[float, Stock, float]]] = {}
+        # Return correlations per sector: (row of each stock, matrix). They
+        # depend only on the prices, so they are shared by every profile.
+        self.correlations: Dict[str, Tuple[Dict[Stock, int], Any]] = {}
+        # Built on the first as-of query: the price panel, and each sector's rows in it
+        self.panel: Optional[PricePanel] = None
+        self.sector_rows: Dict[str, Any] = {}
+        # Built on the first "similar stocks" query
+        self.similarity: Optional[SimilarityIndex] = None
+        # Built on first use: counts, averages and an index series per sector
+        self.sector_aggregates: Optional[SectorAggregates] = None
+        # One ranking per (risk, time, sector, structure), kept for multi-sector queries
+        self.sector_rankings: Dict[Tuple[str, str, str, str, bool], RankingBackend] = {}
+        # Simulated horizon risk per time investment, built on the first Monte Carlo query
+        self.monte_carlo: Dict[str, MonteCarloRisk] = {}
+
+    def validate(self, risk_profile: str, time_investment: str, sector_preference: str) -> None:
+        if risk_profile not in RISK_PROFILES:
+            raise ValueError(f"Unknown risk profile: {risk_profile}")
+        if time_investment not in TIME_INVESTMENTS:
+            raise ValueError(f"Unknown time investment: {time_investment}")
+        parse_sectors(sector_preference)
+    
+    def validate_max_correlation(self, max_correlation: Optional[float]) -> None:
+        if max_correlation is not None and not -1.0 <= max_correlation <= 1.0:
+            raise ValueError(f"max_correlation must be between -1 and 1, got {max_correlation}")
+
+    def get_sector_stocks(self, scorer: StockScorer) -> Sequence[Stock]:
+        sector = scorer.sector_preference
+        if sector not in self.sector_cache:
+            self.sector_cache[sector] = scorer.filter_by_sector(self.stocks)
+        return self.sector_cache[sector]
+
+    def get_members(self, sector: str) -> Sequence[Stock]:
+        if sector != OTHER_SECTOR:
+            return self.get_sector_stocks(StockScorer("medium", "medium", sector))
+        if OTHER_SECTOR not in self.sector_cache:
+            sectored = {stock for name in SECTORS for stock in self.get_members(name)}
+            self.sector_cache[OTHER_SECTOR] = tuple(stock for stock in self.stocks if stock not in sectored)
+        return self.sector_cache[OTHER_SECTOR]
+
+    def get_correlations(self, sector: str, sector_stocks: Sequence[Stock]) -> Tuple[Dict[Stock, int], Any]:
+        if sector not in self.correlations:
+            index = {stock: row for row, stock in enumerate(sector_stocks)}
+            self.correlations[sector] = (index, correlation_matrix(sector_stocks))
+        return self.correlations[sector]
+    
+    def get_panel(self) -> PricePanel:
+        if self.panel is None:
+            with PROFILER.span("build_price_panel"):
+                self.panel = PricePanel.from_stocks(self.stocks)
+        return self.panel
+    
+    def get_similarity_index(self) -> SimilarityIndex:
+        if self.similarity is None:
+            self.similarity = SimilarityIndex(self.stocks)
+        return self.similarity
+    
+    def get_sector_aggregates(self) -> SectorAggregates:
+        if self.sector_aggregates is None:
+            members = {sector: self.get_members(sector) for sector in SECTORS}
+            self.sector_aggregates = SectorAggregates(self.stocks, members)
+        return self.sector_aggregates
+    
+    def get_monte_carlo_risk(self, time_investment: str) -> MonteCarloRisk:
+        time_investment = time_investment.lower()
+        if time_investment not in self.monte_carlo:
+            self.monte_carlo[time_investment] = MonteCarloRisk(self.stocks, time_investment)
+        return self.monte_carlo[time_investment]
+    
+    def get_scorer(self, risk_profile: str, time_investment: str, sector: str, monte_carlo: bool = False) -> StockScorer:
+        risk_model = self.get_monte_carlo_risk(time_investment) if monte_carlo else None
+        return StockScorer(risk_profile, time_investment, sector, risk_model)
+    
+    def similar_stocks(self, ticker: str, k: int = 5) -> List[Tuple[float, Stock]]:
+        # The k stocks whose recent price path moves most like the ticker's,
+        # as (correlation, stock). Raises ValueError for an unknown ticker.
+        return self.get_similarity_index().neighbors(ticker, k)
+    
+    def get_sector_rows(self, scorer: StockScorer) -> Any:
+        # Panel rows of the sector's stocks (panel rows follow self.stocks)
+        sector = scorer.sector_preference
+        if sector not in self.sector_rows:
+            row_of = {stock: row for row, stock in enumerate(self.stocks)}
+            self.sector_rows[sector] = np.array([row_of[stock] for stock in self.get_sector_stocks(scorer)], dtype=np.int64)
+        return self.sector_rows[sector]
+    
+    def recommend(self, risk_profile: str, time_investment: str, sector_preference: str, data_structure: str = "max_heap", top_k: int = 10,
+                  max_correlation: Optional[float] = None, as_of: Optional[str] = None,
+                  monte_carlo: bool = False) -> List[Tuple[float, Stock, float]]:
+        # Top recommendations as (score, stock, certainty). max_correlation
+        # turns on diversified selection (see scoring/diversification.py).
+        # as_of (YYYY-MM-DD) scores every stock as it stood on that date.
+        # monte_carlo scores risk by simulated losses over the horizon
+        # (see scoring/monte_carlo.py) instead of recent volatility.
+        # sector_preference may name several sectors ("energy,finance") or
+        # "all"; those are answered by merging per-sector rankings.
+        self.validate_max_correlation(max_correlation)
+        day = to_day(as_of) if as_of is not None else None
+        if day is not None and max_correlation is not None:
+            raise ValueError("as_of cannot be combined with max_correlation")
+        if day is not None and monte_carlo:
+            # The simulation resamples each stock's latest returns, not those before `day`
+            raise ValueError("as_of cannot be combined with monte_carlo")
+        sectors = parse_sectors(sector_preference)
+        if len(sectors) > 1 and (day is not None or max_correlation is not None):
+            raise ValueError("as_of and max_correlation work with one sector at a time")
+        key = (risk_profile.lower(), time_investment.lower(), ",".join(sectors), data_structure, top_k, max_correlation, day, monte_carlo)
+        if key in self.result_cache:
+            return self.result_cache[key]
+
+        if len(sectors) > 1:
+            result = self.recommend_merged(risk_profile.lower(), time_investment.lower(), sectors, data_structure, top_k, monte_carlo)
+            self.result_cache[key] = result
+            return result
+        scorer = self.get_scorer(risk_profile, time_investment, sectors[0], monte_carlo)
+        if day is not None:
+            result = self.recommend_as_of(scorer, day, data_structure, top_k)
+            self.result_cache[key] = result
+            return result
+        sector_stocks = self.get_sector_stocks(scorer)
+
+        result = []
+        if sector_stocks:
+            scored_stocks = scorer.score_stocks(sector_stocks)
+            if max_correlation is None:
+                recommendations = self.rank(scored_stocks, data_structure, top_k)
+            else:
+                # Walk the whole ranking; the cap decides how deep to go
+                ranked = self.rank(scored_stocks, data_structure, len(scored_stocks))
+                index, correlation = self.get_correlations(scorer.sector_preference, sector_stocks)
+                recommendations = select_diversified(ranked, top_k, correlation, index, max_correlation)
+            if recommendations:
+                certainty = scorer.calculate_certainty(recommendations)
+                result = [(score, stock, certainty) for score, stock in recommendations]
+
+        self.result_cache[key] = result
+        return result
+
+    def get_sector_ranking(self, risk_profile: str, time_investment: str, sector: str, data_structure: str,
+                           top_k: int = 10, monte_carlo: bool = False) -> RankingBackend:
+        # Built once per profile and sector, then only read
+        members = self.get_members(sector)
+        if data_structure == AUTO_BACKEND:
+            data_structure = choose_backend(len(members), top_k, "descending")
+        key = (risk_profile, time_investment, sector, data_structure, monte_carlo)
+        ranking = self.sector_rankings.get(key)
+        if ranking is None:
+            scorer = self.get_scorer(risk_profile, time_investment, sector, monte_carlo)
+            scored_stocks = scorer.score_stocks(list(members))
+            ranking = create_backend(data_structure)
+            with PROFILER.span(f"rank_build:{data_structure}") as span:
+                ranking.build(scored_stocks)
+                span.add("stocks", len(scored_stocks))
+            self.sector_rankings[key] = ranking
+        return ranking
+
+    def recommend_merged(self, risk_profile: str, time_investment: str, sectors: Sequence[str], data_structure: str,
+                         top_k: int, monte_carlo: bool = False) -> List[Tuple[float, Stock, float]]:
+        # Top k across sectors: a lazy k-way merge of each sector's ranking,
+        # so only about k entries are read however large the sectors are
+        streams = [self.get_sector_ranking(risk_profile, time_investment, sector, data_structure, top_k, monte_carlo).descending()
+                   for sector in sectors]
+        with PROFILER.span("merge_top_k") as span:
+            recommendations = merge_top_k(streams, top_k)
+            span.add("sectors", len(sectors))
+        if not recommendations:
+            return []
+        certainty = StockScorer(risk_profile, time_investment, sectors[0]).calculate_certainty(recommendations)
+        return [(score, stock, certainty) for score, stock in recommendations]
+
+    def recommend_as_of(self, scorer: StockScorer, day: int, data_structure: str, top_k: int) -> List[Tuple[float, Stock, float]]:
+        # Metrics at `day` for the whole universe come from one binary search
+        # per ticker in the price panel; only the top k are turned into
+        # Stock views with their history cut at that day
+        panel = self.get_panel()
+        with PROFILER.span("as_of_metrics"):
+            metrics = panel.metrics_at(day)
+        rows = self.get_sector_rows(scorer)
+        rows = rows[metrics["listed"][rows]]
+        if not len(rows):
+            return []
+        
+        scores = scorer.score_arrays(metrics["percent_change"][rows], metrics["year_change"][rows], metrics["volatility"][rows])
+        scored_stocks = [(score, self.stocks[row]) for score, row in zip(scores.tolist(), rows.tolist())]
+        recommendations = self.rank(scored_stocks, data_structure, top_k)
+        if not recommendations:
+            return []
+        
+        row_of = dict(zip((self.stocks[row] for row in rows.tolist()), rows.tolist()))
+        certainty = scorer.calculate_certainty(recommendations)
+        return [(score, stock.as_of(int(metrics["count"][row_of[stock]])), certainty) for score, stock in recommendations]
+    
+    def rank(self, scored_stocks: List[Tuple[float, Stock]], data_structure: str, top_k: int) -> List[Tuple[float, Stock]]:
+        # Build into a local so concurrent queries never share a half-built
+        # ranking. "auto" is whichever backend the cost model predicts is fastest.
+        if data_structure == AUTO_BACKEND:
+            data_structure = choose_backend(len(scored_stocks), top_k, "top_k")
+        ranking = create_backend(data_structure)
+        with PROFILER.span(f"rank_build:{data_structure}") as span:
+            ranking.build(scored_stocks)
+            span.add("stocks", len(scored_stocks))
+        with PROFILER.span(f"rank_query:{data_structure}"):
+            return ranking.top_k(top_k)
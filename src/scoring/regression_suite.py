@@ -0,0 +1,186 @@
+# Performance regression suite for MyStok application
+#
+# Times the hot paths (load_stocks, score_stocks, MaxHeap.get_top_k,
+# RedBlackTree.get_stocks_in_range) on synthetic data of fixed size and
+# compares the medians against a stored baseline. Exits non-zero when any
+# case is slower than its baseline by more than the tolerance. Without a
+# baseline the first run records one, unless --check is given: then a
+# missing baseline is an error, so a CI job never passes without comparing.
+#
+# score_stocks clears the shared indicator cache before every run, so it
+# times indicator computation as a cold query does; score_stocks_cached
+# times the warm path of repeated queries.
+#
+# Usage:
+#   python -m src.scoring.regression_suite --update-baseline   # record
+#   python -m src.scoring.regression_suite                     # compare
+#   python -m src.scoring.regression_suite --check             # compare; CI gate
+#   python -m src.scoring.regression_suite --tolerance 0.3 --tolerance-for load_stocks=0.5
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from ..data_processing.data_loader import DataLoader
+from ..data_processing.synthetic_data import SyntheticMarketGenerator
+from ..data_structures.max_heap import MaxHeap
+from ..data_structures.red_black_tree import RedBlackTree
+from .indicators import INDICATORS
+from .stock_scorer import StockScorer
+from .benchmark import time_callable
+
+DEFAULT_BASELINE = "benchmarks/perf_baseline.json"
+
+# Fixed input sizes; a baseline is only comparable at the same sizes
+SUITE_SIZES = {
+    "tickers": 500,
+    "history_days": 504,
+    "ranking_items": 20000,
+    "top_k": 10
+}
+
+
+class RegressionSuite:
+
+    def __init__(self, sizes: Optional[Dict[str, int]] = None, warmup: int = 1, repeats: int = 7, seed: int = 0):
+        self.sizes = dict(sizes or SUITE_SIZES)
+        self.warmup = warmup
+        self.repeats = repeats
+        self.seed = seed
+
+    def build_cases(self, workdir: str) -> List[Tuple[str, Callable[[], Any]]]:
+        # Prepare inputs once; each case times only the call under test
+        generator = SyntheticMarketGenerator(num_tickers=self.sizes["tickers"], history_days=self.sizes["history_days"], seed=self.seed)
+        csv_path = os.path.join(workdir, "suite.csv")
+        generator.write_csv(csv_path)
+        stocks = DataLoader(csv_path).load_stocks()
+
+        scorer = StockScorer("medium", "medium", "technology")
+        rng = random.Random(self.seed)
+        items = [(round(rng.uniform(0, 100), 2), stocks[i % len(stocks)]) for i in range(self.sizes["ranking_items"])]
+        top_k = self.sizes["top_k"]
+
+        heap = MaxHeap()
+        heap.build_heap(items)
+        tree = RedBlackTree()
+        for score, stock in items:
+            tree.insert(score, stock)
+
+        return [
+            ("load_stocks", lambda: DataLoader(csv_path).load_stocks()),
+            ("score_stocks", lambda: (INDICATORS.clear(), scorer.score_stocks(stocks))),
+            ("score_stocks_cached", lambda: scorer.score_stocks(stocks)),
+            ("max_heap_get_top_k", lambda: heap.get_top_k(top_k)),
+            ("red_black_tree_get_stocks_in_range", lambda: tree.get_stocks_in_range(90.0, 100.0))
+        ]
+
+    def run(self) -> Dict[str, Any]:
+        results = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, fn in self.build_cases(workdir):
+                results[name] = time_callable(fn, self.warmup, self.repeats)
+        return {
+            "sizes": self.sizes,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results
+        }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, overrides: Dict[str, float]) -> List[Dict[str, Any]]:
+    # One row per case with the ratio of current to baseline median
+    rows = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        allowed = overrides.get(name, tolerance)
+        if base is None or base["median"] <= 0:
+            rows.append({"case": name, "status": "new", "current": stats["median"], "baseline": None, "ratio": None, "tolerance": allowed})
+            continue
+        ratio = stats["median"] / base["median"]
+        status = "REGRESSION" if ratio > 1 + allowed else ("faster" if ratio < 1 - allowed else "ok")
+        rows.append({"case": name, "status": status, "current": stats["median"], "baseline": base["median"], "ratio": ratio, "tolerance": allowed})
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'case':<38}{'baseline':>12}{'current':>12}{'ratio':>8}  status"]
+    for row in rows:
+        baseline = f"{row['baseline'] * 1000:>10.3f}ms" if row["baseline"] is not None else f"{'-':>12}"
+        ratio = f"{row['ratio']:>8.2f}" if row["ratio"] is not None else f"{'-':>8}"
+        lines.append(f"{row['case']:<38}{baseline}{row['current'] * 1000:>10.3f}ms{ratio}  {row['status']}")
+    return "\n".join(lines)
+
+
+def parse_overrides(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        name, _, tolerance = value.partition("=")
+        overrides[name] = float(tolerance)
+    return overrides
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="MyStok performance regression suite")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail instead of recording when there is no baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--tolerance-for", nargs="*", default=[], metavar="CASE=TOL")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None and args.check and not args.update_baseline:
+        print(f"Error: no baseline at {args.baseline}; record one with --update-baseline.")
+        return 2
+
+    current = RegressionSuite(warmup=args.warmup, repeats=args.repeats, seed=args.seed).run()
+
+    if args.update_baseline or baseline is None:
+        save_baseline(current, args.baseline)
+        print(format_comparison(compare_to_baseline(current, baseline or {}, args.tolerance, {})))
+        print(f"\nBaseline recorded to {args.baseline}")
+        return 0
+
+    if baseline.get("sizes") != current["sizes"]:
+        print("Error: baseline was recorded at different sizes; rerun with --update-baseline.")
+        return 2
+
+    if (baseline.get("python"), baseline.get("machine")) != (current["python"], current["machine"]):
+        print(f"Note: baseline was recorded on Python {baseline.get('python')} ({baseline.get('machine')}), "
+              f"this run is Python {current['python']} ({current['machine']}).")
+
+    rows = compare_to_baseline(current, baseline, args.tolerance, parse_overrides(args.tolerance_for))
+    print(format_comparison(rows))
+
+    regressions = [row["case"] for row in rows if row["status"] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# Market replay load generator for MyStok application
+#
+# Replays closes in date order as a stream of per-ticker price updates and
+# measures how long each takes to reach the recommendations. The history up
+# to a start date seeds the universe; every later close becomes an update
+# that an asyncio producer emits at --rate updates per second (0: as fast as
+# the consumer takes them).
+#
+# The consumer drains whatever is queued as one step: the closes are
+# appended to their stocks, folded into the sector indexes and overview
+# (SectorAggregates.update), those stocks are re-scored (indicators in one
+# batch), moved within every sector ranking they belong to with the
+# backend's update(), and the top k of the touched sectors is read back.
+# Steps run on a worker thread so the producer keeps its schedule.
+#
+# An update's latency runs from its scheduled emission time to the end of
+# the step that published it. With a fixed rate a consumer that falls
+# behind therefore shows up as queueing delay instead of slowing the
+# producer down and hiding it.
+#
+# Latency includes each backend's update(): O(log n) for the heap (through
+# its position index) and the trees, but sorted_array shifts its arrays and
+# partial_select defers the ordering to the top-k read, so both pay O(n) per
+# touched sector.
+#
+# Usage:
+#   python -m src.scoring.replay --days 20 --rate 5000 --structures max_heap red_black_tree
+#   python -m src.scoring.replay --synthetic-tickers 5000 --years 3 --days 10
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..data_structures.stock import Stock
+from ..data_structures.ranking import RankingBackend, create_backend, get_backend_names
+from ..data_processing.snapshot import build_sector_index
+from ..instrumentation.profiler import PROFILER
+from .sector_aggregates import SectorAggregates
+from .stock_scorer import StockScorer
+
+# One update: (stock row, day, close)
+Update = Tuple[int, int, float]
+
+
+def split_stream(stocks: Sequence[Stock], days: int) -> Tuple[List[Tuple[int, int]], List[Update]]:
+    # (row, closes up to the start) for every stock listed by then, and the
+    # closes of the last `days` trading days as updates in date order. Both
+    # are empty when no stock has dated closes.
+    dated = [np.asarray(stock.dates, dtype="datetime64[D]").astype(np.int64)
+             for stock in stocks if stock.dates is not None and len(stock.dates)]
+    if not dated:
+        return [], []
+    all_days = np.unique(np.concatenate(dated))
+    start_day = int(all_days[max(len(all_days) - 1 - days, 0)])
+
+    seeds = []
+    rows, update_days, prices = [], [], []
+    for row, stock in enumerate(stocks):
+        if stock.dates is None:
+            continue
+        stock_days = np.asarray(stock.dates, dtype="datetime64[D]").astype(np.int64)
+        count = int(np.searchsorted(stock_days, start_day, side="right"))
+        if count < 2:
+            continue  # not listed yet at the start; the loader skips such stocks too
+        seeds.append((row, count))
+        rows.append(np.full(len(stock_days) - count, row))
+        update_days.append(stock_days[count:])
+        prices.append(np.asarray(stock.historical_data[count:], dtype=np.float64))
+
+    if not seeds:
+        return seeds, []
+    rows, update_days, prices = np.concatenate(rows), np.concatenate(update_days), np.concatenate(prices)
+    order = np.lexsort((rows, update_days))
+    return seeds, list(zip(rows[order].tolist(), update_days[order].tolist(), prices[order].tolist()))
+
+
+class ReplayUniverse:
+    # Stocks cut at the start date, their sector aggregates and one ranking per sector
+
+    def __init__(self, stocks: Sequence[Stock], seeds: List[Tuple[int, int]], risk_profile: str, time_investment: str,
+                 structure: str, top_k: int):
+        self.scorer = StockScorer(risk_profile, time_investment, "technology")
+        self.top_k = top_k
+        self.stocks: Dict[int, Stock] = {row: stocks[row].as_of(count) for row, count in seeds}
+        universe = tuple(self.stocks.values())
+        scores = dict(zip(universe, self.scorer.score_each(universe).tolist()))
+
+        self.rankings: Dict[str, RankingBackend] = {}
+        self.sectors_of: Dict[Stock, List[str]] = {}
+        self.top: Dict[str, List[Tuple[float, Stock]]] = {}
+        sector_index = build_sector_index(universe)
+        self.aggregates = SectorAggregates(universe, sector_index)
+        for sector, members in sector_index.items():
+            if not members:
+                continue
+            ranking = create_backend(structure)
+            ranking.build([(scores[stock], stock) for stock in members])
+            self.rankings[sector] = ranking
+            self.top[sector] = ranking.top_k(top_k)
+            for stock in members:
+                self.sectors_of.setdefault(stock, []).append(sector)
+
+    def apply(self, updates: Sequence[Update]) -> int:
+        # One step; returns how many sector top-k lists were refreshed
+        closes: Dict[int, Tuple[List[float], List[np.datetime64]]] = {}
+        for row, day, price in updates:
+            if row in self.stocks:
+                prices, dates = closes.setdefault(row, ([], []))
+                prices.append(price)
+                dates.append(np.datetime64(day, "D"))
+
+        touched = []
+        for row, (prices, dates) in closes.items():
+            stock = self.stocks[row]
+            stock.append_prices(prices, dates)
+            touched.append(stock)
+        self.aggregates.update(touched)
+
+        sectors = set()
+        for stock, score in zip(touched, self.scorer.score_each(touched).tolist()):
+            for sector in self.sectors_of.get(stock, ()):
+                self.rankings[sector].update(stock, score)
+                sectors.add(sector)
+        for sector in sectors:
+            self.top[sector] = self.rankings[sector].top_k(self.top_k)
+        return len(sectors)
+
+
+class ReplayRun:
+    # One replay through the asyncio pipeline
+
+    def __init__(self, universe: ReplayUniverse, updates: List[Update], rate: float = 0.0, max_batch: int = 1000):
+        self.universe = universe
+        self.updates = updates
+        self.rate = rate
+        self.max_batch = max(1, max_batch)
+        self.latencies_ns: List[int] = []
+        self.batch_sizes: List[int] = []
+        self.max_queue = 0
+
+    async def produce(self, queue: asyncio.Queue) -> None:
+        started = perf_counter_ns()
+        for i, update in enumerate(self.updates):
+            if self.rate > 0:
+                scheduled = started + int(i * 1e9 / self.rate)
+                wait = scheduled - perf_counter_ns()
+                if wait > 0:
+                    await asyncio.sleep(wait / 1e9)
+                queue.put_nowait((update, scheduled))
+            else:
+                # Bounded queue: waits while the consumer is behind
+                await queue.put((update, perf_counter_ns()))
+            self.max_queue = max(self.max_queue, queue.qsize())
+        await queue.put(None)
+
+    async def consume(self, queue: asyncio.Queue, executor: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            item = await queue.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.max_batch or queue.empty():
+                    break
+                item = queue.get_nowait()
+            finished = item is None
+            if not batch:
+                continue
+            await loop.run_in_executor(executor, self.universe.apply, [update for update, _ in batch])
+            done = perf_counter_ns()
+            self.latencies_ns.extend(done - emitted for _, emitted in batch)
+            self.batch_sizes.append(len(batch))
+
+    async def run(self) -> Dict[str, Any]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=0 if self.rate > 0 else self.max_batch)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="mystok-replay") as executor:
+            started = perf_counter_ns()
+            await asyncio.gather(self.produce(queue), self.consume(queue, executor))
+            elapsed = (perf_counter_ns() - started) / 1e9
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        latencies = np.array(self.latencies_ns, dtype=np.float64) / 1e6
+        return {
+            "updates": len(self.latencies_ns),
+            "steps": len(self.batch_sizes),
+            "seconds": elapsed,
+            "throughput": len(self.latencies_ns) / elapsed if elapsed > 0 else 0.0,
+            "offered_rate": self.rate,
+            "mean_batch": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            "max_queue": self.max_queue,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                "p99": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+                "max": float(latencies.max()) if len(latencies) else 0.0
+            }
+        }
+
+
+def replay(stocks: Sequence[Stock], structure: str, risk_profile: str = "medium", time_investment: str = "medium",
+           days: int = 20, rate: float = 0.0, top_k: int = 10, max_batch: int = 1000) -> Dict[str, Any]:
+    # Seed, replay and report for one ranking backend
+    with PROFILER.span(f"replay:{structure}"):
+        seeds, updates = split_stream(stocks, days)
+        if not updates:
+            raise ValueError("nothing to replay: no stock has closes after the start date")
+        universe = ReplayUniverse(stocks, seeds, risk_profile, time_investment, structure, top_k)
+        result = asyncio.run(ReplayRun(universe, updates, rate, max_batch).run())
+    result["structure"] = structure
+    result["stocks"] = len(seeds)
+    return result
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'structure':<16}{'updates':>9}{'steps':>7}{'upd/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'batch':>8}"]
+    for result in results:
+        latency = result["latency_ms"]
+        lines.append(
+            f"{result['structure']:<16}{result['updates']:>9}{result['steps']:>7}{result['throughput']:>11.0f}"
+            f"{latency['p50']:>10.2f}{latency['p99']:>10.2f}{latency['max']:>10.2f}{result['mean_batch']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay market closes through MyStok's scoring and ranking")
+    parser.add_argument("--data", default="resources/World-Stock-Prices-Dataset.csv")
+    parser.add_argument("--synthetic-tickers", type=int, default=0, help="replay generated data instead of --data")
+    parser.add_argument("--years", type=int, default=3, help="history length of generated data")
+    parser.add_argument("--risk", default="medium", choices=["low", "medium", "high"])
+    parser.add_argument("--time", default="medium", choices=["short", "medium", "long"])
+    parser.add_argument("--structures", nargs="+", default=["max_heap", "red_black_tree"], choices=get_backend_names())
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--days", type=int, default=20, help="trading days to replay, ending at the last close")
+    parser.add_argument("--rate", type=float, default=0.0, help="updates per second (0: as fast as possible)")
+    parser.add_argument("--max-batch", type=int, default=1000, help="most updates applied in one step")
+    parser.add_argument("--json", metavar="PATH", help="write the results to PATH")
+    args = parser.parse_args(argv)
+
+    if args.synthetic_tickers > 0:
+        from ..data_processing.synthetic_data import SyntheticMarketGenerator, TRADING_DAYS_PER_YEAR
+        stocks = SyntheticMarketGenerator(num_tickers=args.synthetic_tickers,
+                                          history_days=TRADING_DAYS_PER_YEAR * args.years).generate_stocks()
+    else:
+        from ..data_processing.data_loader import DataLoader
+        stocks = DataLoader(args.data).load_stocks()
+    if not stocks:
+        print("Error: No stock data loaded. Please check the CSV file.")
+        return 1
+
+    try:
+        results = [replay(stocks, structure, args.risk, args.time, args.days, args.rate, args.top_k, args.max_batch)
+                   for structure in args.structures]
+    except ValueError as x:
+        print(f"Error: {x}")
+        return 1
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+# Sector aggregates for MyStok application
+#
+# Per-sector figures computed once per dataset version from columnar
+# arrays: member count, average score for every risk/time profile, median
+# year change, mean daily change and volatility, and an equal-weighted
+# daily sector index. On each trading day the sector's return is the mean
+# of its members' daily returns that day; the index chains those returns
+# from INDEX_BASE.
+#
+# The index keeps per-day return sums and counts, so closes appended to a
+# stock (Stock.append_prices) are folded in by update() without a rebuild.
+# Only the levels from the first changed day onwards are chained again, and
+# only the appended stocks' metrics and profile scores are recomputed before
+# the overview is summed again from the per-stock columns. The market replay
+# calls update() after every step. Overview rows, index levels and "beats its
+# sector" are then dictionary reads or one binary search.
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from ..data_structures.stock import Stock
+from ..data_processing.price_panel import to_day
+from ..data_processing.sector_grouper import SectorGrouper
+from ..instrumentation.profiler import PROFILER
+from .indicators import VOLATILITY_WINDOW, daily_returns, flatten_histories, rolling_mean_std, segment_starts
+from .stock_scorer import StockScorer
+
+INDEX_BASE = 100.0
+# Trading days behind the overview's 1-month and 1-year index returns
+MONTH_DAYS = 21
+YEAR_DAYS = 252
+# Window of relative_strength, in closes
+RELATIVE_STRENGTH_DAYS = 63
+PROFILES = [(risk, time) for risk in ("low", "medium", "high") for time in ("short", "medium", "long")]
+
+
+def tail_volatility(stocks: Sequence[Stock]) -> np.ndarray:
+    # The indicator engine's volatility from each stock's last closes only
+    tails = [stock.historical_data[-(VOLATILITY_WINDOW + 1):] for stock in stocks]
+    prices, offsets = flatten_histories(tails)
+    lengths = np.diff(offsets)
+    volatility = np.full(len(stocks), np.nan)
+    has_prices = lengths > 0
+    _, volatility[has_prices] = rolling_mean_std(daily_returns(prices, offsets), segment_starts(offsets),
+                                                 VOLATILITY_WINDOW, offsets[1:][has_prices] - 1)
+    return volatility
+
+
+class SectorAggregates:
+
+    def __init__(self, stocks: Sequence[Stock], sector_members: Dict[str, Sequence[Stock]]):
+        with PROFILER.span("build_sector_aggregates") as span:
+            self.stocks = list(stocks)
+            self.row_of = {stock: row for row, stock in enumerate(self.stocks)}
+            self.sectors = list(sector_members)
+            self.membership = np.zeros((len(self.sectors), len(self.stocks)), dtype=bool)
+            for i, sector in enumerate(self.sectors):
+                self.membership[i, [self.row_of[stock] for stock in sector_members[sector]]] = True
+
+            # SectorGrouper's categories, counted per distinct industry tag
+            grouper = SectorGrouper()
+            self.category_counts: Dict[str, int] = {}
+            for tag, count in Counter(stock.industry_tag for stock in self.stocks).items():
+                category = grouper.categorize_stock(tag)
+                self.category_counts[category] = self.category_counts.get(category, 0) + count
+
+            self.build_index()
+            self.refresh()
+            span.add("stocks", len(self.stocks))
+
+    def build_index(self) -> None:
+        # Per-sector daily return sums and counts from the flat return array.
+        # Stocks without dates are left out of the index.
+        histories = [stock.historical_data if stock.dates is not None else [] for stock in self.stocks]
+        prices, offsets = flatten_histories(histories)
+        self.lengths = np.diff(offsets)
+        if offsets[-1]:
+            days = np.concatenate([np.asarray(stock.dates, dtype="datetime64[D]").astype(np.int64)
+                                   for stock in self.stocks if stock.dates is not None])
+        else:
+            days = np.zeros(0, dtype=np.int64)
+        returns = daily_returns(prices, offsets)
+
+        self.days = np.unique(days)
+        slots = np.searchsorted(self.days, days)
+        owner = np.repeat(np.arange(len(self.stocks)), self.lengths)
+        finite = np.isfinite(returns)
+        self.return_sums = np.zeros((len(self.sectors), len(self.days)))
+        self.return_counts = np.zeros((len(self.sectors), len(self.days)), dtype=np.int64)
+        for i in range(len(self.sectors)):
+            take = finite & self.membership[i][owner]
+            self.return_sums[i] = np.bincount(slots[take], weights=returns[take], minlength=len(self.days))
+            self.return_counts[i] = np.bincount(slots[take], minlength=len(self.days))
+        self.levels = np.empty_like(self.return_sums)
+        self.chain(0)
+
+    def chain(self, start: int) -> None:
+        # Index levels from day slot `start` on, continuing from the level before it
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(self.return_counts[:, start:] > 0, self.return_sums[:, start:] / self.return_counts[:, start:], 0.0)
+        base = self.levels[:, start - 1:start] if start > 0 else INDEX_BASE
+        self.levels[:, start:] = base * np.cumprod(1.0 + mean / 100.0, axis=1)
+
+    def refresh(self, rows: Optional[np.ndarray] = None) -> None:
+        # Per-sector figures from the members' current metrics, recomputing
+        # the per-stock columns of `rows` only (all stocks on the first call)
+        if rows is None:
+            rows = np.arange(len(self.stocks))
+            self.percent_change = np.zeros(len(self.stocks))
+            self.year_change = np.zeros(len(self.stocks))
+            self.volatility = np.full(len(self.stocks), np.nan)
+            self.scores = np.zeros((len(PROFILES), len(self.stocks)))
+        if len(rows):
+            stocks = [self.stocks[row] for row in rows]
+            self.percent_change[rows] = [stock.percent_change for stock in stocks]
+            self.year_change[rows] = [stock.year_change for stock in stocks]
+            self.volatility[rows] = tail_volatility(stocks)
+            for j, (risk, time) in enumerate(PROFILES):
+                self.scores[j, rows] = StockScorer(risk, time, "technology").score_arrays(
+                    self.percent_change[rows], self.year_change[rows], self.volatility[rows])
+
+        percent_change, year_change, volatility = self.percent_change, self.year_change, self.volatility
+        counts = self.membership.sum(axis=1)
+        score_sums = self.membership.astype(np.float64) @ self.scores.T
+
+        self.overview: Dict[str, Dict[str, Any]] = {}
+        for i, sector in enumerate(self.sectors):
+            members = self.membership[i]
+            count = int(counts[i])
+            finite_volatility = volatility[members][np.isfinite(volatility[members])]
+            self.overview[sector] = {
+                "stocks": count,
+                "average_scores": {f"{risk}/{time}": float(score_sums[i, j] / count) if count else None
+                                   for j, (risk, time) in enumerate(PROFILES)},
+                "mean_percent_change": float(percent_change[members].mean()) if count else None,
+                "median_year_change": float(np.median(year_change[members])) if count else None,
+                "mean_volatility": float(finite_volatility.mean()) if len(finite_volatility) else None,
+                "return_1m": self.trailing_return(i, MONTH_DAYS),
+                "return_1y": self.trailing_return(i, YEAR_DAYS)
+            }
+
+    def trailing_return(self, sector_row: int, periods: int) -> Optional[float]:
+        # % change of the index over its last `periods` trading days
+        if len(self.days) <= periods:
+            return None
+        return float((self.levels[sector_row, -1] / self.levels[sector_row, -1 - periods] - 1.0) * 100.0)
+
+    def update(self, stocks: Optional[Sequence[Stock]] = None) -> int:
+        # Fold in closes appended since the last build or update (checking
+        # `stocks`, or every stock) and return how many were added
+        touched: List[int] = []
+        new_rows: List[np.ndarray] = []
+        new_days: List[np.ndarray] = []
+        new_returns: List[np.ndarray] = []
+        for stock in (stocks if stocks is not None else self.stocks):
+            row = self.row_of.get(stock)
+            if row is None or stock.dates is None or len(stock.historical_data) <= self.lengths[row]:
+                continue
+            seen = int(self.lengths[row])
+            prices = np.asarray(stock.historical_data[max(seen - 1, 0):], dtype=np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                returns = (prices[1:] / prices[:-1] - 1.0) * 100.0
+            days = np.asarray(stock.dates[max(seen, 1):], dtype="datetime64[D]").astype(np.int64)
+            new_rows.append(np.full(len(returns), row))
+            new_days.append(days)
+            new_returns.append(returns)
+            touched.append(row)
+            self.lengths[row] = len(stock.historical_data)
+        if not new_rows:
+            return 0
+
+        rows, days, returns = np.concatenate(new_rows), np.concatenate(new_days), np.concatenate(new_returns)
+        all_days = np.union1d(self.days, days)
+        if len(all_days) > len(self.days):
+            # Widen the per-day arrays; existing columns keep their values
+            old_slots = np.searchsorted(all_days, self.days)
+            for name in ("return_sums", "return_counts", "levels"):
+                old = getattr(self, name)
+                widened = np.zeros((len(self.sectors), len(all_days)), dtype=old.dtype)
+                widened[:, old_slots] = old
+                setattr(self, name, widened)
+            self.days = all_days
+
+        slots = np.searchsorted(self.days, days)
+        finite = np.isfinite(returns)
+        for i in range(len(self.sectors)):
+            take = finite & self.membership[i][rows]
+            np.add.at(self.return_sums[i], slots[take], returns[take])
+            np.add.at(self.return_counts[i], slots[take], 1)
+        self.chain(int(slots.min()))
+        self.refresh(np.array(touched))
+        return len(returns)
+
+    def sector_of(self, stock: Stock) -> Optional[str]:
+        # First sector the stock belongs to, if any
+        row = self.row_of.get(stock)
+        sectors = np.flatnonzero(self.membership[:, row]) if row is not None else ()
+        return self.sectors[sectors[0]] if len(sectors) else None
+
+    def index_series(self, sector: str):
+        # (dates, levels) of the sector's equal-weighted index
+        return self.days.astype("datetime64[D]"), self.levels[self.sectors.index(sector)]
+
+    def index_level(self, sector: str, day) -> Optional[float]:
+        # Index level at the close on or before `day`
+        slot = int(np.searchsorted(self.days, to_day(day), side="right")) - 1
+        return float(self.levels[self.sectors.index(sector), slot]) if slot >= 0 else None
+
+    def relative_strength(self, stock: Stock, sector: str, periods: int = RELATIVE_STRENGTH_DAYS) -> Optional[float]:
+        # The stock's % return over its last `periods` closes minus its
+        # sector index's over the same dates; None without enough history
+        history = stock.historical_data
+        if stock.dates is None or len(history) <= periods or history[-1 - periods] == 0:
+            return None
+        start = self.index_level(sector, stock.dates[-1 - periods])
+        end = self.index_level(sector, stock.dates[-1])
+        if not start or end is None:
+            return None
+        stock_return = (history[-1] / history[-1 - periods] - 1.0) * 100.0
+        return stock_return - (end / start - 1.0) * 100.0
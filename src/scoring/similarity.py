@@ -0,0 +1,137 @@
+# Price-trajectory similarity for MyStok application
+#
+# Finds the stocks whose recent price path looks most like a given one.
+# Each stock's last WINDOW_DAYS closes, aligned on trading days as for
+# diversification, become a vector of SAMPLE_POINTS returns: daily log
+# returns summed over equal buckets of days, then z-normalised and scaled to
+# unit length. The dot product of two vectors is then the Pearson
+# correlation of their downsampled paths, so the k nearest neighbours are
+# one matrix-vector product and an argpartition over the whole universe.
+#
+# For very large universes a random-projection LSH index narrows the
+# candidates first. Each table hashes a vector by the signs of its
+# projections on random hyperplanes, so paths at a small angle share a
+# bucket with high probability; candidates from all tables are reranked
+# exactly. That answer is approximate, so exact search is used below
+# LSH_MIN_STOCKS.
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from ..data_structures.stock import Stock
+from ..instrumentation.profiler import PROFILER
+from .diversification import aligned_prices
+
+WINDOW_DAYS = 252
+SAMPLE_POINTS = 63
+# A stock needs returns on this fraction of the window to have a trajectory
+MIN_COVERAGE = 0.8
+LSH_MIN_STOCKS = 50000
+LSH_TABLES = 24
+# Hash bits are chosen so a bucket holds about this many stocks
+LSH_BUCKET_SIZE = 256
+LSH_SEED = 7
+
+
+def trajectory_vectors(stocks: Sequence[Stock], window: int = WINDOW_DAYS,
+                       points: int = SAMPLE_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    # (stocks, points) float32 unit vectors, and which stocks have enough history
+    prices = aligned_prices(stocks, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(np.log(prices), axis=1)
+    present = np.isfinite(returns)
+    width = returns.shape[1]
+    if width == 0:
+        return np.zeros((len(stocks), 0), dtype=np.float32), np.zeros(len(stocks), dtype=bool)
+    valid = present.mean(axis=1) >= MIN_COVERAGE
+    returns = np.where(present, returns, 0.0)
+
+    # Bucket edges step by at least one day, so every bucket is non-empty
+    points = min(points, width)
+    edges = np.linspace(0, width, points + 1).astype(np.int64)
+    sampled = np.add.reduceat(returns, edges[:-1], axis=1)
+
+    centered = sampled - sampled.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    valid &= norms[:, 0] > 0
+    vectors = np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+    return vectors.astype(np.float32), valid
+
+
+class RandomProjectionIndex:
+    # Sign-of-projection hashes in LSH_TABLES tables. Each table keeps the
+    # rows sorted by code, so a bucket is a searchsorted range.
+
+    def __init__(self, vectors: np.ndarray, rows: np.ndarray, tables: int = LSH_TABLES,
+                 bits: Optional[int] = None, seed: int = LSH_SEED):
+        rng = np.random.default_rng(seed)
+        self.tables = tables
+        self.bits = bits if bits is not None else int(np.clip(round(np.log2(max(len(rows), 1) / LSH_BUCKET_SIZE)), 1, 30))
+        self.planes = rng.standard_normal((vectors.shape[1], tables * self.bits)).astype(np.float32)
+        self.weights = np.int64(1) << np.arange(self.bits, dtype=np.int64)
+        codes = self.hash(vectors[rows])
+        self.buckets = []
+        for table in range(tables):
+            order = np.argsort(codes[:, table], kind="stable")
+            self.buckets.append((codes[order, table], rows[order]))
+
+    def hash(self, vectors: np.ndarray) -> np.ndarray:
+        # (vectors, tables) bucket codes
+        signs = (vectors @ self.planes > 0).reshape(len(vectors), self.tables, self.bits)
+        return (signs * self.weights).sum(axis=2)
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        # Rows sharing a bucket with `vector` in any table
+        found = []
+        for (codes, rows), code in zip(self.buckets, self.hash(vector[None, :])[0]):
+            begin, end = np.searchsorted(codes, [code, code + 1])
+            found.append(rows[begin:end])
+        return np.unique(np.concatenate(found))
+
+
+class SimilarityIndex:
+    # Trajectory vectors for a fixed universe, with exact and LSH k-NN
+
+    def __init__(self, stocks: Sequence[Stock], window: int = WINDOW_DAYS, points: int = SAMPLE_POINTS,
+                 use_lsh: Optional[bool] = None):
+        with PROFILER.span("build_similarity_index") as span:
+            self.stocks = list(stocks)
+            self.vectors, self.valid = trajectory_vectors(self.stocks, window, points)
+            self.rows = {stock.ticker.upper(): row for row, stock in enumerate(self.stocks)}
+            if use_lsh is None:
+                use_lsh = len(self.stocks) >= LSH_MIN_STOCKS
+            self.lsh = RandomProjectionIndex(self.vectors, np.flatnonzero(self.valid)) if use_lsh and self.valid.any() else None
+            span.add("stocks", len(self.stocks))
+
+    def row_of(self, ticker: str) -> int:
+        row = self.rows.get(ticker.upper())
+        if row is None:
+            raise ValueError(f"Unknown ticker: {ticker}")
+        if not self.valid[row]:
+            raise ValueError(f"{self.stocks[row].ticker} has too little price history to compare")
+        return row
+
+    def neighbors(self, ticker: str, k: int = 5, exact: bool = False) -> List[Tuple[float, Stock]]:
+        # The k stocks with the most similar path, as (correlation, stock), closest first
+        row = self.row_of(ticker)
+        if k <= 0:
+            return []
+        query = self.vectors[row]
+        with PROFILER.span("similar_stocks") as span:
+            candidates = None
+            if self.lsh is not None and not exact:
+                candidates = self.lsh.candidates(query)
+                candidates = candidates[candidates != row]
+                if len(candidates) < k:
+                    candidates = None  # too few in the buckets; fall back to exact
+            if candidates is None:
+                candidates = np.flatnonzero(self.valid)
+                candidates = candidates[candidates != row]
+            span.add("candidates", len(candidates))
+
+            similarity = self.vectors[candidates] @ query
+            k = min(k, len(candidates))
+            if k == 0:
+                return []
+            top = np.argpartition(-similarity, k - 1)[:k]
+            top = top[np.argsort(-similarity[top], kind="stable")]
+        return [(float(similarity[i]), self.stocks[candidates[i]]) for i in top]
@@ -1,64 +1,95 @@
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
 from ..data_structures.stock import Stock
 from ..data_processing.sector_grouper import SectorGrouper
+from ..instrumentation.profiler import PROFILER
+from .indicators import INDICATORS
 
 
 class StockScorer:
 #Calculates stock relevance scores based on user preferences.   
 #Uses 50% risk and 50% time weights for scoring.
 
-    def __init__(self, risk_profile: str, time_investment: str, sector_preference: str):
+    def __init__(self, risk_profile: str, time_investment: str, sector_preference: str, risk_model=None):
+        # risk_model (a MonteCarloRisk) replaces the volatility risk measure
+        # with one from simulated losses over the horizon, where it has one
         self.risk_profile = risk_profile.lower()
         self.time_investment = time_investment.lower()
         self.sector_preference = sector_preference.lower()
         self.sector_grouper = SectorGrouper()
+        self.risk_model = risk_model
     
     def calculate_score(self, stock: Stock) -> float:
-        score = 0.0
-        
-        # Risk scoring (50% weight)
-        risk_score = self.calculate_risk_score(stock)
-        score += risk_score * 0.50
-        
-        # Time investment scoring (50% weight)
-        time_score = self.calculate_time_score(stock)
-        score += time_score * 0.50
-        
-        return min(100.0, max(0.0, score))
+        return float(self.score_each([stock])[0])
     
     def calculate_risk_score(self, stock: Stock) -> float:
-        percent_change = abs(stock.percent_change)
-        
+        return float(self.risk_scores(np.array([self.get_risk_measure(stock)]))[0])
+    
+    def get_risk_measure(self, stock: Stock) -> float:
+        # Daily volatility in % over the last month; a single day's move is
+        # only used when the history is too short to measure it
+        percent_change, _, volatility, simulated = self.metric_arrays([stock])
+        return float(self.risk_measures(percent_change, volatility, simulated)[0])
+    
+    def calculate_time_score(self, stock: Stock) -> float:
+        return float(self.time_scores(np.array([stock.year_change]))[0])
+    
+    # The formulas below are the only copy: single stocks, score_stocks and
+    # the NumPy callers (backtester, as-of queries, parallel scoring, sector
+    # aggregates) all score through score_arrays.
+    
+    def risk_measures(self, percent_change, volatility, simulated=None):
+        measure = np.where(np.isnan(volatility), np.abs(percent_change), volatility)
+        if simulated is not None:
+            # Simulated horizon risk (see monte_carlo.py) where there is one
+            measure = np.where(np.isnan(simulated), measure, simulated)
+        return measure
+    
+    def risk_scores(self, measure):
         if self.risk_profile == "low":
-
-            return max(0, 100 - percent_change * 2)
+            return np.maximum(0, 100 - measure * 2)
         elif self.risk_profile == "medium":
-
-            return max(0, 100 - abs(percent_change - 5) * 5)
-        else:  
+            return np.maximum(0, 100 - np.abs(measure - 5) * 5)
+        else:
             #high risk
-            return min(100, percent_change * 2)
+            return np.minimum(100, measure * 2)
     
-    def calculate_time_score(self, stock: Stock) -> float:
-        #Score based on price difference over a year.
-        change = stock.year_change
-        
-        if self.time_investment == "short":
-            # looks at recent performance
-            return max(0, min(100, 50 + change * 2))
-        elif self.time_investment == "medium":
-            # Balanced
-            return max(0, min(100, 50 + change * 1))
-        else:  # long term
-            return max(0, min(100, 50 + change * 0.5))
+    def time_scores(self, year_change):
+        #Score based on price difference over a year: short term weighs
+        #recent performance most, long term least.
+        scale = {"short": 2, "medium": 1}.get(self.time_investment, 0.5)
+        return np.clip(50 + year_change * scale, 0, 100)
+    
+    def score_arrays(self, percent_change, year_change, volatility, simulated=None):
+        # 50% risk and 50% time score for whole arrays of metrics
+        risk_score = self.risk_scores(self.risk_measures(percent_change, volatility, simulated))
+        return np.clip(risk_score * 0.50 + self.time_scores(year_change) * 0.50, 0.0, 100.0)
+    
+    def metric_arrays(self, stocks: Sequence[Stock]):
+        # (percent_change, year_change, volatility, simulated risk or None)
+        count = len(stocks)
+        percent_change = np.fromiter((stock.percent_change for stock in stocks), dtype=np.float64, count=count)
+        year_change = np.fromiter((stock.year_change for stock in stocks), dtype=np.float64, count=count)
+        volatility = np.fromiter((values["volatility"] for values in INDICATORS.compute(stocks)), dtype=np.float64, count=count)
+        simulated = None
+        if self.risk_model is not None:
+            simulated = np.fromiter((self.risk_model.risk_measure(stock) for stock in stocks), dtype=np.float64, count=count)
+        return percent_change, year_change, volatility, simulated
+    
+    def score_each(self, stocks: Sequence[Stock]):
+        # Scores of the stocks, in their order
+        return self.score_arrays(*self.metric_arrays(stocks))
     
     def filter_by_sector(self, stocks: List[Stock]) -> List[Stock]:
         sector_keywords = self.get_sector_keywords(self.sector_preference)
         filtered_stocks = []
         
-        for stock in stocks:
-            if stock.industry_tag.lower() in sector_keywords:
-                filtered_stocks.append(stock)
+        with PROFILER.span("filter_by_sector") as span:
+            for stock in stocks:
+                if stock.industry_tag.lower() in sector_keywords:
+                    filtered_stocks.append(stock)
+            span.add("stocks_in", len(stocks))
+            span.add("stocks_out", len(filtered_stocks))
         
         return filtered_stocks
     
@@ -78,19 +109,19 @@ class StockScorer:
         return sector_mapping.get(sector.lower(), [])
     
     def score_stocks(self, stocks: List[Stock]) -> List[Tuple[float, Stock]]:
-        scored_stocks = []
-        
-        for stock in stocks:
-            score = self.calculate_score(stock)
-            scored_stocks.append((score, stock))
-        
-        # Sort by score in descending order
-        scored_stocks.sort(key=lambda x: x[0], reverse=True)
+        with PROFILER.span("score_stocks") as span:
+            # One vectorized pass; indicators for every stock not cached yet in one batch
+            scored_stocks = list(zip(self.score_each(stocks).tolist(), stocks))
+            
+            # Sort by score in descending order
+            scored_stocks.sort(key=lambda x: x[0], reverse=True)
+            span.add("stocks", len(scored_stocks))
         
         return scored_stocks
     
-    def get_top_recommendations(self, stocks: List[Stock], top_k: int = 10) -> List[Tuple[float, Stock]]:
-        #Get top stock recommendations
+    def get_top_recommendations(self, stocks: List[Stock], top_k: int = 10, max_correlation: Optional[float] = None) -> List[Tuple[float, Stock]]:
+        #Get top stock recommendations. With max_correlation set, skip stocks
+        #whose returns correlate above it with a stock already picked.
         sector_stocks = self.filter_by_sector(stocks)
         
         if not sector_stocks:
@@ -99,6 +130,9 @@ class StockScorer:
         # Score the filtered stocks
         scored_stocks = self.score_stocks(sector_stocks)
         
+        if max_correlation is not None:
+            from .diversification import diversify
+            return diversify(scored_stocks, top_k, max_correlation)
         return scored_stocks[:top_k]
     
     def calculate_certainty(self, scored_stocks: List[Tuple[float, Stock]]) -> float: